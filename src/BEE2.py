@@ -1,4 +1,7 @@
 """Run the BEE2."""
+from concurrent.futures import ThreadPoolExecutor
+import time
+
 # BEE2_config creates this config file to allow easy cross-module access
 from BEE2_config import GEN_OPTS
 
@@ -13,9 +16,11 @@ import logWindow
 import img
 import utils
 import music_conf
+import sound
 import srctools.logger
 
 LOGGER = srctools.logger.get_logger('BEE2')
+STARTUP_TIME = time.perf_counter()
 
 DEFAULT_SETTINGS = {
     'Directories': {
@@ -47,9 +52,30 @@ DEFAULT_SETTINGS = {
         'show_log_win': '0',
         # The lowest level which will be shown.
         'window_log_level': 'INFO',
+        # The number of lines to keep in the log window.
+        'window_log_max_lines': '5000',
     },
 }
 
+
+def timed_task(name: str, func, *args, **kwargs):
+    """Run one part of startup, logging how long it took."""
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        LOGGER.info(
+            'Startup task "{}" took {:.3f}s',
+            name, time.perf_counter() - start,
+        )
+
+
+def load_translations() -> None:
+    """Check games for Portal 2's basemodui.txt file, so we can translate items."""
+    for game in gameMan.all_games:
+        game.init_trans()
+
+
 GEN_OPTS.load()
 GEN_OPTS.set_defaults(DEFAULT_SETTINGS)
 
@@ -63,21 +89,45 @@ if utils.MAC:
 
 logWindow.init(
     GEN_OPTS.get_bool('Debug', 'show_log_win'),
-    GEN_OPTS['Debug']['window_log_level']
+    GEN_OPTS['Debug']['window_log_level'],
+    GEN_OPTS.get_int('Debug', 'window_log_max_lines', 5000),
 )
 
 LOGGER.debug('Loading settings...')
 
 UI.load_settings()
 
+# Decode the sound effects in the background, so they're ready when needed.
+sound.load_snd()
+
 gameMan.load()
 gameMan.set_game_by_name(
     GEN_OPTS.get_val('Last_Selected', 'Game', ''),
     )
-gameMan.scan_music_locs()
+
+# These tasks don't need Tk, so they run in the background. Tk widgets can
+# only be created on the main thread, so that does the package loading and UI
+# construction alongside them.
+startup_pool = ThreadPoolExecutor(max_workers=3)
+
+music_task = startup_pool.submit(
+    timed_task, 'Music locations', gameMan.scan_music_locs,
+)
+palette_task = startup_pool.submit(
+    timed_task, 'Palettes', paletteLoader.load_palettes,
+)
+trans_task = startup_pool.submit(
+    timed_task, 'Item translations', load_translations,
+)
+
+# Packages need to know if the music is present.
+if not music_task.result():
+    gameMan.warn_tag_coop_missing()
 
 LOGGER.info('Loading Packages...')
-pack_data, package_sys = packageLoader.load_packages(
+pack_data, package_sys = timed_task(
+    'Packages',
+    packageLoader.load_packages,
     GEN_OPTS['Directories']['package'],
     loader=loadScreen.main_loader,
     log_item_fallbacks=GEN_OPTS.get_bool(
@@ -97,21 +147,19 @@ music_conf.load_filesystems(package_sys)
 img.load_filesystems(package_sys)
 gameMan.load_filesystems(package_sys)
 
-UI.load_packages(pack_data)
-LOGGER.info('Done!')
-
-LOGGER.info('Loading Palettes...')
-paletteLoader.load_palettes()
+# Item names are translated when the UI is built, so wait for that to be
+# ready to avoid a race.
+trans_task.result()
+timed_task('Package UI', UI.load_packages, pack_data)
 LOGGER.info('Done!')
 
-# Check games for Portal 2's basemodui.txt file, so we can translate items.
-LOGGER.info('Loading Item Translations...')
-for game in gameMan.all_games:
-    game.init_trans()
+palette_task.result()
+startup_pool.shutdown()
 
 LOGGER.info('Initialising UI...')
-UI.init_windows()  # create all windows
+timed_task('Windows', UI.init_windows)  # create all windows
 LOGGER.info('UI initialised!')
+LOGGER.info('Startup took {:.3f}s', time.perf_counter() - STARTUP_TIME)
 
 loadScreen.main_loader.destroy()
 # Delay this until the loop has actually run.
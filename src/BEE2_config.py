@@ -7,10 +7,14 @@ This also contains a version of ConfigParser that can be easily resaved.
 
 It only saves if the values are modified.
 Most functions are also altered to allow defaults instead of erroring.
+Configs can optionally delay writing, so repeated saves only hit the disk once.
 """
 from configparser import ConfigParser, NoOptionError, SectionProxy, ParsingError
-from typing import Any, Mapping
+from typing import Any, Mapping, List, Optional
+import atexit
+import io
 import os
+import threading
 
 from srctools import AtomicWriter, Property, KeyValError
 
@@ -25,6 +29,12 @@ LOGGER = srctools.logger.get_logger(__name__)
 # values.
 option_handler = utils.FuncLookup('OptionHandlers')  # type: utils.FuncLookup
 
+# For write-behind configs, the delay after the last save before the file is
+# actually written, in seconds.
+WRITE_DELAY = 1.0
+# All configs using write-behind, so they can be flushed on exit.
+_WRITE_BEHIND = []  # type: List[ConfigFile]
+
 
 def get_curr_settings() -> Property:
     """Return a property tree defining the current options."""
@@ -95,6 +105,7 @@ class ConfigFile(ConfigParser):
         *,
         in_conf_folder: bool=True,
         auto_load: bool=True,
+        write_behind: bool=False,
     ) -> None:
         """Initialise the config file.
 
@@ -102,11 +113,23 @@ class ConfigFile(ConfigParser):
         If `auto_load` is true, this file will immediately be read and parsed.
         If in_conf_folder is set, The folder is relative to the 'config/'
         folder in the BEE2 folder.
+        If `write_behind` is true, save() only records the values, and they
+        are written in the background once no saves occur for WRITE_DELAY
+        seconds.
         """
         super().__init__()
 
         self.has_changed = False
 
+        self.write_behind = write_behind
+        # The text of the file waiting to be written, if any.
+        self._pending = None  # type: Optional[str]
+        self._flush_timer = None  # type: Optional[threading.Timer]
+        # Held while writing, or changing the two above.
+        self._write_lock = threading.Lock()
+        if write_behind:
+            _WRITE_BEHIND.append(self)
+
         if filename is not None:
             if in_conf_folder:
                 self.filename = utils.conf_location('config/' + filename)
@@ -122,10 +145,16 @@ class ConfigFile(ConfigParser):
             self.filename = self.writer = None
 
     def load(self) -> None:
-        """Load config options from disk."""
+        """Load config options from disk.
+
+        Any delayed changes are written first, so they can't later overwrite
+        the file we read.
+        """
         if self.filename is None:
             return
 
+        self.flush()
+
         try:
             with open(self.filename, 'r') as conf:
                 self.read_file(conf)
@@ -150,15 +179,49 @@ class ConfigFile(ConfigParser):
         self.has_changed = False
 
     def save(self) -> None:
-        """Write our values out to disk."""
-        LOGGER.info('Saving changes in config "{}"!', self.filename)
+        """Write our values out to disk.
+
+        In write-behind mode, this is delayed until saves stop occurring.
+        """
         if self.filename is None:
             raise ValueError('No filename provided!')
 
-        with self.writer as conf:
-            self.write(conf)
+        if not self.write_behind:
+            LOGGER.info('Saving changes in config "{}"!', self.filename)
+            with self._write_lock, self.writer as conf:
+                self.write(conf)
+            self.has_changed = False
+            return
+
+        # Take a copy of the values now, so we write a consistent file
+        # even if they're changed while writing.
+        buf = io.StringIO()
+        self.write(buf)
         self.has_changed = False
 
+        with self._write_lock:
+            self._pending = buf.getvalue()
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+            self._flush_timer = threading.Timer(WRITE_DELAY, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Immediately write any delayed changes to disk."""
+        with self._write_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            data, self._pending = self._pending, None
+            if data is None:
+                return
+            LOGGER.info('Saving changes in config "{}"!', self.filename)
+            # AtomicWriter writes to a temporary file, then renames it into
+            # place - so readers never see a half-written file.
+            with self.writer as conf:
+                conf.write(data)
+
     def save_check(self) -> None:
         """Check to see if we have different values, and save if needed."""
         if self.has_changed:
@@ -249,6 +312,17 @@ class ConfigFile(ConfigParser):
     set.__doc__ = ConfigParser.set.__doc__
 
 
+@atexit.register
+def flush_all() -> None:
+    """Write out all delayed config changes."""
+    for config in _WRITE_BEHIND:
+        try:
+            config.flush()
+        except Exception:
+            LOGGER.exception('Could not save config "{}"!', config.filename)
+
+
 # Define this here so app modules can easily access the config
 # Don't load it though, since this is imported by VBSP too.
-GEN_OPTS = ConfigFile('config.cfg', auto_load=False)
+# VBSP never saves it, so the write-behind doesn't affect that.
+GEN_OPTS = ConfigFile('config.cfg', auto_load=False, write_behind=True)
@@ -71,7 +71,7 @@ PLAYER_MODELS = {
 PLAYER_MODEL_ORDER = ['PETI', 'SP', 'ATLAS', 'PBODY']
 PLAYER_MODELS_REV = {value: key for key, value in PLAYER_MODELS.items()}
 
-COMPILE_CFG = ConfigFile('compile.cfg')
+COMPILE_CFG = ConfigFile('compile.cfg', write_behind=True)
 COMPILE_CFG.set_defaults(COMPILE_DEFAULTS)
 window = None
 UI = {}  # type: Dict[str, Widget]
@@ -169,6 +169,7 @@ class Item:
         self.filter_tags.add(
             tagsPane.add_tag(Section.PACK, self.pak_id, pretty=self.pak_name)
         )
+        tagsPane.invalidate_index()
 
     def get_icon(self, subKey, allow_single=False, single_num=1):
         """Get an icon for the given subkey.
@@ -297,6 +298,8 @@ class PalItem(Label):
         self.id = item.id
         # Toggled according to filter settings
         self.visible = True
+        # The position flow_picker() last placed us at.
+        self.picker_pos = None
         # Used to distinguish between picker and palette items
         self.is_pre = is_pre
         self.needs_unlock = item.item.needs_unlock
@@ -388,6 +391,9 @@ class PalItem(Label):
             )
             self.name = '??'
         self['image'] = self.img
+        if not self.is_pre:
+            # Our name is used to search.
+            tagsPane.invalidate_index()
 
     def clear(self):
         """Remove any items matching ourselves from the palette.
@@ -880,6 +886,8 @@ def export_editoritems(e=None):
     GEN_OPTS.save_check()
     item_opts.save_check()
     BEE2_config.write_settings()
+    # VBSP reads these configs, so make sure they're up to date.
+    BEE2_config.flush_all()
 
     message = _('Selected Items and Style successfully exported!')
     if not vpk_success:
@@ -1584,15 +1592,18 @@ def flow_picker(e=None):
         width = 1  # we got way too small, prevent division by zero
     vis_items = [it for it in pal_items if it.visible]
     num_items = len(vis_items)
+    # Only move items which actually changed position.
     for i, item in enumerate(vis_items):
         item.is_pre = False
-        item.place(
-            x=((i % width) * 65 + 1),
-            y=((i // width) * 65 + 1),
-            )
-
-    for item in (it for it in pal_items if not it.visible):
-        item.place_forget()
+        pos = ((i % width) * 65 + 1, (i // width) * 65 + 1)
+        if item.picker_pos != pos:
+            item.place(x=pos[0], y=pos[1])
+            item.picker_pos = pos
+
+    for item in pal_items:
+        if not item.visible and item.picker_pos is not None:
+            item.place_forget()
+            item.picker_pos = None
     height = (num_items // width + 1) * 65 + 2
     pal_canvas['scrollregion'] = (
         0,
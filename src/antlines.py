@@ -1,11 +1,19 @@
 """Handles restyling antlines."""
 import random
-from collections import namedtuple
-from typing import List
+from collections import namedtuple, defaultdict
+from typing import List, Dict, Iterable, Tuple, Optional
 
 from srctools import Vec, Property, conv_float, Entity, VMF
-import srctools.vmf
+import srctools.logger
 import comp_consts as const
+import budget
+import rand
+
+
+LOGGER = srctools.logger.get_logger(__name__)
+
+# The maximum number of overlays in a map.
+OVERLAY_LIMIT = 512
 
 
 class AntTex(namedtuple('AntTex', ['texture', 'scale', 'static'])):
@@ -110,16 +118,16 @@ class AntType:
         )
 
 
-def broken_antline_iter(dist, chance):
+def broken_antline_iter(dist, chance, rng: random.Random):
     """Iterator used in set_antline_mat().
 
     This produces min, max pairs which fill the space from 0-dist.
     Neighbouring sections will be merged when they have the same type.
     """
     run_start = 0
-    last_type = random.randrange(100) < chance
+    last_type = rng.randrange(100) < chance
     for i in range(1, int(dist)):
-        next_type = random.randrange(100) < chance
+        next_type = rng.randrange(100) < chance
         if next_type != last_type:
             yield run_start, i, last_type
             last_type = next_type
@@ -129,17 +137,85 @@ def broken_antline_iter(dist, chance):
     return
 
 
+# A section of a broken antline. start and end are the range of dots it
+# covers, or None if the overlay is kept at its original size.
+AntSection = namedtuple('AntSection', ['start', 'end', 'broken', 'tex'])
+# The sections for an antline, along with its corners and length.
+AntPlan = namedtuple('AntPlan', ['overlay', 'uvs', 'length', 'sections'])
+# Antlines which were split, so they can be merged back if needed.
+# overlays is the generated sections, keys the original keyvalues.
+AntSplit = namedtuple('AntSplit', ['overlays', 'keys', 'sections'])
+
+SPLIT_ANTLINES = []  # type: List[AntSplit]
+
+
 def style_antline(over: Entity, conf: AntType, floor_conf: AntType):
     """Retexture an antline.
 
     floor_conf, if set is an alternate texture set to use on floors and ceilings.
     """
-    # Choose a random one
-    random.seed(over['origin'])
+    style_antlines(over.map, [(over, conf, floor_conf)])
+
+
+def style_antlines(
+    vmf: VMF,
+    antlines: Iterable[Tuple[Entity, AntType, AntType]],
+    budget: Optional[int]=None,
+) -> int:
+    """Retexture many antlines at once.
+
+    antlines is an iterable of (overlay, conf, floor_conf) tuples, like the
+    parameters to style_antline().
+    Broken antlines are split into multiple overlays, which each take up an
+    overlay slot. If budget is set, it is the number of additional overlays
+    which may be created - the antlines with the most sections are left in
+    one piece until that is met.
+    This returns the number of additional overlays created.
+    """
+    by_type = defaultdict(list)  # type: Dict[AntType, List[Entity]]
+    for over, conf, floor_conf in antlines:
+        # For P1 style, check to see if the antline is on the floor or walls.
+        if Vec.from_str(over['basisNormal']).z != 0:
+            conf = floor_conf
+        by_type[conf].append(over)
+
+    plans = []  # type: List[AntPlan]
+    added = 0
+    for conf, overlays in by_type.items():
+        for over in overlays:
+            plan = _plan_antline(over, conf)
+            plans.append(plan)
+            added += len(plan.sections) - 1
+
+    if budget is not None and added > budget:
+        merged = 0
+        # Keep the most fragmented antlines whole first, since that saves
+        # the most overlays.
+        for plan in sorted(
+            plans,
+            key=lambda plan: len(plan.sections),
+            reverse=True,
+        ):
+            if added <= budget or len(plan.sections) <= 1:
+                break
+            added -= len(plan.sections) - 1
+            merged += 1
+            plan.sections[:] = [_merge_sections(plan.sections)]
+        LOGGER.warning(
+            'Overlay limit reached, {} broken antlines were not split.',
+            merged,
+        )
+
+    for plan in plans:
+        _apply_sections(vmf, plan)
+
+    return added
 
-    # For P1 style, check to see if the antline is on the floor or walls.
-    if Vec.from_str(over['basisNormal']).z != 0:
-        conf = floor_conf
+
+def _plan_antline(over: Entity, conf: AntType) -> AntPlan:
+    """Decide the sections and textures to use for an antline."""
+    # Choose a random one
+    rng = rand.seed(over['origin'])
 
     if over['material'] == const.Antlines.STRAIGHT:
         mats = conf.tex_straight
@@ -151,55 +227,123 @@ def style_antline(over: Entity, conf: AntType, floor_conf: AntType):
         raise ValueError('"{}" is not an antline!'.format(over['material']))
 
     if conf.broken_chance:  # We can have `broken` antlines.
-        bbox_min, bbox_max = srctools.vmf.overlay_bounds(over)
-        # Number of 'circles' and the length-wise axis
-        length = max(bbox_max - bbox_min)
-        long_axis = Vec(0, 1, 0).rotate_by_str(over['angles']).axis()
+        # Number of 'circles' - antlines are always axis aligned, so the
+        # largest dimension in local space is the same as in world space.
+        uvs = [Vec.from_str(over['uv' + axis]) for axis in '0123']
+        length = max(
+            max(pos[axis] for pos in uvs) - min(pos[axis] for pos in uvs)
+            for axis in 'xyz'
+        )
 
         # It's a corner or short antline - replace instead of adding more
         if length <= 48:
-            if random.randrange(100) < conf.broken_chance:
+            if rng.randrange(100) < conf.broken_chance:
                 mats = broken_mats
         else:
             # Generate multiple for broken overlays.
-            min_origin = Vec.from_str(over['origin'])
-            min_origin[long_axis] -= length / 2
-
-            broken_iter = broken_antline_iter(
-                length // 16,
-                conf.broken_chance,
-            )
-            for sect_min, sect_max, is_broken in broken_iter:
-                sect_mats = broken_mats if is_broken else mats
-
-                sect_length = sect_max - sect_min
-
-                # Make a section - base it off the original, and shrink it
-                new_over = over.copy()
-                over.map.add_ent(new_over)
-
-                # Repeats lengthways
-                new_over['startV'] = sect_length
-                sect_center = (sect_min + sect_max) / 2
-
-                sect_origin = min_origin.copy()
-                sect_origin[long_axis] += sect_center * 16
-                new_over['basisorigin'] = new_over['origin'] = sect_origin
-
-                # Set the 4 corner locations to determine the overlay size.
-                # They're in local space - x is -8/+8, y=length, z=0
-                # Match the sign of the current value
-                for axis in '0123':
-                    pos = Vec.from_str(new_over['uv' + axis])
-                    if pos.y < 0:
-                        pos.y = -8 * sect_length
-                    else:
-                        pos.y = 8 * sect_length
-                    new_over['uv' + axis] = pos.join(' ')
-
-                random.choice(sect_mats).apply(new_over)
-            # Remove the original overlay
-            over.remove()
-            return  # Don't texture the original.
+            return AntPlan(over, uvs, length, [
+                AntSection(
+                    sect_min, sect_max, is_broken,
+                    rng.choice(broken_mats if is_broken else mats),
+                )
+                for sect_min, sect_max, is_broken in
+                broken_antline_iter(length // 16, conf.broken_chance, rng)
+            ])
+
+    return AntPlan(over, None, None, [
+        AntSection(None, None, False, rng.choice(mats)),
+    ])
+
 
-    random.choice(mats).apply(over)
+def _merge_sections(sections: List[AntSection]) -> AntSection:
+    """Combine sections into one covering the whole overlay.
+
+    This uses the texture for the type covering the most dots.
+    """
+    broken_len = sum(
+        sect.end - sect.start
+        for sect in sections
+        if sect.broken
+    )
+    is_broken = 2 * broken_len > sections[-1].end - sections[0].start
+    for sect in sections:
+        if sect.broken is is_broken:
+            return AntSection(None, None, is_broken, sect.tex)
+    raise AssertionError(sections)
+
+
+def _apply_sections(vmf: VMF, plan: AntPlan):
+    """Texture an antline, splitting it into the planned sections."""
+    over = plan.overlay
+    sections = plan.sections
+    if sections[0].start is None:
+        sections[0].tex.apply(over)
+        return
+
+    long_axis = Vec(0, 1, 0).rotate_by_str(over['angles']).axis()
+    min_origin = Vec.from_str(over['origin'])
+    min_origin[long_axis] -= plan.length / 2
+
+    # Copy the keyvalues before we change them.
+    orig_keys = over.keys.copy()
+    split = AntSplit([], orig_keys, sections)
+    if len(sections) > 1:
+        SPLIT_ANTLINES.append(split)
+
+    for ind, (sect_min, sect_max, is_broken, tex) in enumerate(sections):
+        if ind == 0:
+            # Reuse the original for the first section.
+            new_over = over
+        else:
+            # Make a section - base it off the original. Overlays have no
+            # solids or outputs, so only the keyvalues need copying.
+            new_over = Entity(vmf, keys=orig_keys)
+            vmf.add_ent(new_over)
+
+        sect_length = sect_max - sect_min
+
+        # Repeats lengthways
+        new_over['startV'] = sect_length
+        sect_center = (sect_min + sect_max) / 2
+
+        sect_origin = min_origin.copy()
+        sect_origin[long_axis] += sect_center * 16
+        new_over['basisorigin'] = new_over['origin'] = sect_origin
+
+        # Set the 4 corner locations to determine the overlay size.
+        # They're in local space - x is -8/+8, y=length, z=0
+        # Match the sign of the current value
+        for axis, pos in zip('0123', plan.uvs):
+            new_over['uv' + axis] = Vec(
+                pos.x,
+                -8 * sect_length if pos.y < 0 else 8 * sect_length,
+                pos.z,
+            ).join(' ')
+
+        tex.apply(new_over)
+        split.overlays.append(new_over)
+
+
+@budget.strategy('overlay', priority=10)
+def merge_antline_sections(vmf: VMF, excess: int) -> str:
+    """Join broken antlines back into single overlays."""
+    freed = 0
+    merged = 0
+    # The most fragmented ones free up the most overlays.
+    SPLIT_ANTLINES.sort(key=lambda split: len(split.overlays), reverse=True)
+    while SPLIT_ANTLINES and freed < excess:
+        split = SPLIT_ANTLINES.pop(0)
+        first, *rest = split.overlays
+        for over in rest:
+            over.remove()
+        # Restore the original size and name, then retexture.
+        for key, value in split.keys.items():
+            first[key] = value
+        _merge_sections(split.sections).tex.apply(first)
+        freed += len(rest)
+        merged += 1
+    if merged:
+        return 'joined {} broken antlines, removing {} overlays'.format(
+            merged, freed,
+        )
+    return ''
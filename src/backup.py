@@ -2,14 +2,22 @@
 
 """
 import atexit
+import hashlib
+import lzma
 import os
 import shutil
 import string
+import tempfile
 import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from io import BytesIO, TextIOWrapper
-from typing import List, TYPE_CHECKING, Dict, Any
-from zipfile import ZipFile, ZIP_LZMA
+from typing import (
+    List, TYPE_CHECKING, Dict, Any, Iterator, Iterable, Set,
+    Optional, Tuple, IO,
+)
+from zipfile import ZipFile, ZIP_LZMA, BadZipFile
 
 import img
 import loadScreen
@@ -42,8 +50,33 @@ AUTO_BACKUP_STAGE = 'BACKUP_ZIP'
 
 # Characters allowed in the backup filename
 BACKUP_CHARS = set(string.ascii_letters + string.digits + '_-.')
+# Extension for automatic backups. These are manifests referring to
+# compressed files in AUTO_BACKUP_OBJECTS, so unchanged puzzles are only
+# stored once.
+AUTO_BACKUP_EXT = '.bee2_backup'
 # Format for the backup filename
-AUTO_BACKUP_FILE = 'back_{game}{ind}.zip'
+AUTO_BACKUP_FILE = 'back_{game}{ind}' + AUTO_BACKUP_EXT
+# Older versions stored each generation as a zip with this name.
+LEGACY_BACKUP_FILE = 'back_{game}{ind}.zip'
+# Subfolder of the backup directory holding the compressed puzzle files.
+AUTO_BACKUP_OBJECTS = 'back_objects'
+# Number of threads used to compress files.
+AUTO_BACKUP_THREADS = 4
+
+# Extension for the sidecar file storing the header values of P2Cs in
+# a backup.
+P2C_INDEX_EXT = '.index'
+# The keys read from P2C files.
+P2C_HEADER_KEYS = {
+    'title', 'description', 'coop',
+    'timestamp_created', 'timestamp_modified',
+}
+# Number of threads used to read P2C files.
+P2C_READ_THREADS = 4
+
+# For each file in an automatic backup, the hash of its contents, and the
+# size and modification time. Those let us skip rehashing unchanged files.
+AutoBackupEntry = namedtuple('AutoBackupEntry', 'hash, size, mtime')
 
 HEADERS = ['Name', 'Mode', 'Date']
 
@@ -119,31 +152,23 @@ class P2C:
         path is the file path for the map inside the zip, without extension.
         zip_file is either a ZipFile or FakeZip object.
         """
-        # Some P2Cs may have non-ASCII characters in descriptions, so we
-        # need to read it as bytes and convert to utf-8 ourselves - zips
-        # don't convert encodings automatically for us.
-        try:
-            with zip_open_bin(zip_file, path + '.p2c') as file:
-                # Decode the P2C as UTF-8, and skip unknown characters.
-                # We're only using it for display purposes, so that should
-                # be sufficient.
-                with TextIOWrapper(
-                    file,
-                    encoding='utf-8',
-                    errors='replace',
-                ) as textfile:
-                    props = Property.parse(textfile, path)
-        except KeyValError:
+        return cls.from_header(path, zip_file, read_p2c_header(path, zip_file))
+
+    @classmethod
+    def from_header(cls, path, zip_file, header: Optional[Dict[str, str]]):
+        """Initialise from the values produced by read_p2c_header().
+
+        If header is None, the file couldn't be parsed.
+        """
+        if header is None:
             # Silently fail if we can't parse the file. That way it's still
             # possible to backup.
-            LOGGER.warning('Failed parsing puzzle file!', path, exc_info=True)
-            props = Property('portal2_puzzle', [])
+            header = {}
             title = None
             desc = _('Failed to parse this puzzle file. It can still be backed up.')
         else:
-            props = props.find_key('portal2_puzzle', [])
-            title = props['title', None]
-            desc = props['description', _('No description found.')]
+            title = header.get('title', None)
+            desc = header.get('description', _('No description found.'))
 
         if title is None:
             title = '<' + path.rsplit('/', 1)[-1] + '.p2c>'
@@ -153,9 +178,9 @@ class P2C:
             zip_file=zip_file,
             title=title,
             desc=desc,
-            is_coop=srctools.conv_bool(props['coop', '0']),
-            create_time=Date(props['timestamp_created', '']),
-            mod_time=Date(props['timestamp_modified', '']),
+            is_coop=srctools.conv_bool(header.get('coop', '0')),
+            create_time=Date(header.get('timestamp_created', '')),
+            mod_time=Date(header.get('timestamp_modified', '')),
         )
 
     def copy(self):
@@ -182,6 +207,149 @@ class P2C:
         return chk
 
 
+def scan_p2c_header(file: Iterable[str]) -> Optional[Dict[str, str]]:
+    """Read just the keys in P2C_HEADER_KEYS from a P2C file.
+
+    These are near the start, so this stops reading once they're all found,
+    instead of parsing the whole file. If the file has something unusual,
+    None is returned and it should be fully parsed instead.
+    """
+    header = {}
+    depth = 0
+    for line in file:
+        line = line.strip()
+        if not line or line.startswith('//'):
+            continue
+        if line == '{':
+            depth += 1
+            continue
+        elif line == '}':
+            depth -= 1
+            continue
+
+        parts = line.split('"')
+        if len(parts) == 3 and not parts[0] and not parts[2]:
+            # A block name.
+            continue
+        elif len(parts) != 5 or parts[0] or parts[2].strip() or parts[4]:
+            # Escaped quotes, multi-line values, unquoted keys, etc.
+            return None
+        if depth != 1:
+            continue
+        key = parts[1].casefold()
+        if key in P2C_HEADER_KEYS:
+            header[key] = parts[3]
+            if len(header) == len(P2C_HEADER_KEYS):
+                break
+    return header
+
+
+def read_p2c_header(path: str, zip_file) -> Optional[Dict[str, str]]:
+    """Read the keys in P2C_HEADER_KEYS from a P2C inside a zip.
+
+    path is the file path for the map inside the zip, without extension.
+    This is safe to call from other threads. If the file could not be
+    parsed, None is returned.
+    """
+    # Some P2Cs may have non-ASCII characters in descriptions, so we
+    # need to read it as bytes and convert to utf-8 ourselves - zips
+    # don't convert encodings automatically for us.
+    # Decode the P2C as UTF-8, and skip unknown characters.
+    # We're only using it for display purposes, so that should
+    # be sufficient.
+    with zip_open_bin(zip_file, path + '.p2c') as file:
+        with TextIOWrapper(file, encoding='utf-8', errors='replace') as textfile:
+            header = scan_p2c_header(textfile)
+    if header is not None:
+        return header
+
+    try:
+        with zip_open_bin(zip_file, path + '.p2c') as file:
+            with TextIOWrapper(
+                file,
+                encoding='utf-8',
+                errors='replace',
+            ) as textfile:
+                props = Property.parse(textfile, path)
+    except KeyValError:
+        LOGGER.warning('Failed parsing puzzle file "{}"!', path, exc_info=True)
+        return None
+
+    props = props.find_key('portal2_puzzle', [])
+    return {
+        prop.name: prop.value
+        for prop in props
+        if prop.name in P2C_HEADER_KEYS and not prop.has_children()
+    }
+
+
+def p2c_stamp(zip_file, filename: str) -> Optional[str]:
+    """Produce a value which changes whenever the given file does.
+
+    This is used as the key for the P2C index. For zips this is the size and
+    CRC, for folders the size and modification time. None is returned if
+    that isn't possible.
+    """
+    if isinstance(zip_file, FakeZip):
+        stat = os.stat(os.path.join(zip_file.folder, filename))
+        return '{}:{}'.format(stat.st_size, stat.st_mtime_ns)
+    elif isinstance(zip_file, AutoBackup):
+        entry = zip_file.files[filename]
+        return '{}:{}'.format(entry.size, entry.hash)
+    elif isinstance(zip_file, ZipFile):
+        info = zip_file.getinfo(filename)
+        return '{}:{:08x}'.format(info.file_size, info.CRC)
+    return None
+
+
+def load_p2c_index(path: str) -> Dict[str, Tuple[str, Dict[str, str]]]:
+    """Load the index of P2C headers.
+
+    This maps filenames to the stamp and header values.
+    """
+    try:
+        with open(path, encoding='utf8') as f:
+            props = Property.parse(f, path)
+    except FileNotFoundError:
+        return {}
+    except KeyValError:
+        LOGGER.warning('Could not parse P2C index "{}"!', path, exc_info=True)
+        return {}
+
+    index = {}
+    for file_prop in props.find_children('P2CIndex'):
+        index[file_prop.real_name] = (file_prop['stamp', ''], {
+            prop.name: prop.value
+            for prop in file_prop.find_children('Header')
+        })
+    return index
+
+
+def save_p2c_index(
+    path: str,
+    index: Dict[str, Tuple[str, Dict[str, str]]],
+) -> None:
+    """Write out the index of P2C headers."""
+    props = Property('P2CIndex', [
+        Property(filename, [
+            Property('stamp', stamp),
+            Property('Header', [
+                Property(key, value)
+                for key, value in sorted(header.items())
+            ]),
+        ])
+        for filename, (stamp, header) in sorted(index.items())
+    ])
+    try:
+        with open(path + '.tmp', 'w', encoding='utf8') as f:
+            for line in props.export():
+                f.write(line)
+        os.replace(path + '.tmp', path)
+    except OSError:
+        # It's just a cache, we can do without.
+        LOGGER.warning('Could not write P2C index "{}"!', path, exc_info=True)
+
+
 class Date:
     """A version of datetime with an invalid value, and read from hex.
     """
@@ -240,12 +408,231 @@ class Date:
         return self.date != other.date
 
 
+class AutoBackup:
+    """A generation of the automatic backup, which pretends to be a ZipFile.
+
+    The manifest lists the filenames and hashes, with the compressed data
+    stored in a shared folder.
+    """
+    def __init__(
+        self,
+        path: str,
+        files: Dict[str, AutoBackupEntry],
+        timestamp: int=0,
+    ) -> None:
+        self.path = path
+        self.files = files
+        self.timestamp = timestamp
+
+    @classmethod
+    def parse(cls, path: str) -> 'AutoBackup':
+        """Read a backup manifest."""
+        with open(path, encoding='utf8') as f:
+            props = Property.parse(f, path).find_key('AutoBackup', [])
+        files = {}
+        for file_prop in props.find_children('Files'):
+            files[file_prop.real_name] = AutoBackupEntry(
+                file_prop['hash'],
+                srctools.conv_int(file_prop['size', '-1'], -1),
+                srctools.conv_int(file_prop['mtime', '0']),
+            )
+        return cls(path, files, srctools.conv_int(props['time', '0']))
+
+    def save(self) -> None:
+        """Write the manifest out."""
+        props = Property('AutoBackup', [
+            Property('time', str(self.timestamp)),
+            Property('Files', [
+                Property(filename, [
+                    Property('hash', entry.hash),
+                    Property('size', str(entry.size)),
+                    Property('mtime', str(entry.mtime)),
+                ])
+                for filename, entry in sorted(self.files.items())
+            ]),
+        ])
+        with open(self.path + '.tmp', 'w', encoding='utf8') as f:
+            for line in props.export():
+                f.write(line)
+        os.replace(self.path + '.tmp', self.path)
+
+    def object_path(self, file_hash: str) -> str:
+        """Return the location of the compressed data for a hash."""
+        return _backup_obj_path(os.path.dirname(self.path), file_hash)
+
+    # ZipFile-compatible interface, so the UI can read these directly.
+
+    def close(self) -> None:
+        pass
+
+    def names(self) -> Iterator[str]:
+        return iter(self.files)
+
+    def namelist(self) -> Set[str]:
+        return set(self.files)
+
+    def open(self, name: str, mode: str='r', pwd=None) -> BytesIO:
+        try:
+            entry = self.files[name]
+        except KeyError:
+            raise KeyError(name) from None
+        with lzma.open(self.object_path(entry.hash), 'rb') as f:
+            return BytesIO(f.read())
+
+
+def _backup_obj_path(backup_dir: str, file_hash: str) -> str:
+    """Return the location of the compressed data for a hash."""
+    return os.path.join(
+        backup_dir, AUTO_BACKUP_OBJECTS,
+        file_hash[:2], file_hash + '.xz',
+    )
+
+
+def _hash_backup_file(path: str) -> str:
+    """Hash the contents of a puzzle file."""
+    hasher = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _store_backup_file(
+    backup_dir: str,
+    path: str,
+    old_entry: AutoBackupEntry=None,
+) -> AutoBackupEntry:
+    """Hash a puzzle file, and compress it into the store if not present.
+
+    This runs in a worker thread.
+    """
+    stat = os.stat(path)
+    if (
+        old_entry is not None and
+        old_entry.size == stat.st_size and
+        old_entry.mtime == stat.st_mtime_ns
+    ):
+        file_hash = old_entry.hash
+    else:
+        file_hash = _hash_backup_file(path)
+
+    obj_path = _backup_obj_path(backup_dir, file_hash)
+    if not os.path.isfile(obj_path):
+        with open(path, 'rb') as src:
+            _write_backup_obj(obj_path, src)
+
+    return AutoBackupEntry(file_hash, stat.st_size, stat.st_mtime_ns)
+
+
+def _write_backup_obj(obj_path: str, src: IO[bytes]) -> None:
+    """Compress data into the store.
+
+    This writes to a unique temporary file, so an interrupted backup doesn't
+    leave a corrupt file behind, and identical files being stored at the same
+    time don't conflict.
+    """
+    obj_dir = os.path.dirname(obj_path)
+    os.makedirs(obj_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(
+        prefix=os.path.basename(obj_path) + '.',
+        suffix='.tmp',
+        dir=obj_dir,
+    )
+    try:
+        with open(fd, 'wb') as f, lzma.open(f, 'wb') as dest:
+            shutil.copyfileobj(src, dest)
+        # If another thread stored the same file, they're identical.
+        os.replace(temp_path, obj_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _migrate_legacy_backups(backup_dir: str, safe_name: str, count: int) -> None:
+    """Convert zip backups from older versions into the object store.
+
+    The zip is removed once converted, so it doesn't stay around forever.
+    """
+    for ind in [''] + ['_' + str(i + 1) for i in range(count)]:
+        zip_path = os.path.join(
+            backup_dir,
+            LEGACY_BACKUP_FILE.format(game=safe_name, ind=ind),
+        )
+        if not os.path.isfile(zip_path):
+            continue
+        manifest_path = os.path.join(
+            backup_dir,
+            AUTO_BACKUP_FILE.format(game=safe_name, ind=ind),
+        )
+        if os.path.exists(manifest_path):
+            # Already have a backup in this slot, the zip is older.
+            LOGGER.info('Removing old backup "{}"', zip_path)
+            os.remove(zip_path)
+            continue
+
+        LOGGER.info('Converting old backup "{}"...', zip_path)
+        manifest = AutoBackup(
+            manifest_path, {},
+            int(os.stat(zip_path).st_mtime),
+        )
+        try:
+            with ZipFile(zip_path) as zip_file:
+                for info in zip_file.infolist():
+                    if info.is_dir():
+                        continue
+                    data = zip_file.read(info)
+                    file_hash = hashlib.sha1(data).hexdigest()
+                    obj_path = _backup_obj_path(backup_dir, file_hash)
+                    if not os.path.isfile(obj_path):
+                        _write_backup_obj(obj_path, BytesIO(data))
+                    # The mtime doesn't match, so these will be rehashed
+                    # when next backed up.
+                    manifest.files[info.filename] = AutoBackupEntry(
+                        file_hash, len(data), 0,
+                    )
+        except (OSError, BadZipFile):
+            LOGGER.warning('Could not convert "{}"!', zip_path, exc_info=True)
+            continue
+        manifest.save()
+        os.remove(zip_path)
+
+
+def _clean_backup_objects(backup_dir: str) -> None:
+    """Remove compressed files which aren't used by any automatic backup."""
+    used = set()
+    for filename in os.listdir(backup_dir):
+        if not filename.endswith(AUTO_BACKUP_EXT):
+            continue
+        try:
+            manifest = AutoBackup.parse(os.path.join(backup_dir, filename))
+        except (OSError, KeyValError):
+            # Don't delete anything if we can't tell what's used.
+            LOGGER.warning('Could not read backup "{}"!', filename, exc_info=True)
+            return
+        used.update(entry.hash for entry in manifest.files.values())
+
+    obj_dir = os.path.join(backup_dir, AUTO_BACKUP_OBJECTS)
+    for dirpath, dirnames, filenames in os.walk(obj_dir):
+        for filename in filenames:
+            if filename.endswith('.xz') and filename[:-3] in used:
+                continue
+            LOGGER.debug('Removing unused backup file "{}"', filename)
+            os.remove(os.path.join(dirpath, filename))
+
+
 # Note: All the backup functions use zip files, but also work on FakeZip
-# directories.
+# directories and AutoBackups.
+
 
+def load_backup(zip_file, index_path: str=None):
+    """Load in a backup file.
 
-def load_backup(zip_file):
-    """Load in a backup file."""
+    If index_path is set, that file is used to store the header values of the
+    P2C files, so unchanged files don't need to be read.
+    """
     maps = []
     puzzles = [
         file[:-4]  # Strip extension
@@ -253,22 +640,57 @@ def load_backup(zip_file):
         zip_names(zip_file)
         if file.endswith('.p2c')
     ]
-    # Each P2C init requires reading in the properties file, so this may take
-    # some time. Use a loading screen.
-    reading_loader.set_length('READ', len(puzzles))
-    LOGGER.info('Loading {} maps..', len(puzzles))
-    with reading_loader:
-        for file in puzzles:
-            new_map = P2C.from_file(file, zip_file)
-            maps.append(new_map)
-            LOGGER.debug(
-                'Loading {} map "{}"',
-                'coop' if new_map.is_coop else 'sp',
-                new_map.title,
-            )
-            reading_loader.step('READ')
+
+    old_index = load_p2c_index(index_path) if index_path else {}
+    new_index = {}
+    headers = {}  # type: Dict[str, Optional[Dict[str, str]]]
+    to_read = []
+    for file in puzzles:
+        stamp = p2c_stamp(zip_file, file + '.p2c')
+        try:
+            old_stamp, header = old_index[file + '.p2c']
+        except KeyError:
+            pass
+        else:
+            if stamp is not None and stamp == old_stamp:
+                headers[file] = header
+                new_index[file + '.p2c'] = stamp, header
+                continue
+        to_read.append((file, stamp))
+
+    LOGGER.info(
+        'Loading {} maps, {} from the index..',
+        len(puzzles), len(puzzles) - len(to_read),
+    )
+    if to_read:
+        # Each of these requires reading the file, so this may take some
+        # time. Use a loading screen.
+        reading_loader.set_length('READ', len(to_read))
+        with reading_loader, ThreadPoolExecutor(P2C_READ_THREADS) as pool:
+            futures = {
+                pool.submit(read_p2c_header, file, zip_file): (file, stamp)
+                for file, stamp in to_read
+            }
+            for fut in as_completed(futures):
+                file, stamp = futures[fut]
+                headers[file] = header = fut.result()
+                if header is not None and stamp is not None:
+                    new_index[file + '.p2c'] = stamp, header
+                reading_loader.step('READ')
+
+    for file in puzzles:
+        new_map = P2C.from_header(file, zip_file, headers[file])
+        maps.append(new_map)
+        LOGGER.debug(
+            'Loading {} map "{}"',
+            'coop' if new_map.is_coop else 'sp',
+            new_map.title,
+        )
     LOGGER.info('Done!')
 
+    if index_path and new_index != old_index:
+        save_p2c_index(index_path, new_index)
+
     # It takes a while before the detail headers update positions,
     # so delay a refresh call.
     TK_ROOT.after(500, UI['game_details'].refresh)
@@ -283,8 +705,12 @@ def load_game(game: 'gameMan.Game'):
     puzz_path = find_puzzles(game)
     if puzz_path:
         zip_file = FakeZip(puzz_path)
+        index_path = utils.conf_location('config/puzzle_index/{}{}'.format(
+            srctools.whitelist(game.name, valid_chars=BACKUP_CHARS),
+            P2C_INDEX_EXT,
+        ))
         try:
-            BACKUPS['game'] = load_backup(zip_file)
+            BACKUPS['game'] = load_backup(zip_file, str(index_path))
         except loadScreen.Cancelled:
             return
 
@@ -354,6 +780,7 @@ def auto_backup(game: 'gameMan.Game', loader: loadScreen.LoadScreen):
     """Perform an automatic backup for the given game.
 
     We do this seperately since we don't need to read the property files.
+    Files are stored by hash, so unchanged puzzles are only compressed once.
     """
     from BEE2_config import GEN_OPTS
     if not GEN_OPTS.get_bool('General', 'enable_auto_backup'):
@@ -369,7 +796,10 @@ def auto_backup(game: 'gameMan.Game', loader: loadScreen.LoadScreen):
     # Keep this many previous
     extra_back_count = GEN_OPTS.get_int('General', 'auto_backup_count', 0)
 
-    to_backup = os.listdir(folder)
+    to_backup = [
+        file for file in os.listdir(folder)
+        if os.path.isfile(os.path.join(folder, file))
+    ]
     backup_dir = GEN_OPTS.get_val('Directories', 'backup_loc', 'backups/')
 
     os.makedirs(backup_dir, exist_ok=True)
@@ -381,8 +811,41 @@ def auto_backup(game: 'gameMan.Game', loader: loadScreen.LoadScreen):
         valid_chars=BACKUP_CHARS,
     )
 
+    _migrate_legacy_backups(backup_dir, safe_name, extra_back_count)
+
     loader.set_length(AUTO_BACKUP_STAGE, len(to_backup))
 
+    final_backup = os.path.join(
+        backup_dir,
+        AUTO_BACKUP_FILE.format(game=safe_name, ind=''),
+    )
+
+    # The previous backup records the hashes of files, so we can skip
+    # re-reading them.
+    try:
+        prev_files = AutoBackup.parse(final_backup).files
+    except FileNotFoundError:
+        prev_files = {}
+    except KeyValError:
+        LOGGER.warning('Could not parse previous backup!', exc_info=True)
+        prev_files = {}
+
+    LOGGER.info('Writing backup to "{}"', final_backup)
+    new_backup = AutoBackup(final_backup, {}, int(time.time()))
+    with ThreadPoolExecutor(AUTO_BACKUP_THREADS) as pool:
+        futures = {
+            pool.submit(
+                _store_backup_file,
+                backup_dir,
+                os.path.join(folder, file),
+                prev_files.get(file),
+            ): file
+            for file in to_backup
+        }
+        for fut in as_completed(futures):
+            new_backup.files[futures[fut]] = fut.result()
+            loader.step(AUTO_BACKUP_STAGE)
+
     if extra_back_count:
         back_files = [
             AUTO_BACKUP_FILE.format(game=safe_name, ind='')
@@ -391,7 +854,7 @@ def auto_backup(game: 'gameMan.Game', loader: loadScreen.LoadScreen):
             for i in range(extra_back_count)
         ]
         # Move each file over by 1 index, ignoring missing ones
-        # We need to reverse to ensure we don't overwrite any zips
+        # We need to reverse to ensure we don't overwrite any manifests.
         for old_name, new_name in reversed(
                 list(zip(back_files, back_files[1:]))
                 ):
@@ -402,29 +865,15 @@ def auto_backup(game: 'gameMan.Game', loader: loadScreen.LoadScreen):
             )
             old_name = os.path.join(backup_dir, old_name)
             new_name = os.path.join(backup_dir, new_name)
-            try:
-                os.remove(new_name)
-            except FileNotFoundError:
-                pass  # We're overwriting this anyway
-            try:
-                os.rename(old_name, new_name)
-            except FileNotFoundError:
-                pass
+            # Move the P2C index along with the manifest.
+            for ext in ['', P2C_INDEX_EXT]:
+                try:
+                    os.replace(old_name + ext, new_name + ext)
+                except FileNotFoundError:
+                    pass
 
-    final_backup = os.path.join(
-        backup_dir,
-        AUTO_BACKUP_FILE.format(game=safe_name, ind=''),
-    )
-    LOGGER.info('Writing backup to "{}"', final_backup)
-    with open(final_backup, 'wb') as f:
-        with ZipFile(f, mode='w', compression=ZIP_LZMA) as zip_file:
-            for file in to_backup:
-                zip_file.write(
-                    os.path.join(folder, file),
-                    file,
-                    ZIP_LZMA,
-                )
-                loader.step(AUTO_BACKUP_STAGE)
+    new_backup.save()
+    _clean_backup_objects(backup_dir)
 
 
 def save_backup():
@@ -563,11 +1012,18 @@ def ui_load_backup():
     """Prompt and load in a backup file."""
     file = filedialog.askopenfilename(
         title=_('Load Backup'),
-        filetypes=[(_('Backup zip'), '.zip')],
+        filetypes=[
+            (_('Backup zip'), '.zip'),
+            (_('Automatic backup'), AUTO_BACKUP_EXT),
+        ],
     )
     if not file:
         return
 
+    if file.endswith(AUTO_BACKUP_EXT):
+        load_auto_backup(file)
+        return
+
     BACKUPS['backup_path'] = file
     with open(file, 'rb') as f:
         # Read the backup zip into memory!
@@ -580,7 +1036,7 @@ def ui_load_backup():
         compression=ZIP_LZMA,
     )
     try:
-        BACKUPS['back'] = load_backup(zip_file)
+        BACKUPS['back'] = load_backup(zip_file, file + P2C_INDEX_EXT)
         BACKUPS['backup_zip'] = zip_file
 
         BACKUPS['backup_name'] = os.path.basename(file)
@@ -591,6 +1047,33 @@ def ui_load_backup():
         zip_file.close()
 
 
+def load_auto_backup(file: str) -> None:
+    """Load a generation of the automatic backup.
+
+    These can't be modified, so saving will ask for a new zip.
+    """
+    try:
+        auto_back = AutoBackup.parse(file)
+    except (OSError, KeyValError):
+        LOGGER.warning('Could not read backup "{}"!', file, exc_info=True)
+        messagebox.showerror(
+            _('BEE2 Backup'),
+            _('This backup could not be read!'),
+        )
+        return
+    try:
+        maps = load_backup(auto_back, file + P2C_INDEX_EXT)
+    except loadScreen.Cancelled:
+        return
+
+    # Saving writes a new zip, so start a new unsaved backup containing
+    # these maps.
+    ui_new_backup()
+    BACKUPS['back'] = maps
+    backup_name.set(_('Automatic Backup ({})').format(os.path.basename(file)))
+    refresh_back_details()
+
+
 def ui_new_backup():
     """Create a new backup file."""
     BACKUPS['back'].clear()
@@ -0,0 +1,139 @@
+"""Checks the map against the engine limits, before it is compiled.
+
+If the map has too many brushes, overlays or entities, registered strategies
+are applied in priority order to reduce the counts until the map fits.
+This lets a map compile with some decoration removed, instead of failing
+in VBSP.
+"""
+from collections import namedtuple
+
+from srctools import VMF
+import srctools.logger
+
+from typing import Callable, Dict, List, Tuple
+
+
+LOGGER = srctools.logger.get_logger(__name__)
+
+# The limits for each count - these match process_vbsp_log().
+LIMITS = {
+    'brush': 8192,
+    'overlay': 512,
+    'entity': 2048,
+}
+
+# Entities which VBSP compiles away, so they don't count towards the limit.
+COMPILED_ENTS = {
+    'func_detail',
+    'func_instance',
+    'func_instance_parms',
+    'func_instance_io_proxy',
+    'info_overlay',
+    'info_overlay_accessor',
+    'env_cubemap',
+    'info_lighting',
+    'info_null',
+    'func_viscluster',
+    'light',
+    'light_spot',
+    'light_environment',
+}
+
+# The function is passed the map and the amount the limit is exceeded by,
+# and returns a description of what it did if it changed anything.
+StrategyFunc = Callable[[VMF, int], str]
+Strategy = namedtuple('Strategy', ['priority', 'name', 'limit', 'func'])
+
+STRATEGIES = []  # type: List[Strategy]
+
+
+def strategy(limit: str, priority: int):
+    """Register a strategy for reducing a count.
+
+    Lower priorities are tried first.
+    """
+    if limit not in LIMITS:
+        raise ValueError('Unknown limit "{}"!'.format(limit))
+
+    def deco(func: StrategyFunc) -> StrategyFunc:
+        STRATEGIES.append(Strategy(priority, func.__name__, limit, func))
+        return func
+    return deco
+
+
+def count_map(vmf: VMF) -> Dict[str, int]:
+    """Count the brushes, overlays and entities in the map.
+
+    Instances are counted only as their own entity, since VBSP adds their
+    contents.
+    """
+    brushes = len(vmf.brushes)
+    entities = 1  # Worldspawn
+    for ent in vmf.entities:
+        brushes += len(ent.solids)
+        if ent['classname'].casefold() not in COMPILED_ENTS:
+            entities += 1
+    return {
+        'brush': brushes,
+        'overlay': len(vmf.by_class['info_overlay']),
+        'entity': entities,
+    }
+
+
+def plan(vmf: VMF) -> List[str]:
+    """Apply strategies until the map fits within the limits.
+
+    This returns a description of each change that was made.
+    """
+    counts = count_map(vmf)
+    LOGGER.info('Map counts: {}', counts)
+    actions = []
+
+    for strat in sorted(STRATEGIES, key=lambda strat: strat.priority):
+        excess = counts[strat.limit] - LIMITS[strat.limit]
+        if excess <= 0:
+            continue
+        result = strat.func(vmf, excess)
+        if result:
+            LOGGER.warning(
+                'Too many {}s ({}/{}), {}: {}',
+                strat.limit, counts[strat.limit], LIMITS[strat.limit],
+                strat.name, result,
+            )
+            actions.append(result)
+            counts = count_map(vmf)
+
+    for name, count in counts.items():
+        if count > LIMITS[name]:
+            LOGGER.warning(
+                'Map still has too many {}s ({}/{})!',
+                name, count, LIMITS[name],
+            )
+    if actions:
+        LOGGER.info('Map counts after reduction: {}', counts)
+    return actions
+
+
+@strategy('entity', priority=30)
+def collapse_logic_auto(vmf: VMF, excess: int) -> str:
+    """Merge together unnamed logic_autos, since they're all identical."""
+    # The global state controls when they fire, so it needs to match too.
+    by_flags = {}  # type: Dict[Tuple[str, str], List[srctools.Entity]]
+    for ent in vmf.by_class['logic_auto']:
+        if ent['targetname']:
+            continue
+        key = (ent['spawnflags', '1'], ent['globalstate'])
+        by_flags.setdefault(key, []).append(ent)
+
+    removed = 0
+    for ents in by_flags.values():
+        first, *rest = ents
+        for ent in rest:
+            if removed >= excess:
+                break
+            first.outputs.extend(ent.outputs)
+            ent.remove()
+            removed += 1
+    if removed:
+        return 'merged {} logic_auto entities'.format(removed)
+    return ''
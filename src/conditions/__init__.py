@@ -95,6 +95,25 @@ solidGroup = NamedTuple('solidGroup', [
 SOLIDS = {}  # type: Dict[Vec_tuple, solidGroup]
 
 
+# A marker instance found by instances_by_file().
+MarkerInst = NamedTuple('MarkerInst', [
+    ('inst', Entity),
+    ('file', str),  # The casefolded filename.
+    ('origin', Vec),
+    ('angles', Vec),
+])
+
+# Casefolded filename -> the instances using it. This is built on first use
+# by instances_by_file(), then kept up to date.
+_INST_BY_FILE = defaultdict(set)  # type: Dict[str, Set[Entity]]
+# The filename each instance is filed under in _INST_BY_FILE.
+_INST_FILE = {}  # type: Dict[Entity, str]
+# The original file value each instance had when indexed, used to cheaply
+# detect changes without casefolding.
+_INST_RAW_FILE = {}  # type: Dict[Entity, str]
+# The map the above was built for.
+_INST_INDEX_VMF = None  # type: Optional[srctools.VMF]
+
 # For each class, a list of item IDs of that type.
 ITEMS_WITH_CLASS = defaultdict(list)  # type: Dict[consts.ItemClass, List[str]]
 # For each item Id, the item class for it.
@@ -839,7 +858,76 @@ def add_suffix(inst: Entity, suff: str) -> None:
     """
     file = inst['file']
     old_name, dot, ext = file.partition('.')
-    inst['file'] = ''.join((old_name, suff, dot, ext))
+    set_inst_file(inst, ''.join((old_name, suff, dot, ext)))
+
+
+def _index_inst(inst: Entity) -> None:
+    """Add or move an instance in the filename index."""
+    raw_file = _INST_RAW_FILE[inst] = inst['file']
+    file = raw_file.casefold()
+    old_file = _INST_FILE.get(inst)
+    if old_file == file:
+        return
+    if old_file is not None:
+        _INST_BY_FILE[old_file].discard(inst)
+    _INST_FILE[inst] = file
+    _INST_BY_FILE[file].add(inst)
+
+
+def set_inst_file(inst: Entity, filename: str) -> None:
+    """Change the file used by an instance.
+
+    This updates the instances_by_file() index immediately. Files assigned
+    directly are detected on the next query instead.
+    """
+    inst['file'] = filename
+    if _INST_INDEX_VMF is not None and inst in _INST_FILE:
+        _index_inst(inst)
+
+
+def instances_by_file(
+    vmf: srctools.VMF,
+    files: Iterable[str],
+) -> List[MarkerInst]:
+    """Find all the instances in the map using any of the given files.
+
+    files should be casefolded, like the results of instanceLocs.resolve().
+    This allows generators to find their marker instances without each
+    needing to casefold and compare the file of every instance. The first
+    call builds an index. Later calls do a quick pass to update it for
+    instances that were added, removed or had their file changed, since
+    that can be done in many places.
+    """
+    global _INST_INDEX_VMF
+    all_inst = vmf.by_class['func_instance']
+    if _INST_INDEX_VMF is not vmf:
+        _INST_BY_FILE.clear()
+        _INST_FILE.clear()
+        _INST_RAW_FILE.clear()
+        _INST_INDEX_VMF = vmf
+
+    # Strings are compared without casefolding, and only changed or new
+    # instances are re-indexed.
+    raw_files = _INST_RAW_FILE
+    for inst in all_inst:
+        if raw_files.get(inst) != inst['file']:
+            _index_inst(inst)
+    if len(_INST_FILE) != len(all_inst):
+        # Some were removed from the map.
+        for inst in [inst for inst in _INST_FILE if inst not in all_inst]:
+            _INST_BY_FILE[_INST_FILE.pop(inst)].discard(inst)
+            del _INST_RAW_FILE[inst]
+
+    found = []
+    for file in set(files):
+        for inst in _INST_BY_FILE.get(file, ()):
+            found.append(MarkerInst(
+                inst,
+                file,
+                Vec.from_str(inst['origin']),
+                Vec.from_str(inst['angles']),
+            ))
+    return found
 
 
 def local_name(inst: Entity, name: Union[str, Entity]) -> str:
@@ -123,10 +123,8 @@ def res_antlaser(vmf: VMF, res: Property):
     # Find all the markers.
     nodes = {}  # type: Dict[str, Item]
 
-    for inst in vmf.by_class['func_instance']:
-        if inst['file'].casefold() not in conf_inst:
-            continue
-        name = inst['targetname']
+    for marker in conditions.instances_by_file(vmf, conf_inst):
+        name = marker.inst['targetname']
         try:
             # Remove the item - it's no longer going to exist after
             # we're done.
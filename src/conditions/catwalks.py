@@ -2,7 +2,7 @@
 import brushLoc
 from conditions import (
     make_result, RES_EXHAUSTED,
-    INST_ANGLE,
+    INST_ANGLE, instances_by_file,
 )
 import instanceLocs
 from srctools import Vec, Property, VMF, Entity
@@ -162,14 +162,11 @@ def res_make_catwalk(vmf: VMF, res: Property):
     markers = {}
 
     # Find all our markers, so we can look them up by targetname.
-    for inst in vmf.by_class['func_instance']:
-        if inst['file'].casefold() not in marker:
-            continue
+    for inst, file, origin, angles in instances_by_file(vmf, marker):
         links[inst] = Link()
         markers[inst['targetname']] = inst
 
         # Snap the markers to the grid. If on glass it can become offset...
-        origin = Vec.from_str(inst['origin'])
         origin = origin // 128 * 128
         origin += 64
 
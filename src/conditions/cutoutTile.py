@@ -1,7 +1,7 @@
 """Generate random quarter tiles, like in Destroyed or Retro maps."""
 import random
 from collections import defaultdict, namedtuple
-from typing import Tuple, Set
+from typing import Tuple, Set, Dict, Iterable
 
 import conditions
 import connections
@@ -163,11 +163,12 @@ def res_cutout_tile(vmf: srctools.VMF, res: Property):
             MATS[key] = [default]
 
     # Find our marker ents
-    for inst in vmf.by_class['func_instance']:
-        if inst['file'].casefold() not in marker_filenames:
-            continue
+    for inst, file, origin, angles in conditions.instances_by_file(
+        vmf,
+        marker_filenames,
+    ):
         targ = inst['targetname']
-        normal = Vec(0, 0, 1).rotate_by_str(inst['angles', '0 0 0'])
+        normal = Vec(0, 0, 1).rotate(*angles)
         # Check the orientation of the marker to figure out what to generate
         if normal == (0, 0, 1):
             io_list = FLOOR_IO
@@ -175,7 +176,7 @@ def res_cutout_tile(vmf: srctools.VMF, res: Property):
             io_list = CEIL_IO
 
         # Reuse orient to calculate where the solid face will be.
-        loc = Vec.from_str(inst['origin']) - 64 * normal
+        loc = origin - 64 * normal
         INST_LOCS[targ] = loc
 
         item = connections.ITEMS[targ]
@@ -353,6 +354,15 @@ def res_cutout_tile(vmf: srctools.VMF, res: Property):
             classname='func_detail',
         )
 
+        # Compute the noise for every tile on this level in one go.
+        noise_field = get_noise_field(
+            (tile_loc // 32
+                for x, y in xy_dict
+                for tile_loc in iter_tile_locs(Vec(x, y, z))
+            ),
+            noise,
+        )
+
         for x, y in xy_dict:
             convert_floor(
                 vmf,
@@ -363,7 +373,7 @@ def res_cutout_tile(vmf: srctools.VMF, res: Property):
                 sign_locs,
                 detail_ent,
                 noise_weight=weights[x, y],
-                noise_func=noise,
+                noise_field=noise_field,
             )
 
     add_floor_sides(vmf, floor_edges)
@@ -373,18 +383,49 @@ def res_cutout_tile(vmf: srctools.VMF, res: Property):
     return conditions.RES_EXHAUSTED
 
 
-def get_noise(loc: Vec, noise_func: SimplexNoise):
-    """Generate a number between 0 and 1.
-
-    This is used to determine where tiles are placed.
+def get_noise_field(
+    locs: Iterable[Vec],
+    noise_func: SimplexNoise,
+) -> Dict[Tuple[float, float, float], float]:
+    """Generate a number between 0 and 1 for each location.
+
+    This is used to determine where tiles are placed. Each location is
+    averaged with its 3x3 neighbourhood to smooth out changes. The raw noise
+    is computed for every needed point in a single batch, so samples shared
+    by neighbouring locations are only computed once.
+    This returns a dict mapping the location tuples to the value.
     """
-    # Average between the neighbouring locations, to smooth out changes.
-    return sum(
-        # + 1 / 2 fixes the value range (originally -1,1 -> 0,1)
-        (noise_func.noise3(loc.x + x, loc.y + y, loc.z) + 1) / 2
-        for x in (-1, 0, 1)
-        for y in (-1, 0, 1)
-    ) / 9
+    centers = {loc.as_tuple() for loc in locs}
+    if not centers:
+        return {}
+
+    points = list({
+        (x + off_x, y + off_y, z)
+        for x, y, z in centers
+        for off_x in (-1, 0, 1)
+        for off_y in (-1, 0, 1)
+    })
+    xs, ys, zs = zip(*points)
+    samples = dict(zip(points, map(
+        float,
+        noise_func.noise3_many(xs, ys, zs),
+    )))
+
+    return {
+        (x, y, z): sum(
+            # + 1 / 2 fixes the value range (originally -1,1 -> 0,1)
+            (samples[x + off_x, y + off_y, z] + 1) / 2
+            for off_x in (-1, 0, 1)
+            for off_y in (-1, 0, 1)
+        ) / 9
+        for x, y, z in centers
+    }
+
+
+def iter_tile_locs(loc: Vec):
+    """Yield the centers of the 4x4 quarter-tiles in the given block."""
+    for x, y in utils.iter_grid(max_x=4, max_y=4):
+        yield loc + (x * 32 + 16 - 64, y * 32 + 16 - 64, 0)
 
 
 def convert_floor(
@@ -396,7 +437,7 @@ def convert_floor(
     signage_loc,
     detail,
     noise_weight,
-    noise_func: SimplexNoise,
+    noise_field: Dict[Tuple[float, float, float], float],
 ):
     """Cut out tiles at the specified location."""
     # We pop it, so the face isn't detected by other logic - otherwise it'll
@@ -436,11 +477,7 @@ def convert_floor(
         plane.z -= FLOOR_DEPTH
     brush.face.mat = random.choice(mats['floorbase'])
 
-    loc.x -= 64
-    loc.y -= 64
-
-    for x, y in utils.iter_grid(max_x=4, max_y=4):
-        tile_loc = loc + (x * 32 + 16, y * 32 + 16, 0)
+    for tile_loc in iter_tile_locs(loc):
         if tile_loc.as_tuple() in signage_loc:
             # Force the tile to be present under signage..
             should_make_tile = True
@@ -449,7 +486,7 @@ def convert_floor(
             signage_loc.remove(tile_loc.as_tuple())
         else:
             # Create a number between 0-100
-            rand = 100 * get_noise(tile_loc // 32, noise_func) + 10
+            rand = 100 * noise_field[(tile_loc // 32).as_tuple()] + 10
 
             # Adjust based on the noise_weight value, so boundries have more tiles
             rand *= 0.1 + 0.9 * (1 - noise_weight)
@@ -754,21 +791,30 @@ def make_displacement(
         # We can duplicate immutable strings fine..
         face.disp_data[key] = [val * grid_size] * grid_size
 
-    face.disp_data['alphas'] = [
-        ' '.join(
-            str(512 * get_noise(
-                Vec(
-                    bbox_min.x + x * x_vert,
-                    bbox_min.y + y * y_vert,
-                    bbox_min.z,
-                ) // max(x_vert, y_vert),
-                noise,
-            ))
+    alpha_locs = [
+        [
+            Vec(
+                bbox_min.x + x * x_vert,
+                bbox_min.y + y * y_vert,
+                bbox_min.z,
+            ) // max(x_vert, y_vert)
             for x in
             range(grid_size)
-        )
+        ]
         for y in range(grid_size)
     ]
+    noise_field = get_noise_field(
+        (loc for row in alpha_locs for loc in row),
+        noise,
+    )
+
+    face.disp_data['alphas'] = [
+        ' '.join(
+            str(512 * noise_field[loc.as_tuple()])
+            for loc in row
+        )
+        for row in alpha_locs
+    ]
 
 
 def add_floor_sides(vmf: VMF, locs):
@@ -1,5 +1,8 @@
 """Adds breakable glass."""
-from conditions import make_result_setup, make_result, RES_EXHAUSTED, local_name
+from conditions import (
+    make_result_setup, make_result, RES_EXHAUSTED, local_name,
+    instances_by_file,
+)
 from instanceLocs import resolve as resolve_inst
 from srctools import Property, Vec, VMF, Solid, Side, Entity, Output
 
@@ -77,14 +80,11 @@ def find_glass_items(config, vmf: VMF) -> Iterator[Tuple[str, Vec, Vec, Vec, dic
     """
     # targetname -> min, max, normal, config
     glass_items = {}  # type: Dict[str, Tuple[Vec, Vec, Vec, dict]]
-    for inst in vmf.by_class['func_instance']:  # type: Entity
-        try:
-            conf = config[inst['file'].casefold()]
-        except KeyError:
-            continue
+    for inst, file, origin, angles in instances_by_file(vmf, config):
+        conf = config[file]
         targ = inst['targetname']
-        norm = Vec(x=1).rotate_by_str(inst['angles'])
-        origin = Vec.from_str(inst['origin']) - 64 * norm
+        norm = Vec(x=1).rotate(*angles)
+        origin -= 64 * norm
         try:
             bbox_min, bbox_max, group_norm, group_conf = glass_items[targ]
         except KeyError:
@@ -153,7 +153,10 @@ def flag_instvar(inst: Entity, flag: Property):
 @make_result('rename', 'changeInstance')
 def res_change_instance(inst: Entity, res: Property):
     """Set the file to a value."""
-    inst['file'] = instanceLocs.resolve_one(res.value, error=True)
+    conditions.set_inst_file(
+        inst,
+        instanceLocs.resolve_one(res.value, error=True),
+    )
 
 
 @make_result('suffix', 'instSuffix')
@@ -6,6 +6,7 @@ from srctools import Property, Vec, Entity
 import conditions
 import srctools
 import instance_traits
+import rand
 
 from conditions import (
     Condition, make_flag,  make_result, make_result_setup, RES_EXHAUSTED,
@@ -14,21 +15,21 @@ from conditions import (
 COND_MOD_NAME = 'Randomisation'
 
 
-def set_random_seed(inst: Entity, seed: str) -> None:
-    """Compute and set a random seed for a specific entity."""
+def set_random_seed(inst: Entity, seed: str) -> random.Random:
+    """Compute a random generator for a specific entity."""
     name = inst['targetname']
     # The global instances like elevators always get the same name, or
     # none at all so we cannot use those for the seed. Instead use the global
     # seed.
     if name == '' or 'preplaced' in instance_traits.get(inst):
         import vbsp
-        random.seed('{}{}{}{}'.format(
+        return rand.seed('{}{}{}{}'.format(
             vbsp.MAP_RAND_SEED, seed, inst['origin'], inst['angles'],
         ))
     else:
         # We still need to use angles and origin, since things like
         # fizzlers might not get unique names.
-        random.seed('{}{}{}{}'.format(
+        return rand.seed('{}{}{}{}'.format(
             inst['targetname'], seed, inst['origin'], inst['angles']
         ))
 
@@ -46,8 +47,8 @@ def flag_random(inst: Entity, res: Property) -> bool:
     # Allow ending with '%' sign
     chance = srctools.conv_int(chance.rstrip('%'), 100)
 
-    set_random_seed(inst, seed)
-    return random.randrange(100) < chance
+    rng = set_random_seed(inst, seed)
+    return rng.randrange(100) < chance
 
 
 @make_result_setup('random')
@@ -101,11 +102,11 @@ def res_random(inst: Entity, res: Property) -> None:
     # Otherwise the chances would be messed up.
     seed, chance, weight, results = res.value  # type: str, float, List[int], List[Property]
 
-    set_random_seed(inst, seed)
-    if random.randrange(100) > chance:
+    rng = set_random_seed(inst, seed)
+    if rng.randrange(100) > chance:
         return
 
-    ind = random.choice(weight)
+    ind = rng.choice(weight)
     choice = results[ind]
     if choice.name == 'nop':
         pass
@@ -167,8 +168,8 @@ def res_add_variant(inst: Entity, res: Property) -> None:
     Alternatively, you can use `"variant" "number"` to choose from equally-weighted
     options.
     """
-    set_random_seed(inst, 'variant')
-    conditions.add_suffix(inst, "_var" + str(random.choice(res.value) + 1))
+    rng = set_random_seed(inst, 'variant')
+    conditions.add_suffix(inst, "_var" + str(rng.choice(res.value) + 1))
 
 
 @make_result('RandomNum')
@@ -186,12 +187,12 @@ def res_rand_num(inst: Entity, res: Property) -> None:
     var = res['resultvar', '$random']
     seed = 'd' + res['seed', 'random']
 
-    set_random_seed(inst, seed)
+    rng = set_random_seed(inst, seed)
 
     if is_float:
-        func = random.uniform
+        func = rng.uniform
     else:
-        func = random.randint
+        func = rng.randint
 
     inst.fixup[var] = str(func(min_val, max_val))
 
@@ -207,12 +208,12 @@ def res_rand_vec(inst: Entity, res: Property) -> None:
     is_float = srctools.conv_bool(res['decimal'])
     var = res['resultvar', '$random']
 
-    set_random_seed(inst, 'e' + res['seed', 'random'])
+    rng = set_random_seed(inst, 'e' + res['seed', 'random'])
 
     if is_float:
-        func = random.uniform
+        func = rng.uniform
     else:
-        func = random.randint
+        func = rng.randint
 
     value = Vec()
 
@@ -257,12 +258,12 @@ def res_rand_inst_shift(inst: Entity, res: Property) -> None:
         seed,
     ) = res.value  # type: float, float, float, float, float, float, str
 
-    set_random_seed(inst, seed)
+    rng = set_random_seed(inst, seed)
 
     offset = Vec(
-        random.uniform(min_x, max_x),
-        random.uniform(min_y, max_y),
-        random.uniform(min_z, max_z),
+        rng.uniform(min_x, max_x),
+        rng.uniform(min_y, max_y),
+        rng.uniform(min_z, max_z),
     )
 
     offset.rotate_by_str(inst['angles'])
@@ -9,7 +9,7 @@ import vbsp_options
 import comp_consts as const
 import connections
 from conditions import (
-    make_result, RES_EXHAUSTED,
+    make_result, RES_EXHAUSTED, instances_by_file,
 )
 from srctools import Property, Vec, Output, VMF
 
@@ -53,15 +53,11 @@ def res_resizeable_trigger(vmf: VMF, res: Property):
 
     marker_names = set()
 
-    inst = None
-
-    for inst in vmf.by_class['func_instance']:
-        if inst['file'].casefold() in marker:
-            marker_names.add(inst['targetname'])
-            # Unconditionally delete from the map, so it doesn't
-            # appear even if placed wrongly.
-            inst.remove()
-    del inst  # Make sure we don't use this later.
+    for marker_inst in instances_by_file(vmf, marker):
+        marker_names.add(marker_inst.inst['targetname'])
+        # Unconditionally delete from the map, so it doesn't
+        # appear even if placed wrongly.
+        marker_inst.inst.remove()
 
     if not marker_names:  # No markers in the map - abort
         return RES_EXHAUSTED
@@ -4,7 +4,7 @@ from typing import Set, Dict, Tuple
 import conditions
 import srctools.logger
 from conditions import (
-    make_result, RES_EXHAUSTED,
+    make_result, RES_EXHAUSTED, instances_by_file,
 )
 import instanceLocs
 from srctools import Vec, Property, Entity, VMF
@@ -53,10 +53,9 @@ def res_track_plat(vmf: VMF, res: Property):
 
     # All the track_set in the map, indexed by origin
     track_instances = {
-        Vec.from_str(inst['origin']).as_tuple(): inst
-        for inst in
-        vmf.by_class['func_instance']
-        if inst['file'].casefold() in track_files
+        marker.origin.as_tuple(): marker.inst
+        for marker in
+        instances_by_file(vmf, track_files)
     }
 
     LOGGER.debug('Track instances:')
@@ -71,17 +70,11 @@ def res_track_plat(vmf: VMF, res: Property):
 
     # Now we loop through all platforms in the map, and then locate their
     # track_set
-    for plat_inst in vmf.by_class['func_instance']:
-        if plat_inst['file'].casefold() not in platforms:
-            continue  # Not a platform!
-
+    for plat_inst, file, plat_loc, plat_angles in instances_by_file(vmf, platforms):
         LOGGER.debug('Modifying "' + plat_inst['targetname'] + '"!')
 
-        plat_loc = Vec.from_str(plat_inst['origin'])
         # The direction away from the wall/floor/ceil
-        normal = Vec(0, 0, 1).rotate_by_str(
-            plat_inst['angles']
-        )
+        normal = Vec(0, 0, 1).rotate(*plat_angles)
 
         for tr_origin, first_track in track_instances.items():
             if plat_loc == tr_origin:
@@ -8,7 +8,7 @@ import template_brush
 import vbsp
 from conditions import (
     make_result, make_result_setup, RES_EXHAUSTED,
-    GOO_LOCS, SOLIDS
+    GOO_LOCS, SOLIDS, instances_by_file,
 )
 import instanceLocs
 from srctools import (
@@ -174,11 +174,8 @@ def res_make_vactubes(res: Property):
     markers = {}
 
     # Find all our markers, so we can look them up by targetname.
-    for inst in vbsp.VMF.by_class['func_instance']:  # type: Entity
-        try:
-            config, inst_size = INST_CONFIGS[inst['file'].casefold()]
-        except KeyError:
-            continue  # Not a marker
+    for inst, file, origin, angles in instances_by_file(vbsp.VMF, INST_CONFIGS):
+        config, inst_size = INST_CONFIGS[file]
 
         # Remove the original instance from the level - we spawn entirely new
         # ones.
@@ -5,6 +5,7 @@ the outputs with optimisations and custom settings.
 """
 from enum import Enum
 from collections import defaultdict
+from array import array
 
 from srctools import VMF, Entity, Output, Property, conv_bool, Vec
 import comp_consts as const
@@ -670,32 +671,125 @@ class Connection:
         item.outputs.add(self)
 
 
-def collapse_item(item: Item) -> None:
-    """Remove an item with a single input, transferring all IO."""
-    input_conn: Connection
-    try:
-        [input_conn] = item.inputs
-        input_item = input_conn.from_item
-    except ValueError:
-        raise ValueError('Too many inputs for "{}"!'.format(item.name))
-
-    LOGGER.debug('Merging "{}" into "{}"...', item.name, input_item.name)
-
-    input_conn.remove()
-
-    input_item.antlines |= item.antlines
-    input_item.ind_panels |= item.ind_panels
-    input_item.shape_signs += item.shape_signs
-
-    item.antlines.clear()
-    item.ind_panels.clear()
-    item.shape_signs.clear()
+class ItemGraph:
+    """An indexed view of item connections, for graph passes over the IO.
 
-    for conn in list(item.outputs):
-        conn.from_item = input_item
-
-    del ITEMS[item.name]
-    item.inst.remove()
+    Each item is given an integer ID, and connections are stored in arrays
+    keyed by ID along with in/out degree counts. All changes made through
+    the graph are also applied to the Item and Connection objects, so both
+    remain in sync. Items which are removed from the graph keep their
+    outgoing connections, since those may still count as inputs.
+    """
+    def __init__(self, items: Iterable[Item]=()) -> None:
+        # Node ID -> item, or None if removed.
+        self.items = []  # type: List[Optional[Item]]
+        self.ids = {}  # type: Dict[Item, int]
+
+        # Connection ID -> connection, or None if removed.
+        self.conns = []  # type: List[Optional[Connection]]
+        self.conn_ids = {}  # type: Dict[Connection, int]
+        self.conn_from = array('i')
+        self.conn_to = array('i')
+
+        # Node ID -> connection IDs.
+        self.in_conns = []  # type: List[List[int]]
+        self.out_conns = []  # type: List[List[int]]
+        self.in_degree = array('i')
+        self.out_degree = array('i')
+
+        for item in items:
+            self.node(item)
+        # Items not in the list are added when found, so check those too.
+        node = 0
+        while node < len(self.items):
+            item = self.items[node]
+            for conn in item.inputs | item.outputs:
+                if conn not in self.conn_ids:
+                    self._add_conn(conn)
+            node += 1
+
+    def node(self, item: Item) -> int:
+        """Return the ID for an item, adding it if required."""
+        try:
+            return self.ids[item]
+        except KeyError:
+            pass
+        node = self.ids[item] = len(self.items)
+        self.items.append(item)
+        self.in_conns.append([])
+        self.out_conns.append([])
+        self.in_degree.append(0)
+        self.out_degree.append(0)
+        return node
+
+    def _add_conn(self, conn: Connection) -> int:
+        """Add an existing connection to the indexes."""
+        conn_id = self.conn_ids[conn] = len(self.conns)
+        from_node = self.node(conn.from_item)
+        to_node = self.node(conn.to_item)
+        self.conns.append(conn)
+        self.conn_from.append(from_node)
+        self.conn_to.append(to_node)
+        self.out_conns[from_node].append(conn_id)
+        self.in_conns[to_node].append(conn_id)
+        self.out_degree[from_node] += 1
+        self.in_degree[to_node] += 1
+        return conn_id
+
+    def sources(self, node: int) -> List[int]:
+        """Return the nodes connecting to this one."""
+        return [self.conn_from[conn_id] for conn_id in self.in_conns[node]]
+
+    def targets(self, node: int) -> List[int]:
+        """Return the nodes this one connects to."""
+        return [self.conn_to[conn_id] for conn_id in self.out_conns[node]]
+
+    def remove_conn(self, conn_id: int) -> None:
+        """Delete a connection entirely."""
+        conn = self.conns[conn_id]
+        conn.remove()
+        self.conns[conn_id] = None
+        del self.conn_ids[conn]
+
+        from_node = self.conn_from[conn_id]
+        to_node = self.conn_to[conn_id]
+        self.out_conns[from_node].remove(conn_id)
+        self.in_conns[to_node].remove(conn_id)
+        self.out_degree[from_node] -= 1
+        self.in_degree[to_node] -= 1
+
+    def set_source(self, conn_id: int, node: int) -> None:
+        """Change the item a connection comes from."""
+        old_node = self.conn_from[conn_id]
+        self.conns[conn_id].from_item = self.items[node]
+        self.conn_from[conn_id] = node
+        self.out_conns[old_node].remove(conn_id)
+        self.out_conns[node].append(conn_id)
+        self.out_degree[old_node] -= 1
+        self.out_degree[node] += 1
+
+    def set_target(self, conn_id: int, node: int) -> None:
+        """Change the item a connection goes to."""
+        old_node = self.conn_to[conn_id]
+        self.conns[conn_id].to_item = self.items[node]
+        self.conn_to[conn_id] = node
+        self.in_conns[old_node].remove(conn_id)
+        self.in_conns[node].append(conn_id)
+        self.in_degree[old_node] -= 1
+        self.in_degree[node] += 1
+
+    def remove_item(self, node: int) -> Item:
+        """Remove an item from the graph, and the map.
+
+        Any remaining outputs are left in place.
+        """
+        item = self.items[node]
+        self.items[node] = None
+        del self.ids[item]
+        if ITEMS.get(item.name) is item:
+            del ITEMS[item.name]
+        item.inst.remove()
+        return item
 
 
 def read_configs(conf: Property) -> None:
@@ -934,43 +1028,105 @@ def res_change_io_type(inst: Entity, res: Property) -> None:
     item.sec_disable_cmd = res.value.sec_disable_cmd
 
 
-def do_item_optimisation(vmf: VMF) -> None:
-    """Optimise redundant logic items."""
+def do_item_optimisation(vmf: VMF) -> int:
+    """Optimise redundant logic items.
+
+    This repeatedly removes logic gates which are useless, until no more
+    can be removed:
+
+    * Gates with no inputs never change, so the antlines can be static.
+    * Gates with a single input are replaced by that input.
+    * Gates with no outputs and no antlines do nothing.
+    * An AND/OR gate feeding only into another of the same type can be
+      merged into that gate.
+
+    The number of entities removed is returned.
+    """
     needs_global_toggle = False
+    removed = 0
 
-    for item in list(ITEMS.values()):
-        # We can't remove items that have functionality, or don't have IO.
-        if item.item_type is None or not item.item_type.input_type.is_logic:
-            continue
+    graph = ItemGraph(ITEMS.values())
+    todo = list(range(len(graph.items)))
+    queued = set(todo)
 
-        prim_inverted = conv_bool(conditions.resolve_value(
-            item.inst,
-            item.item_type.invert_var,
-        ))
+    def requeue(nodes: Iterable[int]) -> None:
+        """Check these items again later."""
+        for node in nodes:
+            if node not in queued:
+                queued.add(node)
+                todo.append(node)
 
-        sec_inverted = conv_bool(conditions.resolve_value(
-            item.inst,
-            item.item_type.sec_invert_var,
-        ))
+    while todo:
+        node = todo.pop()
+        queued.discard(node)
+        item = graph.items[node]
 
-        # Don't optimise if inverted.
-        if prim_inverted or sec_inverted:
+        if item is None or not can_optimise_item(item):
             continue
-        inp_count = len(item.inputs)
+
+        inp_count = graph.in_degree[node]
+        out_count = graph.out_degree[node]
+        if inp_count == 1 and graph.items[graph.sources(node)[0]] is None:
+            # Our only input was removed, so this can never change either.
+            inp_count = 0
+
         if inp_count == 0:
             # Totally useless, remove.
             # We just leave the panel entities, and tie all the antlines
-            # to the same toggle.
+            # to the same toggle. The outputs are kept, since those still
+            # count as inputs for the items they go to.
             needs_global_toggle = True
             for ent in item.antlines:
                 ent['targetname'] = '_static_ind'
 
-            del ITEMS[item.name]
-            item.inst.remove()
+            graph.remove_item(node)
+            removed += 1
         elif inp_count == 1:
             # Only one input, so AND or OR are useless.
             # Transfer input item to point to the output(s).
-            collapse_item(item)
+            [input_conn] = graph.in_conns[node]
+            input_node = graph.conn_from[input_conn]
+            LOGGER.debug(
+                'Merging "{}" into "{}"...',
+                item.name, graph.items[input_node].name,
+            )
+            graph.remove_conn(input_conn)
+            item.transfer_antlines(graph.items[input_node])
+            for conn_id in list(graph.out_conns[node]):
+                graph.set_source(conn_id, input_node)
+
+            graph.remove_item(node)
+            removed += 1
+            requeue([input_node])
+            requeue(graph.targets(input_node))
+        elif out_count == 0 and not (
+            item.antlines or item.ind_panels or item.shape_signs or
+            item.timer is not None
+        ):
+            # Nothing is affected by this, so it can be dropped.
+            LOGGER.debug('Removing unused "{}"...', item.name)
+            sources = graph.sources(node)
+            for conn_id in list(graph.in_conns[node]):
+                graph.remove_conn(conn_id)
+            graph.remove_item(node)
+            removed += 1
+            requeue(sources)
+        elif out_count == 1:
+            [out_conn] = graph.out_conns[node]
+            out_node = graph.conn_to[out_conn]
+            out_item = graph.items[out_node]
+            if out_item is None or not can_merge_gates(item, out_item):
+                continue
+            # AND(AND(a, b), c) == AND(a, b, c), and the same for OR.
+            LOGGER.debug('Merging "{}" into "{}"...', item.name, out_item.name)
+            sources = graph.sources(node)
+            graph.remove_conn(out_conn)
+            for conn_id in list(graph.in_conns[node]):
+                graph.set_target(conn_id, out_node)
+            graph.remove_item(node)
+            removed += 1
+            requeue([out_node])
+            requeue(sources)
 
     # The antlines need a toggle entity, otherwise they'll copy random other
     # overlays.
@@ -981,6 +1137,49 @@ def do_item_optimisation(vmf: VMF) -> None:
             targetname='_static_ind_tog',
             target='_static_ind',
         )
+        # Which costs us an entity.
+        removed -= 1
+
+    return removed
+
+
+def can_optimise_item(item: Item) -> bool:
+    """Check if this item is a logic gate which may be optimised away."""
+    # We can't remove items that have functionality, or don't have IO.
+    if item.item_type is None or not item.item_type.input_type.is_logic:
+        return False
+
+    prim_inverted = conv_bool(conditions.resolve_value(
+        item.inst,
+        item.item_type.invert_var,
+    ))
+
+    sec_inverted = conv_bool(conditions.resolve_value(
+        item.inst,
+        item.item_type.sec_invert_var,
+    ))
+
+    # Don't optimise if inverted.
+    return not (prim_inverted or sec_inverted)
+
+
+def can_merge_gates(item: Item, out_item: Item) -> bool:
+    """Check if a logic gate can be merged into the gate it outputs to."""
+    if item is out_item or not can_optimise_item(out_item):
+        return False
+    if item.item_type.input_type is not out_item.item_type.input_type:
+        return False
+    # Spawn-firing changes the initial state, so that can't be merged.
+    if (
+        item.item_type.spawn_fire is not FeatureMode.NEVER or
+        out_item.item_type.spawn_fire is not FeatureMode.NEVER
+    ):
+        return False
+    # If we have indicators or a timer, we need to exist separately.
+    return not (
+        item.antlines or item.ind_panels or item.shape_signs or
+        item.timer is not None
+    )
 
 
 @conditions.meta_cond(-250, only_once=True)
@@ -1020,10 +1219,32 @@ def gen_item_outputs(vmf: VMF) -> None:
                 # Use the affinity of the target.
                 conn.type = conn.to_item.item_type.default_dual
 
-    do_item_optimisation(vmf)
+    item_count = len(ITEMS)
+    ents_saved = do_item_optimisation(vmf)
+    relays_skipped = 0
 
     has_timer_relay = False
 
+    # Restyle all the antlines together, so broken antlines can be limited
+    # to the overlays we have left.
+    antline_batch = []
+    for item in ITEMS.values():
+        if item.item_type is None:
+            continue
+        ant_name = '@{}_overlay'.format(item.name)
+        for ind in item.antlines:
+            ind['targetname'] = ant_name
+            antline_batch.append((ind, item.ant_wall_style, item.ant_floor_style))
+    overlays_added = antlines.style_antlines(
+        vmf,
+        antline_batch,
+        budget=max(0, antlines.OVERLAY_LIMIT - len(vmf.by_class['info_overlay'])),
+    )
+    LOGGER.info(
+        'Styled {} antlines, using {} extra overlays.',
+        len(antline_batch), overlays_added,
+    )
+
     # We go 'backwards', creating all the inputs for each item.
     # That way we can change behaviour based on item counts.
     for item in ITEMS.values():
@@ -1036,8 +1257,12 @@ def gen_item_outputs(vmf: VMF) -> None:
             item.item_type.timer_done_cmd
         ):
             has_sound = item.item_type.force_timer_sound or len(item.ind_panels) > 0
-            add_timer_relay(item, has_sound)
-            has_timer_relay = has_timer_relay or has_sound
+            if has_sound or item.item_type.timer_done_cmd:
+                add_timer_relay(item, has_sound)
+                has_timer_relay = has_timer_relay or has_sound
+            else:
+                # The relay wouldn't have any outputs.
+                relays_skipped += 1
 
         # Add outputs for antlines.
         if item.antlines or item.ind_panels:
@@ -1164,7 +1389,12 @@ def gen_item_outputs(vmf: VMF) -> None:
                 logic_auto.add_out(out)
                 out.only_once = True
 
-    LOGGER.info('Item IO generated.')
+    LOGGER.info(
+        'Item IO generated, optimised {} -> {} items '
+        '({} entities, {} timer relays saved).',
+        item_count, len(ITEMS),
+        ents_saved, relays_skipped,
+    )
 
 
 def add_locking(item: Item) -> None:
@@ -1625,16 +1855,15 @@ def add_item_indicators(
     inst_type: PanelSwitchingStyle,
     pan_item: ItemType,
 ) -> None:
-    """Generate the commands for antlines, and restyle them."""
+    """Generate the commands for antlines.
+
+    The antlines must have already been named and restyled.
+    """
     ant_name = '@{}_overlay'.format(item.name)
     has_sign = len(item.ind_panels) > 0
 
-    for ind in item.antlines:
-        ind['targetname'] = ant_name
-        antlines.style_antline(ind, item.ant_wall_style, item.ant_floor_style)
-
     # If the antline material doesn't toggle, the name is removed by
-    # style_antline(). So check if the overlay actually exists still, to
+    # style_antlines(). So check if the overlay actually exists still, to
     # see if we need to add the toggle.
     has_ant = len(item.inst.map.by_target[ant_name]) > 0
 
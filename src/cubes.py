@@ -1038,12 +1038,11 @@ def link_cubes(vmf: VMF):
     # Cube items.
     cubes = []  # type: List[Tuple[Entity, CubeType]]
 
-    for inst in vmf.by_class['func_instance']:
-        try:
-            inst_type = inst_to_type[inst['file'].casefold()]
-        except KeyError:
-            # Not a cube or dropper!
-            continue
+    for inst, file, origin, angles in conditions.instances_by_file(
+        vmf,
+        inst_to_type,
+    ):
+        inst_type = inst_to_type[file]
 
         # A dropper.
         if isinstance(inst_type, DropperType):
@@ -1059,7 +1058,7 @@ def link_cubes(vmf: VMF):
                     )
                 dropper_timer[timer] = inst, inst_type
             # For setup later.
-            dropper_pos[Vec.from_str(inst['origin']).as_tuple()] = inst, inst_type
+            dropper_pos[origin.as_tuple()] = inst, inst_type
             used_droppers[inst] = False
 
         # A cube.
@@ -1165,28 +1164,24 @@ def link_cubes(vmf: VMF):
 
     LOGGER.info('SPLAT File: {}', splat_inst)
 
-    for inst in vmf.by_class['func_instance']:
-        file = inst['file'].casefold()
-
+    for inst, file, origin, angles in conditions.instances_by_file(
+        vmf,
+        colorizer_inst + splat_inst,
+    ):
         if file in colorizer_inst:
             file = colorizer_inst
-        elif file in splat_inst:
-            file = splat_inst
         else:
-            # Not one we care about.
-            continue
+            file = splat_inst
 
         pairs = []  # type: List[CubePair]
 
-        origin = Vec.from_str(inst['origin'])
-
         with suppress(KeyError):
             pairs.append(CUBE_POS[origin.as_tuple()])
 
         # If pointing up, check the ceiling too, so droppers can find a
         # colorizer
         # placed on the illusory cube item under them.
-        if Vec(z=1).rotate_by_str(inst['angles']) == (0, 0, 1):
+        if Vec(z=1).rotate(*angles) == (0, 0, 1):
             pos = brushLoc.POS.raycast_world(
                 origin,
                 direction=(0, 0, 1),
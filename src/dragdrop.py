@@ -94,6 +94,12 @@ class Manager(Generic[ItemT]):
         # While dragging, the place we started at.
         self._cur_prev_slot = None  # type: Optional[Slot[ItemT]]
 
+        # A grid of target slot positions, used to find the slot under the
+        # cursor. Each cell is the size of a slot, and contains the slots
+        # overlapping it in order. This is built when first needed, and cleared
+        # whenever slots move.
+        self._slot_grid = None  # type: Optional[Dict[Tuple[int, int], List[Tuple[Slot[ItemT], int, int, int, int]]]]
+
         self._callbacks = {
             event: []
             for event in Event
@@ -133,6 +139,7 @@ class Manager(Generic[ItemT]):
             self._sources.append(slot)
         else:
             self._targets.append(slot)
+            self._slot_grid = None
 
         return slot
 
@@ -177,6 +184,7 @@ class Manager(Generic[ItemT]):
         padding is the amount added on each side of each slot.
         """
         canv.delete(_CANV_TAG)
+        self._slot_grid = None
         item_width = self.width + spacing * 2
         item_height = self.width + spacing * 2
 
@@ -224,19 +232,37 @@ class Manager(Generic[ItemT]):
         for cback in self._callbacks[event]:
             cback(slot)
 
-    def _pos_slot(self, x: float, y: float) -> 'Optional[Slot[ItemT]]':
-        """Find the slot under this X,Y (if any)."""
+    def _build_slot_grid(self) -> None:
+        """Record the position of all target slots in the grid."""
+        self._slot_grid = grid = {}
         for slot in self._targets:
-            if slot._pos_type is not None:
-                lbl = slot._lbl
-                if in_bbox(
-                    x, y,
-                    lbl.winfo_rootx(),
-                    lbl.winfo_rooty(),
-                    lbl.winfo_width(),
-                    lbl.winfo_height(),
+            if slot._pos_type is None:
+                continue
+            lbl = slot._lbl
+            left = lbl.winfo_rootx()
+            top = lbl.winfo_rooty()
+            width = lbl.winfo_width()
+            height = lbl.winfo_height()
+            for cell_x in range(
+                int(left // self.width),
+                int((left + width) // self.width) + 1,
+            ):
+                for cell_y in range(
+                    int(top // self.height),
+                    int((top + height) // self.height) + 1,
                 ):
-                    return slot
+                    grid.setdefault((cell_x, cell_y), []).append(
+                        (slot, left, top, width, height),
+                    )
+
+    def _pos_slot(self, x: float, y: float) -> 'Optional[Slot[ItemT]]':
+        """Find the slot under this X,Y (if any)."""
+        if self._slot_grid is None:
+            self._build_slot_grid()
+        cell = (int(x // self.width), int(y // self.height))
+        for slot, left, top, width, height in self._slot_grid.get(cell, ()):
+            if in_bbox(x, y, left, top, width, height):
+                return slot
         return None
 
     def _display_item(
@@ -245,7 +271,10 @@ class Manager(Generic[ItemT]):
         item: Optional[ItemT],
         group: bool=False,
     ) -> None:
-        """Display the specified item on the given label."""
+        """Display the specified item on the given label.
+
+        If the label already shows this image, it isn't changed.
+        """
         if item is None:
             image = self._img_blank
         elif group:
@@ -255,11 +284,14 @@ class Manager(Generic[ItemT]):
                 image = item.dnd_icon
         else:
             image = item.dnd_icon
+        if getattr(lbl, '_dnd_image', None) is image:
+            return
         try:
             lbl['image'] = image
         except tkinter.TclError:
             # Not an image...
             lbl['image'] = img.img_error
+        lbl._dnd_image = image
 
     def _group_update(self, group: Optional[str]) -> None:
         """Update all target items with this group."""
@@ -304,6 +336,8 @@ class Manager(Generic[ItemT]):
 
         self._display_item(self._drag_lbl, self._cur_drag, show_group)
         self._cur_prev_slot = slot
+        # The window may have moved since the last drag.
+        self._slot_grid = None
 
         sound.fx('config')
 
@@ -463,16 +497,19 @@ class Slot(Generic[ItemT]):
         """Grid-position this slot."""
         self._pos_type = 'grid'
         self._lbl.grid(*args, **kwargs)
+        self.man._slot_grid = None
 
     def place(self, *args, **kwargs) -> None:
         """Place-position this slot."""
         self._pos_type = 'place'
         self._lbl.place(*args, **kwargs)
+        self.man._slot_grid = None
 
     def pack(self, *args, **kwargs) -> None:
         """Pack-position this slot."""
         self._pos_type = 'pack'
         self._lbl.pack(*args, **kwargs)
+        self.man._slot_grid = None
 
     def hide(self) -> None:
         """Remove this slot from the set position manager."""
@@ -485,6 +522,7 @@ class Slot(Generic[ItemT]):
         else:
             getattr(self._lbl, self._pos_type + '_forget')()
         self._pos_type = None
+        self.man._slot_grid = None
 
     def _evt_start(self, event: tkinter.Event) -> None:
         """Start dragging."""
@@ -1,5 +1,4 @@
 """Implements fizzler/laserfield generation and customisation."""
-import random
 from collections import defaultdict, namedtuple
 from typing import Dict, List, Optional, Tuple, Iterator, Set, Callable
 
@@ -7,6 +6,7 @@ import itertools
 from enum import Enum
 
 import conditions
+import rand
 import connections
 import packing
 import utils
@@ -925,18 +925,15 @@ def parse_map(vmf: VMF, voice_attrs: Dict[str, bool]) -> None:
         # No relay item - deactivated most likely.
         return
 
-    for inst in vmf.by_class['func_instance']:
-        if inst['file'].casefold() not in relay_file:
-            continue
-
+    for inst, file, origin, angles in conditions.instances_by_file(vmf, relay_file):
         inst.remove()
 
         relay_item = connections.ITEMS[inst['targetname']]
 
         try:
             fizz_name = fizz_pos[
-                Vec.from_str(inst['origin']).as_tuple(),
-                Vec(0, 0, 1).rotate_by_str(inst['angles']).as_tuple()
+                origin.as_tuple(),
+                Vec(0, 0, 1).rotate(*angles).as_tuple()
             ]
             fizz_item = connections.ITEMS[fizz_name]
         except KeyError:
@@ -999,8 +996,8 @@ def generate_fizzlers(vmf: VMF):
             packing.pack_list(vmf, pack)
 
         if fizz_type.inst[FizzInst.BASE, is_static]:
-            random.seed('{}_fizz_base_{}'.format(MAP_RAND_SEED, fizz_name))
-            fizz.base_inst['file'] = random.choice(fizz_type.inst[FizzInst.BASE, is_static])
+            rng = rand.seed('{}_fizz_base_{}'.format(MAP_RAND_SEED, fizz_name))
+            fizz.base_inst['file'] = rng.choice(fizz_type.inst[FizzInst.BASE, is_static])
 
         if not fizz.emitters:
             LOGGER.warning('No emitters for fizzler "{}"!', fizz_name)
@@ -1095,9 +1092,9 @@ def generate_fizzlers(vmf: VMF):
 
                     # Allow randomising speed and direction.
                     if 0 < beam.speed_min  < beam.speed_max:
-                        random.seed('{}{}{}'.format(MAP_RAND_SEED, min_off, max_off))
-                        beam_ent['TextureScroll'] = random.randint(beam.speed_min, beam.speed_max)
-                        if random.choice((False, True)):
+                        rng = rand.seed('{}{}{}'.format(MAP_RAND_SEED, min_off, max_off))
+                        beam_ent['TextureScroll'] = rng.randint(beam.speed_min, beam.speed_max)
+                        if rng.choice((False, True)):
                             # Flip to reverse direction.
                             min_off, max_off = max_off, min_off
 
@@ -1126,12 +1123,12 @@ def generate_fizzlers(vmf: VMF):
 
         for seg_ind, (seg_min, seg_max) in enumerate(fizz.emitters, start=1):
             length = (seg_max - seg_min).mag()
-            random.seed('{}_fizz_{}'.format(MAP_RAND_SEED, seg_min))
+            rng = rand.seed('{}_fizz_{}'.format(MAP_RAND_SEED, seg_min))
             if length == 128 and fizz_type.inst[FizzInst.PAIR_SINGLE, is_static]:
                 min_inst = vmf.create_ent(
                     targetname=get_model_name(seg_ind),
                     classname='func_instance',
-                    file=random.choice(fizz_type.inst[FizzInst.PAIR_SINGLE, is_static]),
+                    file=rng.choice(fizz_type.inst[FizzInst.PAIR_SINGLE, is_static]),
                     origin=(seg_min + seg_max)/2,
                     angles=min_angles,
                 )
@@ -1140,15 +1137,15 @@ def generate_fizzlers(vmf: VMF):
                 min_inst = vmf.create_ent(
                     targetname=get_model_name(seg_ind),
                     classname='func_instance',
-                    file=random.choice(model_min),
+                    file=rng.choice(model_min),
                     origin=seg_min,
                     angles=min_angles,
                 )
-                random.seed('{}_fizz_{}'.format(MAP_RAND_SEED, seg_max))
+                rng = rand.seed('{}_fizz_{}'.format(MAP_RAND_SEED, seg_max))
                 max_inst = vmf.create_ent(
                     targetname=get_model_name(seg_ind),
                     classname='func_instance',
-                    file=random.choice(model_max),
+                    file=rng.choice(model_max),
                     origin=seg_max,
                     angles=max_angles,
                 )
@@ -1164,12 +1161,12 @@ def generate_fizzlers(vmf: VMF):
                 # A 128 gap will have length = 0
                 for ind, dist in enumerate(range(64, round(length) - 63, 128)):
                     mid_pos = seg_min + forward * dist
-                    random.seed('{}_fizz_mid_{}'.format(MAP_RAND_SEED, mid_pos))
+                    rng = rand.seed('{}_fizz_mid_{}'.format(MAP_RAND_SEED, mid_pos))
                     mid_inst = vmf.create_ent(
                         classname='func_instance',
                         targetname=fizz_name,
                         angles=min_angles,
-                        file=random.choice(fizz_type.inst[FizzInst.GRID, is_static]),
+                        file=rng.choice(fizz_type.inst[FizzInst.GRID, is_static]),
                         origin=mid_pos,
                     )
                     mid_inst.fixup.update(fizz.base_inst.fixup)
@@ -18,6 +18,10 @@ import shutil
 import math
 import re
 import io
+import json
+import zlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from BEE2_config import ConfigFile, GEN_OPTS
 from srctools import (
@@ -25,7 +29,9 @@ from srctools import (
     Property,
     VMF, Output,
     FileSystem, FileSystemChain,
+    AtomicWriter,
 )
+from srctools.filesys import RawFileSystem, File
 import srctools.logger
 import backup
 import loadScreen
@@ -34,7 +40,9 @@ import utils
 import srctools
 import webbrowser
 
-from typing import List, Tuple, Set, Iterable, Iterator, Dict, Union
+from typing import (
+    List, Tuple, Set, Iterable, Iterator, Dict, Union, Optional,
+)
 
 
 try:
@@ -53,6 +61,11 @@ game_menu = None  # type: Menu
 
 # Translated text from basemodui.txt.
 TRANS_DATA = {}
+# The basemodui files are huge, so we save the keys we use here.
+TRANS_CACHE_LOC = 'config/basemodui_cache.json'
+# appmanifest paths -> the language set in it, so games in the same
+# library only parse it once.
+_APPMAN_LANG = {}  # type: Dict[str, Optional[str]]
 
 CONFIG = ConfigFile('games.cfg')
 
@@ -140,6 +153,20 @@ EXE_SUFFIX = (
 # The systems we need to copy to ingame resources
 res_system = FileSystemChain()
 
+# Records the resources we copied into the game, so later exports only need
+# to copy changed files. It's in bin/bee2/ so clear_cache() removes it too.
+RES_MANIFEST = 'bin/bee2/res_manifest.cfg'
+# Number of threads used to copy resources.
+RES_COPY_THREADS = 8
+# Chunk size used when copying and hashing resources.
+RES_CHUNK_SIZE = 64 * 1024
+
+# For each copied resource, the package it came from, the source's mtime
+# (for unzipped packages), and the size, mtime and CRC of the destination.
+ResManifestEntry = namedtuple('ResManifestEntry', [
+    'pack', 'src_mtime', 'size', 'mtime', 'crc',
+])
+
 # We search for Tag and Mel's music files, and copy them to games on export.
 # That way they can use the files.
 MUSIC_MEL_VPK = None  # type: VPK
@@ -223,6 +250,83 @@ def load_filesystems(package_sys: Iterable[FileSystem]) -> None:
         res_system.add_sys(system, prefix='resources/')
 
 
+def _load_trans_cache() -> List[dict]:
+    """Read all the entries in the translation cache."""
+    cache_loc = utils.conf_location(TRANS_CACHE_LOC)
+    try:
+        with open(cache_loc, encoding='utf8') as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return []
+    except ValueError:
+        LOGGER.warning('Cannot parse translation cache!', exc_info=True)
+        return []
+    if not isinstance(entries, list):
+        return []
+    return [entry for entry in entries if isinstance(entry, dict)]
+
+
+def _read_trans_cache(path: str, stat: os.stat_result) -> Optional[Dict[str, str]]:
+    """Read the translations for this basemodui file from the cache.
+
+    If not present or the file has changed, this returns None.
+    """
+    for entry in _load_trans_cache():
+        if (
+            entry.get('path') == path and
+            entry.get('size') == stat.st_size and
+            entry.get('mtime') == stat.st_mtime_ns
+        ):
+            tokens = entry.get('tokens')
+            if isinstance(tokens, dict):
+                return tokens
+    return None
+
+
+def _write_trans_cache(path: str, stat: os.stat_result, tokens: Dict[str, str]) -> None:
+    """Save the translations for this basemodui file to the cache.
+
+    This is JSON, so the values are stored exactly - keyvalues would
+    process backslashes in them.
+    """
+    # Keep entries for other installs.
+    entries = [
+        entry for entry in _load_trans_cache()
+        if entry.get('path') != path
+    ]
+    entries.append({
+        'path': path,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'tokens': tokens,
+    })
+    try:
+        with AtomicWriter(str(utils.conf_location(TRANS_CACHE_LOC)), is_bytes=False) as f:
+            json.dump(entries, f, ensure_ascii=False, indent=1)
+    except OSError:
+        LOGGER.warning('Cannot write translation cache!', exc_info=True)
+
+
+def _parse_basemodui(path: str) -> Dict[str, str]:
+    """Parse a basemodui file, extracting the puzzlemaker keys."""
+    tokens = {}
+    # Basemod files are encoded in UTF-16.
+    with open(path, encoding='utf16') as basemod_file:
+        # This file is in keyvalues format, supposedly.
+        # But it's got a bunch of syntax errors - extra quotes,
+        # missing brackets.
+        # The structure doesn't matter, so just process line by line.
+        for line in basemod_file:
+            try:
+                __, key, __, value, __ = line.split('"')
+            except ValueError:
+                continue
+            # Ignore non-puzzlemaker keys.
+            if key.startswith('PORTAL2_PuzzleEditor'):
+                tokens[key] = value.replace("\\'", "'")
+    return tokens
+
+
 def translate(string: str) -> str:
     """Translate the string using Portal 2's language files.
 
@@ -273,6 +377,110 @@ def should_backup_app(file: str) -> bool:
         return b'MEI\014\013\012\013\016' not in f.read(SIZE)
 
 
+def _res_up_to_date(
+    entry: Optional[ResManifestEntry],
+    pack_id: str,
+    dest: str,
+    raw_path: Optional[str],
+    pack_stale: bool,
+) -> bool:
+    """Check if a resource can be skipped without reading it at all.
+
+    This requires the destination to be unchanged since we wrote it, and the
+    source to be unchanged too.
+    """
+    if entry is None or entry.pack != pack_id:
+        return False
+    try:
+        dest_stat = os.stat(dest)
+    except FileNotFoundError:
+        return False
+    if dest_stat.st_size != entry.size or dest_stat.st_mtime_ns != entry.mtime:
+        return False
+    if raw_path is not None:
+        # Unzipped packages are always stale, check the individual file.
+        try:
+            return os.stat(raw_path).st_mtime_ns == entry.src_mtime
+        except FileNotFoundError:
+            return False
+    return not pack_stale
+
+
+def _hash_res_file(file) -> int:
+    """Compute the CRC of an open file."""
+    crc = 0
+    for chunk in iter(lambda: file.read(RES_CHUNK_SIZE), b''):
+        crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def _sync_res_file(
+    file: File,
+    pack_id: str,
+    dest: str,
+    raw_path: Optional[str],
+    old_entry: Optional[ResManifestEntry],
+) -> Tuple[ResManifestEntry, bool]:
+    """Copy a resource into the game if it differs from the existing file.
+
+    This runs in a worker thread. The new manifest entry is returned,
+    along with whether the file was written.
+    """
+    src_mtime = os.stat(raw_path).st_mtime_ns if raw_path is not None else 0
+    try:
+        dest_stat = os.stat(dest)
+    except FileNotFoundError:
+        dest_stat = None
+
+    if dest_stat is not None:
+        # It might be identical, compare contents.
+        if (
+            old_entry is not None and
+            old_entry.size == dest_stat.st_size and
+            old_entry.mtime == dest_stat.st_mtime_ns
+        ):
+            dest_crc = old_entry.crc
+        else:
+            with open(dest, 'rb') as fdest:
+                dest_crc = _hash_res_file(fdest)
+        with file.open_bin() as fsrc:
+            src_crc = _hash_res_file(fsrc)
+        if src_crc == dest_crc:
+            return ResManifestEntry(
+                pack_id, src_mtime,
+                dest_stat.st_size, dest_stat.st_mtime_ns, src_crc,
+            ), False
+
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    if dest_stat is not None:
+        os.remove(dest)
+
+    crc = None
+    if raw_path is not None:
+        # For unzipped packages, hardlink if possible - that's much faster,
+        # and means any changes are immediately visible.
+        try:
+            os.link(raw_path, dest)
+        except OSError:
+            pass
+        else:
+            with open(dest, 'rb') as fdest:
+                crc = _hash_res_file(fdest)
+
+    if crc is None:
+        crc = 0
+        with file.open_bin() as fsrc, open(dest, 'wb') as fdest:
+            for chunk in iter(lambda: fsrc.read(RES_CHUNK_SIZE), b''):
+                crc = zlib.crc32(chunk, crc)
+                fdest.write(chunk)
+
+    dest_stat = os.stat(dest)
+    return ResManifestEntry(
+        pack_id, src_mtime,
+        dest_stat.st_size, dest_stat.st_mtime_ns, crc,
+    ), True
+
+
 class Game:
     def __init__(
         self,
@@ -518,53 +726,138 @@ class Game:
 
         already_copied is passed from copy_mod_music(), to
         indicate which files should remain. It is the full path to the files.
+
+        A manifest of the copied files is kept, so only new or modified
+        resources are actually written, and resources which were removed
+        from packages are deleted.
         """
         screen_func = export_screen.step
+        already_copied = {path.casefold() for path in already_copied}
+
+        old_manifest = self._load_res_manifest()
+        new_manifest = {}  # type: Dict[str, ResManifestEntry]
+
+        # Map filesystems back to packages, so we can check modification
+        # times.
+        sys_to_pack = {
+            id(pack.fsys): pack
+            for pack in packageLoader.packages.values()
+        }
+        stale_packs = {
+            pack.id
+            for pack in packageLoader.packages.values()
+            if pack.is_stale(self.mod_times.get(pack.id.casefold(), 0))
+        }
+
+        # First figure out what files need to be copied where, so the
+        # loadscreen knows how many there are.
+        # Each is (file, package ID, dest, relative dest, raw source path).
+        to_copy = []  # type: List[Tuple[File, str, str, str, Optional[str]]]
+        skipped = 0
 
         with res_system:
-            for file in res_system.walk_folder_repeat():
+            for fsys, prefix in res_system.systems:
                 try:
-                    start_folder, path = file.path.split('/', 1)
-                except ValueError:
-                    LOGGER.warning('File in resources root: "{}"!', file.path)
-                    continue
+                    pack_id = sys_to_pack[id(fsys)].id
+                except KeyError:
+                    pack_id = ''
+                for file in fsys.walk_folder(prefix):
+                    try:
+                        start_folder, path = file.path[len(prefix):].split('/', 1)
+                    except ValueError:
+                        LOGGER.warning('File in resources root: "{}"!', file.path)
+                        continue
 
-                start_folder = start_folder.casefold()
+                    start_folder = start_folder.casefold()
 
-                if start_folder == 'instances':
-                    dest = self.abs_path(INST_PATH + '/' + path)
-                elif start_folder in ('bee2', 'music_samp'):
-                    screen_func('RES')
-                    continue  # Skip app icons
-                else:
-                    dest = self.abs_path(os.path.join('bee2', start_folder, path))
+                    if start_folder == 'instances':
+                        rel_dest = INST_PATH + '/' + path
+                    elif start_folder in ('bee2', 'music_samp'):
+                        skipped += 1
+                        continue  # Skip app icons
+                    else:
+                        rel_dest = 'bee2/' + start_folder + '/' + path
 
-                # Already copied from another package.
-                if dest in already_copied:
-                    screen_func('RES')
-                    continue
-                already_copied.add(dest.casefold())
+                    dest = self.abs_path(rel_dest)
+                    # Already copied from another package.
+                    if dest.casefold() in already_copied:
+                        skipped += 1
+                        continue
+                    already_copied.add(dest.casefold())
 
-                os.makedirs(os.path.dirname(dest), exist_ok=True)
-                with file.open_bin() as fsrc, open(dest, 'wb') as fdest:
-                    shutil.copyfileobj(fsrc, fdest)
-                screen_func('RES')
+                    if isinstance(fsys, RawFileSystem):
+                        raw_path = os.path.join(fsys.path, file.path)
+                    else:
+                        raw_path = None
 
-        LOGGER.info('Cache copied.')
+                    to_copy.append((
+                        file, pack_id, dest,
+                        os.path.normcase(rel_dest), raw_path,
+                    ))
 
-        for path in [INST_PATH, 'bee2']:
-            abs_path = self.abs_path(path)
-            for dirpath, dirnames, filenames in os.walk(abs_path):
-                for file in filenames:
-                    # Keep VMX backups, disabled editor models, and the coop
-                    # gun instance.
-                    if file.endswith(('.vmx', '.mdl_dis', 'tag_coop_gun.vmf')):
+            export_screen.set_length('RES', len(to_copy) + skipped)
+            for __ in range(skipped):
+                screen_func('RES')
+
+            with ThreadPoolExecutor(RES_COPY_THREADS) as pool:
+                futures = {}
+                for file, pack_id, dest, rel_dest, raw_path in to_copy:
+                    old_entry = old_manifest.get(rel_dest)
+                    if _res_up_to_date(
+                        old_entry, pack_id, dest, raw_path,
+                        pack_id in stale_packs,
+                    ):
+                        new_manifest[rel_dest] = old_entry
+                        screen_func('RES')
                         continue
-                    path = os.path.join(dirpath, file).casefold()
+                    fut = pool.submit(
+                        _sync_res_file, file, pack_id,
+                        dest, raw_path, old_entry,
+                    )
+                    futures[fut] = rel_dest
+
+                copy_count = 0
+                for fut in as_completed(futures):
+                    entry, copied = fut.result()
+                    new_manifest[futures[fut]] = entry
+                    if copied:
+                        copy_count += 1
+                    screen_func('RES')
 
-                    if path not in already_copied:
-                        LOGGER.info('Deleting: {}', path)
-                        os.remove(path)
+        LOGGER.info(
+            'Cache copied: {} written, {} unchanged.',
+            copy_count, len(to_copy) - copy_count,
+        )
+
+        if old_manifest:
+            # Delete anything we copied last time, but which isn't present now.
+            for rel_dest in old_manifest.keys() - new_manifest.keys():
+                path = self.abs_path(rel_dest)
+                if path.casefold() in already_copied:
+                    continue
+                LOGGER.info('Deleting: {}', path)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        else:
+            # No manifest, we don't know what's ours.
+            # Remove everything that wasn't just copied.
+            for path in [INST_PATH, 'bee2']:
+                abs_path = self.abs_path(path)
+                for dirpath, dirnames, filenames in os.walk(abs_path):
+                    for file in filenames:
+                        # Keep VMX backups, disabled editor models, and the coop
+                        # gun instance.
+                        if file.endswith(('.vmx', '.mdl_dis', 'tag_coop_gun.vmf')):
+                            continue
+                        path = os.path.join(dirpath, file)
+
+                        if path.casefold() not in already_copied:
+                            LOGGER.info('Deleting: {}', path)
+                            os.remove(path)
+
+        self._save_res_manifest(new_manifest)
 
         # Save the new cache modification date.
         self.mod_times.clear()
@@ -573,6 +866,48 @@ class Game:
         self.save()
         CONFIG.save_check()
 
+    def _load_res_manifest(self) -> Dict[str, ResManifestEntry]:
+        """Read the manifest of resources copied during the last export.
+
+        If it's missing or unreadable this is empty.
+        """
+        manifest = {}
+        try:
+            with open(self.abs_path(RES_MANIFEST), encoding='utf8') as f:
+                props = Property.parse(f, RES_MANIFEST)
+        except FileNotFoundError:
+            return manifest
+        except Exception:
+            LOGGER.warning('Could not parse resource manifest:', exc_info=True)
+            return manifest
+
+        for file_prop in props.find_children('Files'):
+            manifest[os.path.normcase(file_prop.real_name)] = ResManifestEntry(
+                file_prop['pack', ''],
+                srctools.conv_int(file_prop['src_mtime', '0']),
+                srctools.conv_int(file_prop['size', '-1'], -1),
+                srctools.conv_int(file_prop['mtime', '0']),
+                srctools.conv_int(file_prop['crc', '0']),
+            )
+        return manifest
+
+    def _save_res_manifest(self, manifest: Dict[str, ResManifestEntry]) -> None:
+        """Write out the manifest of copied resources."""
+        files = Property('Files', [
+            Property(rel_dest, [
+                Property('pack', entry.pack),
+                Property('src_mtime', str(entry.src_mtime)),
+                Property('size', str(entry.size)),
+                Property('mtime', str(entry.mtime)),
+                Property('crc', str(entry.crc)),
+            ])
+            for rel_dest, entry in sorted(manifest.items())
+        ])
+        os.makedirs(os.path.dirname(self.abs_path(RES_MANIFEST)), exist_ok=True)
+        with open(self.abs_path(RES_MANIFEST), 'w', encoding='utf8') as f:
+            for line in files.export():
+                f.write(line)
+
     def clear_cache(self) -> None:
         """Remove all resources from the game."""
         shutil.rmtree(self.abs_path(INST_PATH), ignore_errors=True)
@@ -650,13 +985,8 @@ class Game:
         export_screen.show()
         try:
 
-            if should_refresh:
-                # Count the files.
-                export_screen.set_length(
-                    'RES',
-                    sum(1 for file in res_system.walk_folder_repeat()),
-                )
-            else:
+            # refresh_cache() sets the length of RES once it finds the files.
+            if not should_refresh:
                 export_screen.skip_stage('RES')
                 export_screen.skip_stage('MUS')
 
@@ -1140,21 +1470,31 @@ class Game:
 
         # We need to first figure out what language is used (if not English),
         # then load in the file. This is saved in the 'appmanifest',
+        appman_loc = os.path.normcase(os.path.abspath(
+            self.abs_path('../../appmanifest_620.acf')
+        ))
+        try:
+            lang = _APPMAN_LANG[appman_loc]
+        except KeyError:
+            lang = _APPMAN_LANG[appman_loc] = self._read_appman_lang(appman_loc)
+        if lang is not None:
+            self.load_trans(lang)
 
+    @staticmethod
+    def _read_appman_lang(appman_loc: str) -> Optional[str]:
+        """Read the language Portal 2 is set to from its appmanifest."""
         try:
-            appman_file = open(self.abs_path('../../appmanifest_620.acf'))
+            appman_file = open(appman_loc)
         except FileNotFoundError:
             # Portal 2 isn't here...
-            return
+            return None
 
         with appman_file:
             appman = Property.parse(appman_file, 'appmanifest_620.acf')
         try:
-            lang = appman.find_key('AppState').find_key('UserConfig')['language']
+            return appman.find_key('AppState').find_key('UserConfig')['language']
         except LookupError:
-            return
-
-        self.load_trans(lang)
+            return None
 
     def load_trans(self, lang):
         """Actually load the translation."""
@@ -1162,28 +1502,26 @@ class Game:
         if TRANS_DATA:
             return
 
-        basemod_loc = self.abs_path(
+        basemod_loc = os.path.normcase(os.path.abspath(self.abs_path(
             '../Portal 2/portal2_dlc2/resource/basemodui_' + lang + '.txt'
-        )
+        )))
 
-        # Basemod files are encoded in UTF-16.
         try:
-            basemod_file = open(basemod_loc, encoding='utf16')
+            stat = os.stat(basemod_loc)
         except FileNotFoundError:
             return
-        with basemod_file:
-            # This file is in keyvalues format, supposedly.
-            # But it's got a bunch of syntax errors - extra quotes,
-            # missing brackets.
-            # The structure doesn't matter, so just process line by line.
-            for line in basemod_file:
-                try:
-                    __, key, __, value, __ = line.split('"')
-                except ValueError:
-                    continue
-                # Ignore non-puzzlemaker keys.
-                if key.startswith('PORTAL2_PuzzleEditor'):
-                    TRANS_DATA[key] = value.replace("\\'", "'")
+
+        tokens = _read_trans_cache(basemod_loc, stat)
+        if tokens is None:
+            LOGGER.info('Parsing "{}"...', basemod_loc)
+            try:
+                tokens = _parse_basemodui(basemod_loc)
+            except FileNotFoundError:
+                return
+            _write_trans_cache(basemod_loc, stat, tokens)
+        else:
+            LOGGER.info('Using cached translations for "{}"', basemod_loc)
+        TRANS_DATA.update(tokens)
 
         if _('Quit') == '####':
             # Dummy translations installed, apply here too.
@@ -1222,13 +1560,17 @@ def find_steam_info(game_dir):
     return game_id, name
 
 
-def scan_music_locs():
+def scan_music_locs() -> bool:
     """Try and determine the location of Aperture Tag and PS:Mel.
 
     If successful we can export the music to games.
+    This doesn't use Tk, so it can run in a background thread. If Aperture
+    Tag is present but its coop gun instance is missing, False is returned
+    and warn_tag_coop_missing() should be called.
     """
     global MUSIC_TAG_LOC, MUSIC_MEL_VPK
     found_tag = False
+    tag_valid = True
     steamapp_locs = set()
     for gm in all_games:
         steamapp_locs.add(os.path.normpath(gm.abs_path('../')))
@@ -1241,13 +1583,8 @@ def scan_music_locs():
             try:
                 make_tag_coop_inst(loc)
             except FileNotFoundError:
-                messagebox.showinfo(
-                    message=_('Ap-Tag Coop gun instance not found!\n'
-                              'Coop guns will not work - verify cache to fix.'),
-                    parent=TK_ROOT,
-                    icon=messagebox.ERROR,
-                    title=_('BEE2 - Aperture Tag Files Missing'),
-                )
+                LOGGER.warning('Ap-Tag coop gun instance not found!')
+                tag_valid = False
                 MUSIC_TAG_LOC = None
             else:
                 MUSIC_TAG_LOC = tag_loc
@@ -1259,6 +1596,18 @@ def scan_music_locs():
 
         if MUSIC_MEL_VPK is not None and found_tag:
             break
+    return tag_valid
+
+
+def warn_tag_coop_missing() -> None:
+    """Tell the user the Aperture Tag coop gun instance is missing."""
+    messagebox.showinfo(
+        message=_('Ap-Tag Coop gun instance not found!\n'
+                  'Coop guns will not work - verify cache to fix.'),
+        parent=TK_ROOT,
+        icon=messagebox.ERROR,
+        title=_('BEE2 - Aperture Tag Files Missing'),
+    )
 
 
 def improve_item(item: Property) -> None:
@@ -4,6 +4,7 @@ This includes Unstationary Scaffolds and Vactubes.
 """
 from typing import Any, Dict, Container, List, Optional, Iterator
 
+import conditions
 import connections
 from srctools import Entity, VMF
 from connections import Item
@@ -38,10 +39,8 @@ def chain(
     # Name -> node
     nodes = {}  # type: Dict[str, Node]
 
-    for inst in vmf.by_class['func_instance']:
-        if inst['file'].casefold() not in inst_files:
-            continue
-        name = inst['targetname']
+    for marker in conditions.instances_by_file(vmf, inst_files):
+        name = marker.inst['targetname']
         try:
             nodes[name] = Node(connections.ITEMS[name])
         except KeyError:
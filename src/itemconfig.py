@@ -30,7 +30,7 @@ WidgetLookup = utils.FuncLookup('Widgets')
 # frame.
 WidgetLookupMulti = utils.FuncLookup('Multi-Widgets')
 
-CONFIG = BEE2_config.ConfigFile('item_cust_configs.cfg')
+CONFIG = BEE2_config.ConfigFile('item_cust_configs.cfg', write_behind=True)
 
 CONFIG_ORDER = []  # type: List[ConfigGroup]
 
@@ -15,7 +15,7 @@ from BEE2_config import GEN_OPTS
 import utils
 import srctools.logger
 
-from typing import Set, Tuple
+from typing import Set, Tuple, Dict, List, Optional
 
 
 # Keep a reference to all loading screens, so we can close them globally.
@@ -30,6 +30,34 @@ _SCREEN_CANCEL_FLAG = {}
 _PIPE_MAIN_REC, _PIPE_DAEMON_SEND = multiprocessing.Pipe(duplex=False)
 _PIPE_DAEMON_REC, _PIPE_MAIN_SEND = multiprocessing.Pipe(duplex=False)
 
+# Progress is far too frequent to send over the pipe, so it's written to
+# shared memory instead which the daemon reads periodically.
+# Each screen is allocated a block - a cancel flag set by the daemon,
+# followed by the progress of each stage. Only the main process writes
+# progress values.
+_COUNTER_SIZE = 256
+_COUNTERS = multiprocessing.RawArray('i', _COUNTER_SIZE)
+_next_counter = 0
+# Blocks released by destroyed screens, block size -> start indexes.
+_FREE_COUNTERS = {}  # type: Dict[int, List[int]]
+
+
+def _alloc_counters(size: int) -> Optional[int]:
+    """Allocate a block of counters, returning the start index.
+
+    If no space is left, None is returned.
+    """
+    global _next_counter
+    try:
+        return _FREE_COUNTERS[size].pop()
+    except (KeyError, IndexError):
+        pass
+    if _next_counter + size > _COUNTER_SIZE:
+        return None
+    base = _next_counter
+    _next_counter += size
+    return base
+
 
 class Cancelled(SystemExit):
     """Raised when the user cancels the loadscreen."""
@@ -100,9 +128,22 @@ class LoadScreen:
 
         _ALL_SCREENS.add(self)
 
+        # Allocate our block of counters. If we run out, progress and
+        # cancelling is sent through the pipe instead.
+        self._counter_base = _alloc_counters(len(stages) + 1)
+        # Stage ID -> index in _COUNTERS.
+        self._counter_ind = {}  # type: Dict[str, int]
+        if self._counter_base is not None:
+            for ind, (st_id, stage_name) in enumerate(stages, start=1):
+                self._counter_ind[st_id] = self._counter_base + ind
+                _COUNTERS[self._counter_base + ind] = 0
+            _COUNTERS[self._counter_base] = 0
+
         # Order the daemon to make this screen.
         _SCREEN_CANCEL_FLAG[id(self)] = False
-        self._send_msg('init', is_splash, title_text, stages)
+        self._send_msg(
+            'init', is_splash, title_text, stages, self._counter_base,
+        )
 
     def __enter__(self):
         """LoadScreen can be used as a context manager.
@@ -134,10 +175,22 @@ class LoadScreen:
             else:
                 raise ValueError('Bad command from daemon: ' + repr(command))
 
-        # If the flag was set for us, raise an exception - the loading thing
-        # will then stop.
-        if _SCREEN_CANCEL_FLAG[id(self)]:
+        self._check_cancel()
+
+    def _check_cancel(self):
+        """If the user cancelled this screen, raise an exception.
+
+        The loading thing will then stop.
+        """
+        if self._counter_base is not None:
+            # The daemon sets this in shared memory instead of
+            # sending a message.
+            cancelled = _COUNTERS[self._counter_base]
+            _COUNTERS[self._counter_base] = 0
+        else:
+            cancelled = _SCREEN_CANCEL_FLAG[id(self)]
             _SCREEN_CANCEL_FLAG[id(self)] = False
+        if cancelled:
             LOGGER.info('User cancelled loading screen.')
             raise Cancelled
 
@@ -147,20 +200,43 @@ class LoadScreen:
 
     def step(self, stage: str):
         """Increment the specified stage."""
-        self._send_msg('step', stage)
+        try:
+            ind = self._counter_ind[stage]
+        except KeyError:
+            self._send_msg('step', stage)
+            return
+        _COUNTERS[ind] += 1
+        # The daemon sets this if the cancel button was pressed.
+        if _COUNTERS[self._counter_base]:
+            self._check_cancel()
 
     def skip_stage(self, stage: str):
         """Skip over this stage of the loading process."""
+        self._reset_counters(stage)
         self._send_msg('skip_stage', stage)
 
+    def _reset_counters(self, *stages: str):
+        """Reset the progress for these stages, or all if none are given."""
+        for stage in (stages or self._counter_ind.keys()):
+            try:
+                _COUNTERS[self._counter_ind[stage]] = 0
+            except KeyError:
+                pass
+
     def show(self):
         """Display the loading screen."""
         self.active = True
+        # Discard a cancel from the last time we were shown.
+        if self._counter_base is not None:
+            _COUNTERS[self._counter_base] = 0
         self._send_msg('show')
 
     def reset(self):
         """Hide the loading screen and reset all the progress bars."""
         self.active = False
+        self._reset_counters()
+        if self._counter_base is not None:
+            _COUNTERS[self._counter_base] = 0
         self._send_msg('reset')
 
     def destroy(self):
@@ -168,6 +244,12 @@ class LoadScreen:
         self.active = False
         self._send_msg('destroy')
         _ALL_SCREENS.remove(self)
+        if self._counter_base is not None:
+            _FREE_COUNTERS.setdefault(
+                len(self._counter_ind) + 1, [],
+            ).append(self._counter_base)
+            self._counter_base = None
+            self._counter_ind.clear()
 
     @abstractmethod
     def suppress(self):
@@ -188,6 +270,7 @@ _daemon = multiprocessing.Process(
     args=(
         _PIPE_DAEMON_SEND,
         _PIPE_DAEMON_REC,
+        _COUNTERS,
         # Pass translation strings.
         {
             'skip': _('Skipped!'),
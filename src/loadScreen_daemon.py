@@ -18,6 +18,11 @@ SCREENS = {}
 
 PIPE_REC = ...  # type: multiprocessing.Connection
 PIPE_SEND = ...  # type: multiprocessing.Connection
+# Shared progress values, written by the main process.
+COUNTERS = ...  # type: multiprocessing.Array
+
+# How often to check the counters, in milliseconds.
+SAMPLE_RATE = 50
 
 # Stores translated strings, which are done in the main process.
 TRANSLATION = {
@@ -29,9 +34,11 @@ TRANSLATION = {
 
 class BaseLoadScreen:
     """Code common to both loading screen types."""
-    def __init__(self, master, scr_id, title_text, stages):
+    def __init__(self, master, scr_id, title_text, stages, counter_base):
         self.scr_id = scr_id
         self.title_text = title_text
+        # The index of our block in COUNTERS, if we have one.
+        self.counter_base = counter_base
 
         self.win = tk.Toplevel(master)
         self.win.withdraw()
@@ -63,7 +70,21 @@ class BaseLoadScreen:
     def cancel(self, event: tk.Event=None):
         """User pressed the cancel button."""
         self.op_reset()
-        PIPE_SEND.send(('cancel', self.scr_id))
+        if self.counter_base is not None:
+            # Picked up by the next step() or message.
+            COUNTERS[self.counter_base] = 1
+        else:
+            PIPE_SEND.send(('cancel', self.scr_id))
+
+    def sample_counters(self):
+        """Read the progress from shared memory, and update changed stages."""
+        if self.counter_base is None:
+            return
+        for ind, (st_id, stage_name) in enumerate(self.stages, start=1):
+            value = COUNTERS[self.counter_base + ind]
+            if value != self.values[st_id]:
+                self.values[st_id] = value
+                self.update_stage(st_id)
 
     def move_start(self, event: tk.Event):
         """Record offset of mouse on click."""
@@ -540,14 +561,16 @@ class SplashScreen(BaseLoadScreen):
 def run_screen(
     pipe_send,
     pipe_rec,
+    counters,
     # Pass in various bits of translated text
     # so we don't need to do it here.
     translations,
 ):
     """Runs in the other process, with an end of a pipe for input."""
-    global PIPE_REC, PIPE_SEND
+    global PIPE_REC, PIPE_SEND, COUNTERS
     PIPE_SEND = pipe_send
     PIPE_REC = pipe_rec
+    COUNTERS = counters
     TRANSLATION.update(translations)
 
     root = tk.Tk()
@@ -561,8 +584,10 @@ def run_screen(
             operation, scr_id, args = PIPE_REC.recv()
             if operation == 'init':
                 # Create a new loadscreen.
-                is_main, title, stages = args
-                screen = (SplashScreen if is_main else LoadScreen)(root, scr_id, title, stages)
+                is_main, title, stages, counter_base = args
+                screen = (SplashScreen if is_main else LoadScreen)(
+                    root, scr_id, title, stages, counter_base,
+                )
                 SCREENS[scr_id] = screen
             else:
                 try:
@@ -574,10 +599,20 @@ def run_screen(
                 except Exception:
                     raise Exception(operation)
 
+        # Progress is only sampled while screens are visible.
+        is_shown = False
+        for screen in SCREENS.values():
+            if screen.is_shown:
+                is_shown = True
+                screen.sample_counters()
+
         # Continually re-run this function in the TK loop.
         # If we didn't find anything in the pipe, wait longer.
         # Otherwise we hog the CPU.
-        root.after(1 if had_values else 200, check_queue)
+        if had_values:
+            root.after(1, check_queue)
+        else:
+            root.after(SAMPLE_RATE if is_shown else 200, check_queue)
     
     root.after(10, check_queue)
     root.mainloop()  # Infinite loop, until the entire process tree quits.
@@ -4,6 +4,9 @@ from tkinter import ttk
 import tkinter as tk
 
 import logging
+import threading
+import time
+from collections import deque
 
 import srctools.logger
 from tk_tools import TK_ROOT
@@ -11,6 +14,8 @@ from BEE2_config import GEN_OPTS
 import tk_tools
 import utils
 
+from typing import Deque, List, Optional, Tuple
+
 # Colours to use for each log level
 LVL_COLOURS = {
     logging.CRITICAL: 'white',
@@ -42,10 +47,24 @@ level_selector = None  # type: ttk.Combobox
 START = '1.0'  # Row 1, column 0 = first character
 END = tk.END
 
+# The minimum time between writes to the text box, in seconds.
+WRITE_INTERVAL = 0.1
+# The default number of lines to keep.
+DEFAULT_MAX_LINES = 5000
+
 
 class TextHandler(logging.Handler):
-    """Log all data to a Tkinter Text widget."""
-    def __init__(self, widget: tk.Text, level=logging.NOTSET):
+    """Log all data to a Tkinter Text widget.
+
+    Records are buffered, then written in batches - inserting them one at a
+    time is very slow when loading packages logs lots of messages.
+    """
+    def __init__(
+        self,
+        widget: tk.Text,
+        level=logging.NOTSET,
+        max_lines: int=DEFAULT_MAX_LINES,
+    ):
         self.widget = widget
         super().__init__(level)
 
@@ -70,53 +89,100 @@ class TextHandler(logging.Handler):
         )
 
         self.has_text = False
+        # The maximum number of lines to keep in the text box.
+        self.max_lines = max(max_lines, 1)
+        # Formatted (levelname, text) pairs waiting to be displayed.
+        # Anything older than max_lines would be trimmed anyway.
+        self.pending = deque(
+            maxlen=self.max_lines,
+        )  # type: Deque[Tuple[str, str]]
+        self.last_write = 0.0
+        # The after() ID, if a write is scheduled.
+        self.write_id = None  # type: Optional[str]
 
         widget['state'] = "disabled"
 
     def emit(self, record: logging.LogRecord):
         """Add a logging message."""
-
         msg = record.msg
         if isinstance(record.msg, srctools.logger.LogMessage):
             # Ensure we don't use the extra ASCII indents here.
             record.msg = record.msg.format_msg()
-
-        self.widget['state'] = "normal"
-        # We don't want to indent the first line.
-        firstline, *lines = self.format(record).split('\n')
-
-        if self.has_text:
-            # Start with a newline so it doesn't end with one.
-            self.widget.insert(
-                END,
-                '\n',
-                (),
+        try:
+            self.pending.append((record.levelname, self.format(record)))
+        finally:
+            # Undo the record overwrite, so other handlers get the correct object.
+            record.msg = msg
+
+        if threading.current_thread() is not threading.main_thread():
+            # Tk can only be used from the main thread, so
+            # show these the next time that logs something.
+            return
+
+        if time.monotonic() - self.last_write >= WRITE_INTERVAL:
+            # We may be busy loading packages and not running the event loop,
+            # so write immediately every so often.
+            self._write_pending()
+        elif self.write_id is None:
+            self.write_id = self.widget.after(
+                int(WRITE_INTERVAL * 1000),
+                self._write_pending,
             )
 
-        self.widget.insert(
-            END,
-            firstline,
-            (record.levelname,),
-        )
-        for line in lines:
-            self.widget.insert(
-                END,
-                '\n',
-                ('INDENT',),
-                line,
+    def _write_pending(self):
+        """Write all pending messages to the text box."""
+        if self.write_id is not None:
+            self.widget.after_cancel(self.write_id)
+            self.write_id = None
+        self.last_write = time.monotonic()
+        if not self.pending:
+            return
+
+        # Build up (text, tags) pairs, merging together runs with the
+        # same tags so we only need a single insert() call.
+        segments = []  # type: List[Tuple[str, Tuple[str, ...]]]
+
+        def add(text: str, tags: Tuple[str, ...]):
+            if segments and segments[-1][1] == tags:
+                segments[-1] = (segments[-1][0] + text, tags)
+            else:
+                segments.append((text, tags))
+
+        while self.pending:
+            levelname, text = self.pending.popleft()
+            # We don't want to indent the first line.
+            firstline, *lines = text.split('\n')
+            if self.has_text:
+                # Start with a newline so it doesn't end with one.
+                add('\n', (levelname,))
+            add(firstline, (levelname,))
+            for line in lines:
+                add('\n', ('INDENT',))
                 # Indent following lines.
-                (record.levelname, 'INDENT'),
+                add(line, (levelname, 'INDENT'))
+            self.has_text = True
+
+        args = []
+        for text, tags in segments:
+            args.append(text)
+            args.append(tags)
+
+        self.widget['state'] = "normal"
+        self.widget.insert(END, *args)
+
+        # Trim old lines past the limit.
+        line_count = int(self.widget.index('end-1c').split('.')[0])
+        if line_count > self.max_lines:
+            self.widget.delete(
+                START,
+                '{}.0'.format(line_count - self.max_lines + 1),
             )
+
         self.widget.see(END)  # Scroll to the end
         self.widget['state'] = "disabled"
         # Update it, so it still runs even when we're busy with other stuff.
         self.widget.update_idletasks()
 
-        self.has_text = True
-
-        # Undo the record overwrite, so other handlers get the correct object.
-        record.msg = msg
-
 
 def set_visible(is_visible: bool):
     """Show or hide the window."""
@@ -141,6 +207,7 @@ def btn_clear():
     """Clear the console."""
     text_box['state'] = "normal"
     text_box.delete(START, END)
+    log_handler.pending.clear()
     log_handler.has_text = False
     text_box['state'] = "disabled"
 
@@ -151,7 +218,11 @@ def set_level(event):
     GEN_OPTS['Debug']['window_log_level'] = logging.getLevelName(level)
 
 
-def init(start_open: bool, log_level: str='info') -> None:
+def init(
+    start_open: bool,
+    log_level: str='info',
+    max_lines: int=DEFAULT_MAX_LINES,
+) -> None:
     """Initialise the window."""
     global log_handler, text_box, level_selector
 
@@ -170,7 +241,7 @@ def init(start_open: bool, log_level: str='info') -> None:
 
     log_level = logging.getLevelName(log_level.upper())
 
-    log_handler = TextHandler(text_box)
+    log_handler = TextHandler(text_box, max_lines=max_lines)
 
     try:
         log_handler.setLevel(log_level)
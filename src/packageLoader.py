@@ -6,6 +6,7 @@ import os
 import shutil
 import math
 import re
+import zlib
 from collections import defaultdict
 from enum import Enum
 
@@ -29,7 +30,7 @@ from typing import (
     Match,
     TypeVar,
     Callable,
-    Set,
+    Set, BinaryIO,
 )
 
 
@@ -134,6 +135,13 @@ Files in this folder will be written to the VPK during every BEE2 export.
 Use to override resources as you please.
 """
 
+# Stores the fingerprint of the files used to build the VPK, so we can skip
+# rebuilding if nothing changed. This starts with pak01_, so it's removed
+# along with the VPK by clear_vpk_files().
+VPK_FINGERPRINT_FILE = 'pak01_bee2_fingerprint.txt'
+# The size of the chunks used when copying files into the VPK.
+VPK_CHUNK_SIZE = 64 * 1024
+
 # The name given to standard connections - regular input/outputs in editoritems.
 CONN_NORM = 'CONNECTION_STANDARD'
 CONN_FUNNEL = 'CONNECTION_TBEAM_POLARITY'
@@ -2866,7 +2874,11 @@ class StyleVPK(PakObject, has_img=False):
 
     @staticmethod
     def export(exp_data: ExportData):
-        """Generate the VPK file in the game folder."""
+        """Generate the VPK file in the game folder.
+
+        If the source files are identical to the last export, the existing
+        VPK is left alone.
+        """
         sel_vpk = exp_data.selected_style.vpk_name
 
         if sel_vpk:
@@ -2879,6 +2891,35 @@ class StyleVPK(PakObject, has_img=False):
         else:
             sel_vpk = None
 
+        # Additionally, pack in game/vpk_override/ into the vpk - this allows
+        # users to easily override resources in general.
+        override_folder = exp_data.game.abs_path('vpk_override')
+        os.makedirs(override_folder, exist_ok=True)
+
+        # Also write a file to explain what it's for..
+        with open(os.path.join(override_folder, 'BEE2_README.txt'), 'w') as f:
+            f.write(VPK_OVERRIDE_README)
+
+        override_files = StyleVPK._override_files(override_folder)
+        fingerprint = StyleVPK._fingerprint(sel_vpk, override_files)
+
+        dest_folder = exp_data.game.abs_path(VPK_FOLDER.get(
+            exp_data.game.steamID,
+            'portal2_dlc3',
+        ))
+        try:
+            with open(os.path.join(dest_folder, VPK_FINGERPRINT_FILE)) as f:
+                old_fingerprint = f.read().strip()
+        except FileNotFoundError:
+            old_fingerprint = ''
+
+        if (
+            old_fingerprint == fingerprint and
+            os.path.isfile(os.path.join(dest_folder, 'pak01_dir.vpk'))
+        ):
+            LOGGER.info('VPK contents unchanged, not rebuilding.')
+            return
+
         try:
             dest_folder = StyleVPK.clear_vpk_files(exp_data.game)
         except PermissionError:
@@ -2911,26 +2952,120 @@ class StyleVPK(PakObject, has_img=False):
             if sel_vpk is not None:
                 for file in sel_vpk.fsys.walk_folder(sel_vpk.dir):
                     with file.open_bin() as open_file:
-                        vpk_file.add_file(
+                        StyleVPK._add_file_stream(
+                            vpk_file,
                             file.path,
-                            open_file.read(),
+                            open_file,
                             sel_vpk.dir,
                         )
 
-            # Additionally, pack in game/vpk_override/ into the vpk - this allows
-            # users to easily override resources in general.
+            for rel_path, full_path in override_files:
+                with open(full_path, 'rb') as open_file:
+                    StyleVPK._add_file_stream(vpk_file, rel_path, open_file)
 
-            override_folder = exp_data.game.abs_path('vpk_override')
-            os.makedirs(override_folder, exist_ok=True)
+        # Only write this once the VPK is complete, so a failed export is
+        # redone next time.
+        with open(os.path.join(dest_folder, VPK_FINGERPRINT_FILE), 'w') as f:
+            f.write(fingerprint)
 
-            # Also write a file to explain what it's for..
-            with open(os.path.join(override_folder, 'BEE2_README.txt'), 'w') as f:
-                f.write(VPK_OVERRIDE_README)
+        LOGGER.info('Written {} files to VPK!', len(vpk_file))
 
-            vpk_file.add_folder(override_folder)
-            del vpk_file['BEE2_README.txt']  # Don't add this to the VPK though..
+    @staticmethod
+    def _override_files(override_folder: str) -> List[Tuple[str, str]]:
+        """Find the files in vpk_override/ to pack into the VPK.
 
-        LOGGER.info('Written {} files to VPK!', len(vpk_file))
+        This returns (relative, full) path pairs, skipping our readme.
+        """
+        files = []
+        for subfolder, dirnames, filenames in os.walk(override_folder):
+            rel_folder = os.path.relpath(subfolder, override_folder)
+            for filename in filenames:
+                if rel_folder == '.':
+                    if filename == 'BEE2_README.txt':
+                        continue
+                    rel_path = filename
+                else:
+                    rel_path = os.path.join(rel_folder, filename)
+                files.append((
+                    rel_path.replace('\\', '/'),
+                    os.path.join(subfolder, filename),
+                ))
+        files.sort()
+        return files
+
+    @staticmethod
+    def _fingerprint(
+        sel_vpk: Optional['StyleVPK'],
+        override_files: List[Tuple[str, str]],
+    ) -> str:
+        """Compute a fingerprint of all the files that will be in the VPK.
+
+        This uses the sizes and modification times of the override files,
+        and the cache keys of the package files (CRCs for zips).
+        """
+        crc = 0
+        if sel_vpk is not None:
+            crc = zlib.crc32(sel_vpk.id.casefold().encode('utf8'), crc)
+            for file in sel_vpk.fsys.walk_folder(sel_vpk.dir):
+                key = file.cache_key()
+                if key == -1:
+                    # Not available for this filesystem, check the data.
+                    with file.open_bin() as f:
+                        for chunk in iter(lambda: f.read(VPK_CHUNK_SIZE), b''):
+                            key = zlib.crc32(chunk, key)
+                crc = zlib.crc32(
+                    '{}\0{}\0'.format(file.path, key).encode('utf8'),
+                    crc,
+                )
+        for rel_path, full_path in override_files:
+            stat = os.stat(full_path)
+            crc = zlib.crc32(
+                '{}\0{}\0{}\0'.format(
+                    rel_path, stat.st_size, stat.st_mtime_ns,
+                ).encode('utf8'),
+                crc,
+            )
+        return '{:08x}-{}'.format(crc, len(override_files))
+
+    @staticmethod
+    def _add_file_stream(
+        vpk_file: VPK,
+        filename: str,
+        src: BinaryIO,
+        root: str=None,
+    ) -> None:
+        """Add a file to the VPK, copying the data over in chunks.
+
+        This is equivalent to vpk_file.add_file(filename, src.read(), root),
+        without needing the whole file in memory.
+        """
+        info = vpk_file.new_file(filename, root)
+        info.start_data = start_data = src.read(vpk_file.dir_limit)
+        crc = zlib.crc32(start_data)
+
+        chunk = src.read(VPK_CHUNK_SIZE)
+        if not chunk:
+            # Only stored in the main index
+            info.arch_index = None
+            info.offset = info.arch_len = 0
+            info.crc = crc
+            return
+
+        arch_file = os.path.join(
+            vpk_file.folder,
+            '{}_{:03}.vpk'.format(vpk_file.file_prefix, 0),
+        )
+        arch_len = 0
+        with open(arch_file, 'ab') as dest:
+            info.arch_index = 0
+            info.offset = dest.seek(0, os.SEEK_END)
+            while chunk:
+                crc = zlib.crc32(chunk, crc)
+                arch_len += len(chunk)
+                dest.write(chunk)
+                chunk = src.read(VPK_CHUNK_SIZE)
+        info.arch_len = arch_len
+        info.crc = crc
 
     @staticmethod
     def iter_vpk_names():
@@ -7,6 +7,9 @@ they will be copied to any packages with those resources.
 
 The destination will be 'Portal 2/bee2_dev/' if that exists, or 'Portal 2/bee2/'
 otherwise.
+
+Pass --watch before the folders to keep running, and sync files in them
+whenever they're modified.
 """
 
 import utils
@@ -24,9 +27,12 @@ gettext.NullTranslations().install(['gettext', 'ngettext'])
 
 import os
 import sys
+import time
 import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Dict, Tuple, Iterable, Set
 
 import shutil
 
@@ -40,6 +46,20 @@ from packageLoader import (
 # If true, user said * for packages - use last for all.
 PACKAGE_REPEAT: Optional[RawFileSystem] = None
 
+# Number of threads used to copy files.
+COPY_THREADS = 8
+# In watch mode, how often to check for changes and how long the files must
+# stay unchanged before syncing, in seconds.
+WATCH_INTERVAL = 0.5
+WATCH_DEBOUNCE = 1.0
+
+# Files with these extensions are never copied.
+IGNORED_EXTS = ('.vmx', '.log', '.bsp', '.prt', '.lin')
+
+# Maps casefolded resource paths (resources/...) to the unzipped packages
+# containing them.
+ResourceIndex = Dict[str, List[RawFileSystem]]
+
 
 def get_package(file: Path) -> RawFileSystem:
     """Get the package desired for a file."""
@@ -81,8 +101,34 @@ def get_package(file: Path) -> RawFileSystem:
             return fsys
 
 
-def check_file(file: Path, portal2: Path, packages: Path) -> None:
-    """Check for the location this file is in, and copy it to the other place."""
+def build_resource_index() -> ResourceIndex:
+    """Find all the resources in unzipped packages.
+
+    Zipped packages are skipped, since we can't write to those.
+    """
+    index = defaultdict(list)  # type: ResourceIndex
+    for package in PACKAGES.values():
+        if not isinstance(package.fsys, RawFileSystem):
+            # In a zip or the like.
+            continue
+        for file in package.fsys.walk_folder('resources'):
+            index[file.path.replace('\\', '/').casefold()].append(package.fsys)
+    return index
+
+
+def check_file(
+    file: Path,
+    portal2: Path,
+    packages: Path,
+    res_index: ResourceIndex,
+    dev_folder: str,
+) -> List[Tuple[Path, Path]]:
+    """Check for the location this file is in, and find where to copy it.
+
+    This returns a list of (source, dest) pairs.
+    dev_folder is either 'bee2_dev' or 'bee2', the folder in Portal 2 which
+    resources are placed in.
+    """
     try:
         relative = file.relative_to(portal2)
     except ValueError:
@@ -93,13 +139,13 @@ def check_file(file: Path, portal2: Path, packages: Path) -> None:
         except ValueError:
             # Not in either.
             LOGGER.warning('File "{!s}" not in packages or Portal 2!', file)
-            return
+            return []
         part = relative.parts
         try:
             res_path = Path(*part[part.index('resources')+1:])
-        except IndexError:
+        except (IndexError, ValueError):
             LOGGER.warning('File "{!s} not a resource!', file)
-            return
+            return []
 
         if res_path.parts[0] == 'instances':
             dest = (
@@ -109,15 +155,10 @@ def check_file(file: Path, portal2: Path, packages: Path) -> None:
             )
         elif res_path.parts[0] == 'bee2':
             LOGGER.warning('File "{!s}" not for copying!', file)
-            return
+            return []
         else:
-            if (portal2 / 'bee2_dev').exists():
-                dest = portal2 / 'bee2_dev' / res_path
-            else:
-                dest = portal2 / 'bee2' / res_path
-        LOGGER.info('"{}" -> "{}"', file, dest)
-        os.makedirs(str(dest.parent), exist_ok=True)
-        shutil.copy(str(file), str(dest))
+            dest = portal2 / dev_folder / res_path
+        return [(file, dest)]
     else:
         # In Portal 2, copy to each matching package.
         try:
@@ -125,31 +166,141 @@ def check_file(file: Path, portal2: Path, packages: Path) -> None:
                 'sdk_content/maps/instances/bee2'
             )
         except ValueError:
-            rel_loc = Path('resources') / relative.relative_to(
-                'bee2_dev' if (portal2 / 'bee2_dev').exists() else 'bee2'
-            )
+            rel_loc = Path('resources') / relative.relative_to(dev_folder)
 
-        target_systems = []
-
-        for package in PACKAGES.values():
-            if not isinstance(package.fsys, RawFileSystem):
-                # In a zip or the like.
-                continue
-            if str(rel_loc) in package.fsys:
-                target_systems.append(package.fsys)
+        key = rel_loc.as_posix().casefold()
+        target_systems = res_index.get(key)
 
         if not target_systems:
             # This file is totally new.
             try:
-                target_systems.append(get_package(rel_loc))
+                target_systems = res_index[key] = [get_package(rel_loc)]
             except KeyboardInterrupt:
-                return
+                return []
+
+        return [
+            (file, Path(fsys.path, rel_loc))
+            for fsys in target_systems
+        ]
+
+
+def copy_file(src: Path, dest: Path) -> None:
+    """Copy a single file, creating folders as required."""
+    LOGGER.info('"{}" -> "{}"', src, dest)
+    os.makedirs(str(dest.parent), exist_ok=True)
+    shutil.copy(str(src), str(dest))
+
+
+def sync_files(
+    files: Iterable[Path],
+    portal2: Path,
+    packages: Path,
+    res_index: ResourceIndex,
+) -> None:
+    """Sync a batch of files.
+
+    All the destinations are found first (which may prompt the user), then
+    the copies are done concurrently.
+    """
+    dev_folder = 'bee2_dev' if (portal2 / 'bee2_dev').exists() else 'bee2'
+    copies = []  # type: List[Tuple[Path, Path]]
+    for file in files:
+        copies += check_file(file, portal2, packages, res_index, dev_folder)
+
+    LOGGER.info('Copying {} files...', len(copies))
+    with ThreadPoolExecutor(COPY_THREADS) as pool:
+        # Iterate the results, so exceptions are raised.
+        for __ in pool.map(lambda pair: copy_file(*pair), copies):
+            pass
+
+
+def expand_files(files: Iterable[Path]) -> Set[Path]:
+    """Find all the files in the given files or folders which should be synced.
+
+    This skips temporary and compile files, and adds the other files
+    making up models.
+    """
+    file_list = []  # type: List[Path]
+
+    for file_path in files:
+        if file_path.is_dir():
+            for sub_file in file_path.glob('**/*'):  # type: Path
+                if sub_file.is_file():
+                    file_list.append(sub_file)
+        else:
+            file_list.append(file_path)
+
+    files_to_check = set()
+
+    for file_path in file_list:
+        if file_path.suffix.casefold() in IGNORED_EXTS:
+            # Ignore these file types.
+            continue
+        files_to_check.add(file_path)
+        if file_path.suffix == '.mdl':
+            for suffix in ['.vvd', '.phy', '.dx90.vtx', '.sw.vtx']:
+                sub_file = file_path.with_suffix(suffix)
+                if sub_file.exists():
+                    files_to_check.add(sub_file)
+    return files_to_check
 
-        for fsys in target_systems:
-            full_loc = fsys.path / rel_loc
-            LOGGER.info('"{}" -> "{}"', file, full_loc)
-            os.makedirs(str(full_loc.parent), exist_ok=True)
-            shutil.copy(str(file), str(full_loc))
+
+def scan_mtimes(paths: Iterable[Path]) -> Dict[Path, int]:
+    """Record the modification times of all files in the given paths."""
+    mtimes = {}
+    for path in paths:
+        if path.is_dir():
+            files = path.glob('**/*')  # type: Iterable[Path]
+        else:
+            files = [path]
+        for file in files:
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            if not file.is_dir():
+                mtimes[file] = stat.st_mtime_ns
+    return mtimes
+
+
+def watch(
+    paths: List[Path],
+    portal2: Path,
+    packages: Path,
+    res_index: ResourceIndex,
+) -> None:
+    """Watch the given paths, and sync files when they change.
+
+    Changes are only synced once no files have been modified for
+    WATCH_DEBOUNCE seconds, so saving many files at once is one batch.
+    """
+    LOGGER.info('Watching for changes, press Ctrl-C to stop.')
+    known = scan_mtimes(paths)
+    changed = set()  # type: Set[Path]
+    last_change = 0.0
+    try:
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            current = scan_mtimes(paths)
+            new_changes = {
+                file for file, mtime in current.items()
+                if known.get(file) != mtime
+            }
+            known = current
+            if new_changes:
+                changed |= new_changes
+                last_change = time.monotonic()
+            elif changed and time.monotonic() - last_change >= WATCH_DEBOUNCE:
+                sync_files(
+                    expand_files(changed),
+                    portal2, packages, res_index,
+                )
+                changed.clear()
+                # Don't treat our copies as changes, if they're inside
+                # the watched folders.
+                known = scan_mtimes(paths)
+    except KeyboardInterrupt:
+        LOGGER.info('Stopped watching.')
 
 
 def print_package_ids() -> None:
@@ -165,6 +316,10 @@ def print_package_ids() -> None:
 
 def main(files: List[str]) -> int:
     """Run the transfer."""
+    watch_mode = bool(files) and files[0] == '--watch'
+    if watch_mode:
+        files = files[1:]
+
     if not files:
         LOGGER.error('No files to copy!')
         LOGGER.error('packages_sync: {}', __doc__)
@@ -195,34 +350,20 @@ def main(files: List[str]) -> int:
 
     package_loc = Path('../', GEN_OPTS['Directories']['package']).resolve()
 
-    file_list = []  # type: List[Path]
+    LOGGER.info('Indexing package resources...')
+    res_index = build_resource_index()
 
-    for file in files:
-        file_path = Path(file)
-        if file_path.is_dir():
-            for sub_file in file_path.glob('**/*'):  # type: Path
-                if sub_file.is_file():
-                    file_list.append(sub_file)
-        else:
-            file_list.append(file_path)
+    paths = [Path(file) for file in files]
 
-    files_to_check = set()
+    if watch_mode:
+        watch(paths, portal2_loc, package_loc, res_index)
+        return 0
 
-    for file_path in file_list:
-        if file_path.suffix.casefold() in ('.vmx', '.log', '.bsp', '.prt', '.lin'):
-            # Ignore these file types.
-            continue
-        files_to_check.add(file_path)
-        if file_path.suffix == '.mdl':
-            for suffix in ['.vvd', '.phy', '.dx90.vtx', '.sw.vtx']:
-                sub_file = file_path.with_suffix(suffix)
-                if sub_file.exists():
-                    files_to_check.add(sub_file)
+    files_to_check = expand_files(paths)
 
     LOGGER.info('Processing {} files...', len(files_to_check))
 
-    for file_path in files_to_check:
-        check_file(file_path, portal2_loc, package_loc)
+    sync_files(files_to_check, portal2_loc, package_loc, res_index)
 
     return 0
 
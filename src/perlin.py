@@ -26,9 +26,16 @@ SOFTWARE.
 
 __version__ = '$Id: perlin.py 521 2008-12-15 03:03:52Z casey.duncan $'
 
+from itertools import repeat
 from math import floor, fmod, sqrt
 from random import randint
 
+try:
+	import numpy
+except ImportError:
+	# The batch functions fall back to the scalar versions.
+	numpy = None
+
 # 3D Gradient vectors
 _GRAD3 = ((1,1,0),(-1,1,0),(1,-1,0),(-1,-1,0),
 	(1,0,1),(-1,0,1),(1,0,-1),(-1,0,-1),
@@ -300,10 +307,104 @@ class SimplexNoise(BaseNoise):
 
 		return noise * 32.0
 
+	def noise3_many(self, xs, ys, zs):
+		"""3D Perlin simplex noise, for many points at once.
+
+		xs, ys and zs are equal-length sequences of coordinates. This returns
+		a NumPy array of values, each exactly equal to what noise3() gives
+		for that point. If NumPy is not available a list is returned instead.
+		"""
+		if numpy is None:
+			return [self.noise3(x, y, z) for x, y, z in zip(xs, ys, zs)]
+
+		x = numpy.asarray(xs, dtype=numpy.float64)
+		y = numpy.asarray(ys, dtype=numpy.float64)
+		z = numpy.asarray(zs, dtype=numpy.float64)
+
+		# Skew the input space to determine which simplex cell we're in
+		s = (x + y + z) * _F3
+		i = numpy.floor(x + s)
+		j = numpy.floor(y + s)
+		k = numpy.floor(z + s)
+		t = (i + j + k) * _G3
+		x0 = x - (i - t) # "Unskewed" distances from cell origin
+		y0 = y - (j - t)
+		z0 = z - (k - t)
+
+		# Compute all six branches of noise3()'s simplex selection as masks.
+		xy = x0 >= y0
+		yz = y0 >= z0
+		xz = x0 >= z0
+		case_a = xy & yz
+		case_b = xy & ~yz & xz
+		case_c = xy & ~yz & ~xz
+		case_d = ~xy & ~yz
+		case_e = ~xy & yz & ~xz
+		case_f = ~xy & yz & xz
+
+		i1 = (case_a | case_b).astype(numpy.int64)
+		j1 = (case_e | case_f).astype(numpy.int64)
+		k1 = (case_c | case_d).astype(numpy.int64)
+		i2 = (case_a | case_b | case_c | case_f).astype(numpy.int64)
+		j2 = (case_a | case_d | case_e | case_f).astype(numpy.int64)
+		k2 = (case_b | case_c | case_d | case_e).astype(numpy.int64)
+
+		# Offsets for remaining corners
+		x1 = x0 - i1 + _G3
+		y1 = y0 - j1 + _G3
+		z1 = z0 - k1 + _G3
+		x2 = x0 - i2 + 2.0 * _G3
+		y2 = y0 - j2 + 2.0 * _G3
+		z2 = z0 - k2 + 2.0 * _G3
+		x3 = x0 - 1.0 + 3.0 * _G3
+		y3 = y0 - 1.0 + 3.0 * _G3
+		z3 = z0 - 1.0 + 3.0 * _G3
+
+		# Calculate the hashed gradient indices of the four simplex corners
+		perm = numpy.array(self.permutation, dtype=numpy.int64)
+		grad = numpy.array(_GRAD3, dtype=numpy.int64)
+		ii = i.astype(numpy.int64) % self.period
+		jj = j.astype(numpy.int64) % self.period
+		kk = k.astype(numpy.int64) % self.period
+		gi0 = perm[ii + perm[jj + perm[kk]]] % 12
+		gi1 = perm[ii + i1 + perm[jj + j1 + perm[kk + k1]]] % 12
+		gi2 = perm[ii + i2 + perm[jj + j2 + perm[kk + k2]]] % 12
+		gi3 = perm[ii + 1 + perm[jj + 1 + perm[kk + 1]]] % 12
+
+		# Calculate the contribution from the four corners. Corners outside
+		# the radius are skipped entirely, like the scalar version does.
+		noise = numpy.zeros_like(x)
+		for gi, cx, cy, cz in (
+			(gi0, x0, y0, z0),
+			(gi1, x1, y1, z1),
+			(gi2, x2, y2, z2),
+			(gi3, x3, y3, z3),
+		):
+			# Use the same operations as noise3(), so rounding is identical.
+			tt = 0.6 - _pow_many(cx, 2) - _pow_many(cy, 2) - _pow_many(cz, 2)
+			used = tt > 0
+			g = grad[gi[used]]
+			noise[used] += _pow_many(tt[used], 4) * (
+				g[:, 0] * cx[used] + g[:, 1] * cy[used] + g[:, 2] * cz[used]
+			)
+
+		return noise * 32.0
+
 
 def lerp(t, a, b):
 	return a + t * (b - a)
 
+def _pow_many(arr, exp):
+	"""Raise each value in an array to a power, rounding exactly like **.
+
+	NumPy's power() is not always identical to the C library's pow(), which
+	would make the batch noise functions differ from the scalar ones.
+	"""
+	return numpy.fromiter(
+		map(pow, arr.tolist(), repeat(exp)),
+		numpy.float64, len(arr),
+	)
+
 def grad3(hash, x, y, z):
 	g = _GRAD3[hash % 16]
 	return x*g[0] + y*g[1] + z*g[2]
@@ -357,6 +458,60 @@ class TileableNoise(BaseNoise):
 								 lerp(fx, grad3(perm[AB + kk], x, y - 1, z - 1),
 										  grad3(perm[BB + kk], x - 1, y - 1, z - 1))))
 
+	def noise3_many(self, xs, ys, zs, repeat, base=0.0):
+		"""Tileable 3D noise, for many points at once.
 
+		xs, ys and zs are equal-length sequences of coordinates, the other
+		parameters are the same as noise3(). This returns a NumPy array of
+		values, each exactly equal to what noise3() gives for that point.
+		If NumPy is not available a list is returned instead.
+		"""
+		if numpy is None:
+			return [
+				self.noise3(x, y, z, repeat, base)
+				for x, y, z in zip(xs, ys, zs)
+			]
+
+		x = numpy.asarray(xs, dtype=numpy.float64)
+		y = numpy.asarray(ys, dtype=numpy.float64)
+		z = numpy.asarray(zs, dtype=numpy.float64)
+
+		# fmod() keeps the sign, so these may be negative - the permutation
+		# lookup then wraps around from the end just like a tuple does.
+		i = numpy.fmod(numpy.floor(x), repeat).astype(numpy.int64)
+		j = numpy.fmod(numpy.floor(y), repeat).astype(numpy.int64)
+		k = numpy.fmod(numpy.floor(z), repeat).astype(numpy.int64)
+		ii = (i + 1) % repeat
+		jj = (j + 1) % repeat
+		kk = (k + 1) % repeat
+		if base:
+			i = i + base; j = j + base; k = k + base
+			ii = ii + base; jj = jj + base; kk = kk + base
+
+		x = x - numpy.floor(x); y = y - numpy.floor(y); z = z - numpy.floor(z)
+		fx = _pow_many(x, 3) * (x * (x * 6 - 15) + 10)
+		fy = _pow_many(y, 3) * (y * (y * 6 - 15) + 10)
+		fz = _pow_many(z, 3) * (z * (z * 6 - 15) + 10)
+
+		perm = numpy.array(self.permutation, dtype=numpy.int64)
+		grad = numpy.array(_GRAD3, dtype=numpy.int64)
+
+		def grad3_many(hash, x, y, z):
+			g = grad[hash % 16]
+			return x*g[:, 0] + y*g[:, 1] + z*g[:, 2]
 
+		A = perm[i]
+		AA = perm[A + j]
+		AB = perm[A + jj]
+		B = perm[ii]
+		BA = perm[B + j]
+		BB = perm[B + jj]
 
+		return lerp(fz, lerp(fy, lerp(fx, grad3_many(perm[AA + k], x, y, z),
+										  grad3_many(perm[BA + k], x - 1, y, z)),
+								 lerp(fx, grad3_many(perm[AB + k], x, y - 1, z),
+										  grad3_many(perm[BB + k], x - 1, y - 1, z))),
+						lerp(fy, lerp(fx, grad3_many(perm[AA + kk], x, y, z - 1),
+										  grad3_many(perm[BA + kk], x - 1, y, z - 1)),
+								 lerp(fx, grad3_many(perm[AB + kk], x, y - 1, z - 1),
+										  grad3_many(perm[BB + kk], x - 1, y - 1, z - 1))))
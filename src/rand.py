@@ -0,0 +1,111 @@
+"""Deterministic random number generation for the compiler.
+
+Instead of re-seeding the global random module (which hashes the seed with
+SHA-512 and re-initialises the entire Mersenne Twister state), callers get a
+lightweight, independent generator from seed(). Each is keyed on a string,
+so the same key always produces the same values.
+
+If COMPAT_MODE is enabled, the global generator is seeded exactly like older
+versions did instead, and the returned generator draws from it. That
+reproduces their results, including for code which uses the global generator
+afterward.
+"""
+import hashlib
+import random
+
+__all__ = ['COMPAT_MODE', 'SplitMix', 'GlobalRandom', 'seed']
+
+# If set, seed() re-seeds the global generator and returns a generator using it.
+COMPAT_MODE = False
+
+MASK_64 = (1 << 64) - 1
+# Golden ratio increment used by SplitMix64.
+GAMMA = 0x9E3779B97F4A7C15
+
+
+class SplitMix(random.Random):
+    """A small, fast generator implementing the SplitMix64 algorithm.
+
+    The state is a single 64-bit integer, so seeding is cheap. Since this
+    subclasses random.Random to provide the usual methods (choice(),
+    randrange(), uniform() etc), each instance still carries an unused
+    Mersenne Twister state of about 2.5KB.
+    """
+    def __init__(self, state: int) -> None:
+        self._state = 0
+        super().__init__(state)
+
+    def seed(self, a: int=0, version: int=2) -> None:
+        """Reset the state of the generator."""
+        self._state = int(a) & MASK_64
+        self.gauss_next = None
+
+    def getstate(self) -> int:
+        """Return the current state of the generator."""
+        return self._state
+
+    def setstate(self, state: int) -> None:
+        """Restore a state returned by getstate()."""
+        self._state = state
+        self.gauss_next = None
+
+    def _next(self) -> int:
+        """Produce the next 64-bit output."""
+        self._state = z = (self._state + GAMMA) & MASK_64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK_64
+        return z ^ (z >> 31)
+
+    def random(self) -> float:
+        """Return a float in the range [0, 1)."""
+        return (self._next() >> 11) * (1.0 / (1 << 53))
+
+    def getrandbits(self, k: int) -> int:
+        """Return an integer with k random bits."""
+        if k <= 0:
+            return 0
+        result = 0
+        bits = 0
+        while bits < k:
+            result = (result << 64) | self._next()
+            bits += 64
+        return result >> (bits - k)
+
+
+class GlobalRandom(random.Random):
+    """A generator which uses the global generator's state, for COMPAT_MODE.
+
+    Seeding this re-seeds the global generator.
+    """
+    def seed(self, a=None, version: int=2) -> None:
+        """Re-seed the global generator."""
+        random.seed(a, version)
+        self.gauss_next = None
+
+    def getstate(self):
+        """Return the current state of the global generator."""
+        return random.getstate()
+
+    def setstate(self, state) -> None:
+        """Restore a state of the global generator."""
+        random.setstate(state)
+
+    def random(self) -> float:
+        """Return a float in the range [0, 1)."""
+        return random.random()
+
+    def getrandbits(self, k: int) -> int:
+        """Return an integer with k random bits."""
+        return random.getrandbits(k)
+
+
+def seed(key: str) -> random.Random:
+    """Return a generator for this key.
+
+    The key should be unique to the location/item the values are used for.
+    """
+    if COMPAT_MODE:
+        # Other code may use the global state afterward.
+        return GlobalRandom(key)
+    digest = hashlib.blake2b(key.encode('utf8'), digest_size=8).digest()
+    return SplitMix(int.from_bytes(digest, 'little'))
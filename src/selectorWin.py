@@ -13,6 +13,7 @@ from tk_tools import TK_ROOT
 from collections import namedtuple, defaultdict
 from operator import itemgetter
 from enum import Enum
+import bisect
 import functools
 import math
 
@@ -27,6 +28,8 @@ import sound
 import utils
 import tk_tools
 
+from typing import Dict, List, Optional, Set, Tuple
+
 
 LOGGER = srctools.logger.get_logger(__name__)
 
@@ -34,6 +37,9 @@ ICON_SIZE = 96  # Size of the selector win icons
 ICON_SIZE_LRG = (256, 192)  # Size of the larger icon shown in description.
 ITEM_WIDTH = ICON_SIZE + (32 if utils.MAC else 16)
 ITEM_HEIGHT = ICON_SIZE + 51
+# Rows of items above and below the visible area which are also created,
+# so scrolling doesn't show blank space.
+OVERSCAN_ROWS = 2
 
 # The larger error icons used if an image is not found
 err_icon = img.png('BEE2/error_96', resize_to=ICON_SIZE)
@@ -249,7 +255,8 @@ class Item:
     - group: Items with the same group name will be shown together.
     - attrs: a dictionary containing the attribute values for this item.
 
-    - button, Set later, the button TK object for this item
+    - button: The button TK object for this item. Buttons are only assigned
+      while the item is scrolled into view, otherwise this is None.
     """
     __slots__ = [
         'name',
@@ -345,15 +352,6 @@ class Item:
             attributes=attrs,
         )
 
-    def set_pos(self, x=None, y=None):
-        """Place the item on the palette."""
-        if x is None or y is None:
-            # Remove from the window.
-            self.button.place_forget()
-        else:
-            self.button.place(x=x, y=y)
-            self.button.lift()  # Force a particular stacking order for widgets
-        
     def copy(self) -> 'Item':
         """Duplicate an item."""
         item = Item.__new__(Item)
@@ -532,6 +530,23 @@ class selWin:
         # The maximum number of items that fits per row (set in flow_items)
         self.item_width = 1
 
+        # The layout computed by flow_items(). Items are only given buttons
+        # when their row is near the visible area, and those are recycled
+        # when scrolled out of view.
+        # The y positions of each row, and the items in that row.
+        self._row_y = []  # type: List[int]
+        self._row_items = []  # type: List[List[Item]]
+        # Item -> (x, y) position of the row.
+        self._item_pos = {}  # type: Dict[Item, Tuple[int, int]]
+        # The total height of the items.
+        self._total_height = 0
+        # Items with buttons, and unused buttons.
+        self._shown_items = set()  # type: Set[Item]
+        self._button_pool = []  # type: List[ttk.Button]
+        # Set by the first flow_items() call, and <Configure> events.
+        self._header_height = None  # type: Optional[int]
+        self._view_height = 0
+
         if desc:
             self.desc_label = ttk.Label(
                 self.win,
@@ -573,7 +588,7 @@ class selWin:
             command=self.wid_canvas.yview,
         )
         self.wid_scroll.grid(row=0, column=1, sticky="NS")
-        self.wid_canvas['yscrollcommand'] = self.wid_scroll.set
+        self.wid_canvas['yscrollcommand'] = self._canvas_scrolled
 
         utils.add_mousewheel(self.wid_canvas, self.win)
 
@@ -750,20 +765,10 @@ class selWin:
 
         for ind, item in enumerate(self.item_list):
             item._selector = self
+            item.button = None
 
             if item == self.noneItem:
-                item.button = ttk.Button(
-                    self.pal_frame,
-                    image=item.icon,
-                )
                 item.context_lbl = none_name
-            else:
-                item.button = ttk.Button(
-                    self.pal_frame,
-                    text=item.shortName,
-                    image=item.icon,
-                    compound='top',
-                )
 
             group_key = item.group.casefold()
             self.grouped_items[group_key].append(item)
@@ -791,19 +796,6 @@ class selWin:
             )
             item._context_ind = len(self.grouped_items[group_key]) - 1
 
-            @utils.bind_leftclick(item.button)
-            def click_item(event=None, *, _item=item):
-                """Handle clicking on the item.
-
-                If it's already selected, save and close the window.
-                """
-                # We need to capture the item in a default, since it's
-                # the same variable in different iterations
-                if _item is self.selected:
-                    self.save()
-                else:
-                    self.sel_item(_item)
-
         # Convert to a normal dictionary, after adding all items.
         self.grouped_items = dict(self.grouped_items)
 
@@ -1096,9 +1088,11 @@ class selWin:
 
         self.prop_desc.set_text(item.desc)
 
-        self.selected.button.state(('!alternate',))
+        if self.selected.button is not None:
+            self.selected.button.state(('!alternate',))
         self.selected = item
-        item.button.state(('alternate',))
+        if item.button is not None:
+            item.button.state(('alternate',))
         self.scroll_to(item)
 
         if self.sampler:
@@ -1290,23 +1284,34 @@ class selWin:
         """Reposition all the items to fit in the current geometry.
 
         Called on the <Configure> event.
+        The positions are calculated from the group sizes, then only the
+        items which are visible are actually placed.
         """
-        self.pal_frame.update_idletasks()
-        self.pal_frame['width'] = self.wid_canvas.winfo_width()
+        canvas_width = self.wid_canvas.winfo_width()
+        if e is not None:
+            self._view_height = e.height
+        self.pal_frame['width'] = canvas_width
         self.prop_name['wraplength'] = self.prop_desc.winfo_width()
         if self.desc_label is not None:
             self.desc_label['wraplength'] = self.win.winfo_width()
 
-        width = (self.wid_canvas.winfo_width() - 10) // ITEM_WIDTH
+        width = (canvas_width - 10) // ITEM_WIDTH
         if width < 1:
             width = 1  # we got way too small, prevent division by zero
         self.item_width = width
 
+        if self._header_height is None:
+            # All the headers are the same height, so just check one.
+            header = self.group_widgets[self.group_order[0]]
+            header.update_idletasks()
+            self._header_height = header.winfo_reqheight()
+
         # The offset for the current group
         y_off = 0
 
-        # Hide suggestion indicator if the item's not visible.
-        self.sugg_lbl.place_forget()
+        self._row_y.clear()
+        self._row_items.clear()
+        self._item_pos.clear()
 
         for group_key in self.group_order:
             items = self.grouped_items[group_key]
@@ -1316,33 +1321,23 @@ class selWin:
                 y=y_off,
                 width=width * ITEM_WIDTH,
             )
-            group_wid.update_idletasks()
-            y_off += group_wid.winfo_reqheight()
+            y_off += self._header_height
 
             if not group_wid.visible:
-                # Hide everything!
-                for item in items:  # type: Item
-                    item.set_pos()
                 continue
 
-            # Place each item
-            for i, item in enumerate(items):  # type: int, Item
-                if item == self.suggested:
-                    self.sugg_lbl.place(
-                        x=(i % width) * ITEM_WIDTH + 1,
-                        y=(i // width) * ITEM_HEIGHT + y_off,
-                    )
-                    self.sugg_lbl['width'] = item.button.winfo_width()
-                item.set_pos(
-                    x=(i % width) * ITEM_WIDTH + 1,
-                    y=(i // width) * ITEM_HEIGHT + y_off + 20,
-                )
-                item.button['text'] = item.shortName
-                item.button['image'] = item.icon
+            for row_start in range(0, len(items), width):
+                row = items[row_start:row_start + width]
+                row_y = (row_start // width) * ITEM_HEIGHT + y_off
+                self._row_y.append(row_y)
+                self._row_items.append(row)
+                for i, item in enumerate(row):  # type: int, Item
+                    self._item_pos[item] = (i * ITEM_WIDTH + 1, row_y)
 
             # Increase the offset by the total height of this item section
             y_off += math.ceil(len(items) / width) * ITEM_HEIGHT + 5
 
+        self._total_height = y_off
         # Set the size of the canvas and frame to the amount we've used
         self.wid_canvas['scrollregion'] = (
             0, 0,
@@ -1350,12 +1345,109 @@ class selWin:
             y_off,
         )
         self.pal_frame['height'] = y_off
+        self.refresh_visible()
+
+    def _canvas_scrolled(self, first, last):
+        """Called when the canvas scrolls, to update the scrollbar and items."""
+        self.wid_scroll.set(first, last)
+        self.refresh_visible()
+
+    def refresh_visible(self):
+        """Give buttons to the items which are in view, and remove the rest."""
+        view_height = self._view_height
+        if view_height <= 1:
+            view_height = self.wid_canvas.winfo_height()
+        overscan = OVERSCAN_ROWS * ITEM_HEIGHT
+        view_top = self.wid_canvas.canvasy(0)
+        # Rows start this far above the area, so they may still overlap it.
+        top = view_top - overscan - ITEM_HEIGHT
+        bottom = view_top + view_height + overscan
+
+        first_row = bisect.bisect_right(self._row_y, top)
+        last_row = bisect.bisect_right(self._row_y, bottom)
+
+        visible = set()
+        for row in self._row_items[first_row:last_row]:
+            visible.update(row)
+
+        for item in self._shown_items - visible:
+            self._hide_item(item)
+
+        # Hide suggestion indicator if the item's not visible.
+        self.sugg_lbl.place_forget()
+
+        for item in visible:
+            x, y = self._item_pos[item]
+            button = self._show_item(item)
+            if item == self.suggested:
+                self.sugg_lbl.place(x=x, y=y)
+                self.sugg_lbl['width'] = button.winfo_reqwidth()
+            button.place(x=x, y=y + 20)
+            button.lift()  # Force a particular stacking order for widgets
+        self._shown_items = visible
+
+    def _show_item(self, item: Item) -> ttk.Button:
+        """Assign a button to this item, if it doesn't have one."""
+        button = item.button
+        if button is not None:
+            return button
+        try:
+            button = self._button_pool.pop()
+        except IndexError:
+            button = ttk.Button(self.pal_frame)
+            utils.bind_leftclick(
+                button,
+                functools.partial(self._click_button, button),
+            )
+
+        button.item = item
+        item.button = button
+        button.configure(
+            text=item.shortName,
+            image=item.icon,
+            compound='image' if item == self.noneItem else 'top',
+        )
+        if item is self.selected:
+            button.state(('alternate',))
+        else:
+            button.state(('!alternate',))
+        return button
+
+    def _hide_item(self, item: Item):
+        """Remove the button for this item, so it can be reused."""
+        button = item.button
+        if button is None:
+            return
+        button.place_forget()
+        button.item = item.button = None
+        self._button_pool.append(button)
+
+    def _click_button(self, button, event=None):
+        """Handle clicking on an item.
+
+        If it's already selected, save and close the window.
+        """
+        item = button.item
+        if item is None:
+            return
+        if item is self.selected:
+            self.save()
+        else:
+            self.sel_item(item)
 
     def scroll_to(self, item):
         """Scroll to an item so it's visible."""
         canvas = self.wid_canvas
 
-        height = canvas.bbox(ALL)[3]  # Returns (x, y, width, height)
+        try:
+            x, y = self._item_pos[item]
+        except KeyError:
+            return  # Not laid out yet, or in a hidden group.
+        y += 20
+
+        height = self._total_height
+        if height <= 0:
+            return
 
         bottom, top = canvas.yview()
         # The sizes are returned in fractions, but we use the pixel values
@@ -1363,8 +1455,6 @@ class selWin:
         bottom *= height
         top *= height
 
-        y = item.button.winfo_y()
-
         if bottom <= y - 8 and y + ICON_SIZE + 8 <= top:
             return  # Already in view
 
@@ -14,7 +14,7 @@ from sound import SamplePlayer
 from srctools import Vec, FileSystemChain
 from typing import (
     NamedTuple, Optional, Union, Tuple, List, Dict, Any,
-    Callable, Iterable,
+    Callable, Iterable, Set,
 )
 
 from tkMarkdown import MarkdownData
@@ -29,6 +29,7 @@ __all__ = [
 
 ICON_SIZE = ...  # type: int
 ICON_SIZE_LRG = ...  # type: Tuple[int, int]
+OVERSCAN_ROWS = ...  # type: int
 
 class NAV_KEYS(Enum):
     """Enum representing keys used for shifting through items.
@@ -139,7 +140,8 @@ class Item:
     snd_sample: Optional[str]
     authors: List[str]
     attrs: Dict[str, _Attr_Values]
-    button: ttk.Button
+    # Only set while the item is in view.
+    button: Optional[ttk.Button]
     _win_x: int
     _win_y: int
 
@@ -164,7 +166,6 @@ class Item:
 
     @classmethod
     def from_data(cls: Any, obj_id: Any, data: SelitemData, attrs: Any=...) -> Any: ...
-    def set_pos(self, x: Optional[Any] = ..., y: Optional[Any] = ...): ...
     def copy(self) -> 'Item': ...
 
     @property
@@ -220,6 +221,15 @@ class selWin:
     context_menus: Dict[str, Menu] = ...
     attr: Optional[Dict[str, ttk.Label]] = ...
 
+    _row_y: List[int] = ...
+    _row_items: List[List[Item]] = ...
+    _item_pos: Dict[Item, Tuple[int, int]] = ...
+    _total_height: int = ...
+    _shown_items: Set[Item] = ...
+    _button_pool: List[ttk.Button] = ...
+    _header_height: Optional[int] = ...
+    _view_height: int = ...
+
     def __init__(
         self,
         tk: Toplevel,
@@ -270,6 +280,11 @@ class selWin:
     ) -> None: ...
 
     def flow_items(self, e: Event = None): ...
+    def _canvas_scrolled(self, first: str, last: str) -> None: ...
+    def refresh_visible(self) -> None: ...
+    def _show_item(self, item: Item) -> ttk.Button: ...
+    def _hide_item(self, item: Item) -> None: ...
+    def _click_button(self, button: ttk.Button, event: Event = ...) -> None: ...
     def scroll_to(self, item: Item) -> None: ...
     def __contains__(self, obj: Union[str, Item]): ...
     def is_suggested(self) -> bool: ...
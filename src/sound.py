@@ -4,16 +4,21 @@ To use, call sound.fx() with one of the dict keys.
 If PyGame fails to load, all fx() calls will fail silently.
 (Sounds are not critical to the app, so they just won't play.)
 """
+from collections import OrderedDict
+import hashlib
 import shutil
+import threading
 import os
 import utils
 
 from tk_tools import TK_ROOT
-from srctools.filesys import RawFileSystem, FileSystemChain
+from srctools.filesys import RawFileSystem, FileSystemChain, FileSystem, File
 import srctools.logger
 
+from typing import Dict, Optional
+
 __all__ = [
-    'SOUNDS', 'SamplePlayer',
+    'SOUNDS', 'SamplePlayer', 'extract_sample',
 
     'avbin_version', 'pyglet_version', 'initiallised',
     'load_snd', 'play_sound', 'fx',
@@ -25,6 +30,14 @@ LOGGER = srctools.logger.get_logger(__name__)
 play_sound = True
 
 SAMPLE_WRITE_PATH = utils.conf_location('config/music_sample/temp')
+# Samples extracted from packages are kept here, so they can be reused.
+SAMPLE_CACHE_PATH = utils.conf_location('config/music_sample/cache/')
+# The maximum total size of the cached samples, in bytes.
+SAMPLE_CACHE_SIZE = 64 * 1024 * 1024
+
+# Filenames in the sample cache mapped to their size,
+# least recently used first. This is scanned when first needed.
+_sample_cache = None  # type: Optional[OrderedDict]
 
 # This starts holding the filenames, but then caches the actual sound object.
 SOUNDS = {
@@ -48,6 +61,89 @@ SOUNDS = {
     'swap': 'extrude',
 }
 
+def _sample_cache_index() -> OrderedDict:
+    """Return the contents of the sample cache, scanning it if required."""
+    global _sample_cache
+    if _sample_cache is None:
+        files = []
+        for file in SAMPLE_CACHE_PATH.iterdir():
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, file.name, stat.st_size))
+        # Modification times are updated when used, so this is the LRU order.
+        files.sort()
+        _sample_cache = OrderedDict(
+            (name, size)
+            for mtime, name, size in files
+        )
+    return _sample_cache
+
+
+def _extract_file(fsys: FileSystem, file: File, dest: str) -> None:
+    """Copy a file out of a filesystem."""
+    with fsys, file.open_bin() as fsrc:
+        with open(dest, 'wb') as fdest:
+            shutil.copyfileobj(fsrc, fdest)
+
+
+def extract_sample(fsys: FileSystem, file: File, filename: str) -> str:
+    """Extract a music sample to disk, so it can be played.
+
+    The extracted copy is kept in a cache, keyed by the package and the file's
+    cache key. That way playing the sample again doesn't need to extract it.
+    """
+    ext = os.path.splitext(filename)[1]
+    key = file.cache_key()
+    if key == -1:
+        # We can't tell if it's changed, so always extract.
+        # SAMPLE_WRITE_PATH + the appropriate extension.
+        disk_filename = str(SAMPLE_WRITE_PATH.with_suffix(ext))
+        LOGGER.info('Extracting music sample to "{}"...', disk_filename)
+        _extract_file(fsys, file, disk_filename)
+        return disk_filename
+
+    cache_name = hashlib.blake2b(
+        '{}\0{}\0{}'.format(fsys.path, filename, key).encode('utf8'),
+        digest_size=16,
+    ).hexdigest() + ext
+    disk_path = SAMPLE_CACHE_PATH / cache_name
+    cache = _sample_cache_index()
+
+    if cache_name in cache and disk_path.exists():
+        LOGGER.info('Reusing extracted music sample "{}"', disk_path)
+        cache.move_to_end(cache_name)
+        try:
+            # Record the use, for the next time we scan.
+            os.utime(str(disk_path))
+        except OSError:
+            pass
+        return str(disk_path)
+
+    LOGGER.info('Extracting music sample to "{}"...', disk_path)
+    # Extract to a temporary name, so we don't cache a partial file.
+    temp_path = disk_path.with_suffix('.tmp')
+    _extract_file(fsys, file, str(temp_path))
+    os.replace(str(temp_path), str(disk_path))
+
+    cache[cache_name] = disk_path.stat().st_size
+    cache.move_to_end(cache_name)
+
+    # Remove the least recently used samples, until we're under the limit.
+    # Always keep the new one, even if it's huge.
+    total = sum(cache.values())
+    while total > SAMPLE_CACHE_SIZE and len(cache) > 1:
+        old_name, size = cache.popitem(last=False)
+        total -= size
+        LOGGER.info('Removing cached music sample "{}"', old_name)
+        try:
+            (SAMPLE_CACHE_PATH / old_name).unlink()
+        except (PermissionError, FileNotFoundError):
+            pass
+    return str(disk_path)
+
+
 try:
     import pyglet.media
     from pyglet.media import avbin  # We need this extension, so error early.
@@ -89,23 +185,59 @@ else:
     from pyglet.media import Source, MediaFormatException, CannotSeekException
     initiallised = True
     _play_repeat_sfx = True
+    # Held while decoding sounds, so they're only loaded once.
+    _load_lock = threading.Lock()
+    # Some files are used for multiple sounds, this lets us reuse those.
+    _loaded_files = {}  # type: Dict[str, Source]
+
+    def _load_fx(name: str) -> Source:
+        """Load a sound effect, if that hasn't been done yet."""
+        with _load_lock:
+            sound = SOUNDS[name]
+            if type(sound) is not str:
+                return sound
+            try:
+                source = _loaded_files[sound]
+            except KeyError:
+                LOGGER.info('Loading sound "{}" -> sounds/{}.ogg', name, sound)
+                source = _loaded_files[sound] = pyglet.media.load(
+                    str(utils.install_path('sounds/{}.ogg'.format(sound))),
+                    streaming=False,
+                )
+            SOUNDS[name] = source
+            return source
+
+    def _preload_fx() -> None:
+        """Decode all the sound effects, so they're ready when played."""
+        for name in list(SOUNDS):
+            try:
+                _load_fx(name)
+            except Exception:
+                # fx() will try again, and log the error there.
+                LOGGER.warning('Could not load sound "{}"!', name, exc_info=True)
+
+    def load_snd() -> None:
+        """Load in sound FX.
+
+        This happens on a background thread, so it doesn't slow startup.
+        """
+        threading.Thread(
+            target=_preload_fx,
+            name='SoundLoader',
+            daemon=True,
+        ).start()
 
     def fx(name, e=None):
         """Play a sound effect stored in the sounds{} dict."""
         if not play_sound:
             return
-        # Defer loading these until we actually need them, speeds up
-        # startup a little.
         try:
             sound = SOUNDS[name]
         except KeyError:
             raise ValueError(f'Not a valid sound? "{name}"')
         if type(sound) is str:
-            LOGGER.info('Loading sound "{}" -> sounds/{}.ogg', name, sound)
-            sound = SOUNDS[name] = pyglet.media.load(
-                str(utils.install_path('sounds/{}.ogg'.format(sound))),
-                streaming=False,
-            )
+            # Not preloaded yet, do it now.
+            sound = _load_fx(name)
         sound.play()
 
 
@@ -135,6 +267,9 @@ else:
     def clean_folder():
         """Delete files used by the sample player."""
         for file in SAMPLE_WRITE_PATH.parent.iterdir():
+            if file.is_dir():
+                # The sample cache, keep that.
+                continue
             LOGGER.info('Cleaning up "{}"...', file)
             try:
                 file.unlink()
@@ -191,12 +326,7 @@ else:
                 LOGGER.info('Directly playing sample "{}"...', disk_filename)
             else:
                 # In a filesystem, we need to extract it.
-                # SAMPLE_WRITE_PATH + the appropriate extension.
-                disk_filename = str(SAMPLE_WRITE_PATH.with_suffix(os.path.splitext(self.cur_file)[1]))
-                LOGGER.info('Extracting music sample to "{}"...', disk_filename)
-                with self.system.get_system(file), file.open_bin() as fsrc:
-                    with open(disk_filename, 'wb') as fdest:
-                        shutil.copyfileobj(fsrc, fdest)
+                disk_filename = extract_sample(fsystem, file, self.cur_file)
 
             try:
                 sound = pyglet.media.load(disk_filename, streaming=False)  # type: Source
@@ -7,6 +7,8 @@ from functools import partial
 from operator import itemgetter
 from collections import defaultdict
 from enum import Enum
+import bisect
+import re
 import string
 
 import sound as snd
@@ -16,16 +18,13 @@ import UI
 import utils
 import tk_tools
 
-from typing import Dict, List
+from typing import Dict, List, Tuple, Iterator
 
 is_expanded = False
 wid = {}
 
 TAG_MODE = tk.StringVar(value='ALL')  # The combining mode for the vars
-TAG_MODES = {
-    'ALL': all,
-    'ANY': any,
-}
+SEARCH_TEXT = tk.StringVar(value='')  # Text to search item names/authors for
 
 # A list of all tags, mapped to their current state.
 TAGS = {}  # type: Dict[str, bool]
@@ -43,9 +42,25 @@ TAG_REP_TRANSLATE = str.maketrans(
 # A list of tags, sorted into sections
 TAG_BY_SECTION = defaultdict(list)  # type: Dict[List[str]]
 
+# An inverted index of UI.pal_items, used for filtering.
+# The values are bitsets, with bit n set if UI.pal_items[n] matches.
+# This is rebuilt when items are reloaded (invalidate_index()).
+_index_valid = False
+TAG_INDEX = {}  # type: Dict[Tuple[Section, str], int]
+# Words in item names and authors, and the same sorted for prefix matching.
+WORD_INDEX = {}  # type: Dict[str, int]
+SORTED_WORDS = []  # type: List[str]
+ALL_ITEMS = 0  # Every item.
+UNLOCK_ITEMS = 0  # Items which need the style to be unlocked.
+# The items which are currently visible.
+VISIBLE_ITEMS = 0
+
+SEARCH_WORD = re.compile(r'\w+')
+
 BOLD_FONT = font.nametofont('TkDefaultFont').copy()
 BOLD_FONT.configure(weight='bold')
 
+
 class Section(Enum):
     """Sections to group tags in."""
     TAG = _('Tags')
@@ -60,12 +75,72 @@ class Section(Enum):
 Section.index = [Section[key] for key in Section.__members__.keys()].index
 
 
+def invalidate_index():
+    """Mark the filter index as out of date.
+
+    This must be called if item tags, names or authors change.
+    """
+    global _index_valid
+    _index_valid = False
+
+
+def build_index():
+    """Build the inverted index of tags and search words for all items."""
+    global _index_valid, SORTED_WORDS, ALL_ITEMS, UNLOCK_ITEMS, VISIBLE_ITEMS
+    TAG_INDEX.clear()
+    WORD_INDEX.clear()
+    ALL_ITEMS = UNLOCK_ITEMS = VISIBLE_ITEMS = 0
+
+    for ind, item in enumerate(UI.pal_items):
+        bit = 1 << ind
+        ALL_ITEMS |= bit
+        if item.needs_unlock:
+            UNLOCK_ITEMS |= bit
+        if item.visible:
+            VISIBLE_ITEMS |= bit
+        for tag in item.item.filter_tags:
+            TAG_INDEX[tag] = TAG_INDEX.get(tag, 0) | bit
+        for text in [item.name, *item.item.data.authors]:
+            for word in SEARCH_WORD.findall(text.casefold()):
+                WORD_INDEX[word] = WORD_INDEX.get(word, 0) | bit
+
+    SORTED_WORDS = sorted(WORD_INDEX)
+    _index_valid = True
+
+
+def search_items(text: str) -> int:
+    """Find items matching all words in the text.
+
+    Each word can be the start of a word in the name or authors.
+    This returns a bitset of item indexes.
+    """
+    result = ALL_ITEMS
+    for word in SEARCH_WORD.findall(text.casefold()):
+        matches = 0
+        # All words with this prefix are grouped together when sorted.
+        ind = bisect.bisect_left(SORTED_WORDS, word)
+        while ind < len(SORTED_WORDS) and SORTED_WORDS[ind].startswith(word):
+            matches |= WORD_INDEX[SORTED_WORDS[ind]]
+            ind += 1
+        result &= matches
+    return result
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Yield the indexes of the set bits in an integer."""
+    while bits:
+        low_bit = bits & -bits
+        yield low_bit.bit_length() - 1
+        bits ^= low_bit
+
+
 def filter_items():
     """Update items based on selected tags."""
-    style_unlocked = StyleVarPane.tk_vars['UnlockDefault'].get() == 1
+    global VISIBLE_ITEMS
+    if not _index_valid:
+        build_index()
 
-    # any() or all()
-    func = TAG_MODES[TAG_MODE.get()]
+    style_unlocked = StyleVarPane.tk_vars['UnlockDefault'].get() == 1
 
     sel_tags = [
         tag
@@ -73,22 +148,29 @@ def filter_items():
         in TAGS.items()
         if enabled
     ]
-    no_tags = len(sel_tags) == 0
-
-    for item in UI.pal_items:
-        if item.needs_unlock and not style_unlocked:
-            item.visible = False
-            continue
-
-        if no_tags:
-            item.visible = True
-        else:
-            item_tags = item.item.filter_tags
-            item.visible = func(
-                tag in item_tags
-                for tag in
-                sel_tags
-            )
+
+    if TAG_MODE.get() == 'ANY' and sel_tags:
+        visible = 0
+        for tag in sel_tags:
+            visible |= TAG_INDEX.get(tag, 0)
+    else:
+        visible = ALL_ITEMS
+        for tag in sel_tags:
+            visible &= TAG_INDEX.get(tag, 0)
+
+    if not style_unlocked:
+        visible &= ~UNLOCK_ITEMS
+
+    visible &= search_items(SEARCH_TEXT.get())
+
+    # Only update the items which changed.
+    changed = visible ^ VISIBLE_ITEMS
+    if not changed:
+        return
+    VISIBLE_ITEMS = visible
+    for ind in iter_bits(changed):
+        item = UI.pal_items[ind]
+        item.visible = not item.visible
     UI.flow_picker()
 
 # When exiting settings, we need to hide/show WIP items.
@@ -100,7 +182,7 @@ def expand(_):
     global is_expanded
     is_expanded = True
     wid['expand_frame'].grid(
-        row=2,
+        row=3,
         column=0,
         columnspan=2,
         sticky='NSEW',
@@ -149,6 +231,7 @@ def add_tag(section: Section, tag: str, pretty: str=None):
     TAGS[key] = False
     TAG_BY_SECTION[section].append(tag)
     PRETTY_TAG[key] = pretty
+    return key
 
 
 def init(frm):
@@ -184,13 +267,25 @@ def init(frm):
     )
     cur_tags.grid(row=0, rowspan=2, column=1, sticky='EW')
 
+    ttk.Label(
+        frm,
+        text=_('Search:'),
+    ).grid(row=2, column=0, sticky='W')
+
+    wid['search'] = search = ttk.Entry(
+        frm,
+        textvariable=SEARCH_TEXT,
+    )
+    search.grid(row=2, column=1, sticky='EW')
+    SEARCH_TEXT.trace_add('write', lambda *args: filter_items())
+
     wid['expand_frame'] = exp = ttk.Frame(
         frm,
     )
 
     # Resize to fit the expansion frame
     frm.columnconfigure(1, weight=1)
-    frm.rowconfigure(2, weight=1)
+    frm.rowconfigure(3, weight=1)
 
     ttk.Label(
         exp,
@@ -13,11 +13,12 @@ from srctools import Entity, Solid, Side, Property, UVAxis, Vec, VMF
 import comp_consts as consts
 import srctools.logger
 import conditions
+import budget
 
 from typing import (
     Iterable, Union, Callable,
     NamedTuple, Tuple,
-    Dict, List, Set,
+    Dict, List, Set, Optional,
 )
 
 LOGGER = srctools.logger.get_logger(__name__, alias='template')
@@ -28,6 +29,10 @@ TEMPLATES = {}  # type: Dict[str, Union[Template, ScalingTemplate]]
 # The location of the template data.
 TEMPLATE_LOCATION = 'bee2/templates.vmf'
 
+# Detail entities and overlays from decorative templates, which can be
+# removed if the map is too large.
+DECORATIVE_EXPORTS = []  # type: List[Tuple[Optional[Entity], List[Entity]]]
+
 
 class InvalidTemplateName(LookupError):
     """Raised if a template ID is invalid."""
@@ -166,11 +171,15 @@ class Template:
         overlay_transfer_faces: Iterable[str]=(),
         vertical_faces: Iterable[str]=(),
         color_pickers: Iterable[ColorPicker]=(),
+        decorative: bool=False,
     ):
         """Make an overlay.
 
         """
         self.id = temp_id
+        # If set, the detail brushes and overlays are purely visual, so
+        # they can be skipped if the map runs out of brushes or overlays.
+        self.decorative = decorative
         self._data = data = {}
 
         # We ensure the '' group is always present.
@@ -399,11 +408,13 @@ def load_templates():
             skip_faces = []
             vertical_faces = []
             realign_faces = []
+            decorative = False
         else:
             vertical_faces = conf['vertical_faces'].split()
             realign_faces = conf['realign_faces'].split()
             overlay_faces = conf['overlay_faces'].split()
             skip_faces = conf['skip_faces'].split()
+            decorative = srctools.conv_bool(conf['decorative'])
 
         TEMPLATES[temp_id.casefold()] = Template(
             temp_id,
@@ -415,6 +426,7 @@ def load_templates():
             overlay_faces,
             vertical_faces,
             color_pickers[temp_id],
+            decorative,
         )
 
 
@@ -550,6 +562,9 @@ def import_template(
     for solid in new_detail:
         vbsp.IGNORED_FACES.update(solid.sides)
 
+    if template.decorative and add_to_map and (detail_ent or new_over):
+        DECORATIVE_EXPORTS.append((detail_ent, new_over))
+
     return ExportedTemplate(
         new_world,
         detail_ent,
@@ -891,3 +906,49 @@ def retexture_template(
             over.remove()
         else:
             over['material'] = mat
+
+
+@budget.strategy('overlay', priority=20)
+def skip_decorative_overlays(vmf: VMF, excess: int) -> str:
+    """Remove overlays added by decorative templates."""
+    removed = 0
+    for detail_ent, overlays in reversed(DECORATIVE_EXPORTS):
+        if removed >= excess:
+            break
+        # The overlay list is shared with the ExportedTemplate, so leave it
+        # alone and skip overlays which were already removed.
+        for over in overlays:
+            if over in vmf.by_class['info_overlay']:
+                over.remove()
+                removed += 1
+    if removed:
+        return 'removed {} decorative template overlays'.format(removed)
+    return ''
+
+
+@budget.strategy('brush', priority=20)
+def skip_decorative_brushes(vmf: VMF, excess: int) -> str:
+    """Remove detail brushes added by decorative templates."""
+    removed = 0
+    for detail_ent, overlays in reversed(DECORATIVE_EXPORTS):
+        if removed >= excess:
+            break
+        # Conditions may have already removed the entity, moved its brushes
+        # elsewhere or turned it into a brush entity - leave those alone.
+        # by_class tracks classname changes, so that covers most of those.
+        if (
+            detail_ent is None or
+            detail_ent not in vmf.by_class['func_detail'] or
+            detail_ent in vbsp.IGNORED_BRUSH_ENTS or
+            detail_ent.outputs
+        ):
+            continue
+        removed += len(detail_ent.solids)
+        detail_ent.remove()
+        # Overlays can't be on the removed faces.
+        for over in overlays:
+            if over in vmf.by_class['info_overlay']:
+                over.remove()
+    if removed:
+        return 'removed {} decorative template brushes'.format(removed)
+    return ''
@@ -1,5 +1,6 @@
 from enum import Enum
 from itertools import count
+import functools
 
 from markdown.util import etree
 from markdown.extensions import smart_strong, sane_lists
@@ -7,7 +8,7 @@ from markdown.preprocessors import Preprocessor
 import markdown
 import srctools.logger
 
-from typing import Iterable, Iterator, Union, List, Tuple
+from typing import Iterable, Iterator, Union, List, Tuple, Optional
 
 
 LOGGER = srctools.logger.get_logger(__name__)
@@ -36,6 +37,11 @@ OL_START = '{}. '
 
 LINK_TAG_START = 'link_callback_'
 
+# The number of converted texts to keep. Descriptions don't change until
+# packages are reloaded, so this just needs to be larger than the number
+# usually shown in a session.
+CACHE_SIZE = 1024
+
 
 class TAG(Enum):
     START = 0
@@ -57,18 +63,55 @@ class MarkdownData:
 
     Blocks are a list of two-tuples - each is a Block type, and data for it.
     Links is a dict mapping urls to callback IDs.
+    If produced by convert(), the Markdown is only parsed when these are
+    first accessed.
     """
     def __init__(self, blocks=(), links=None):
-        self.blocks = list(blocks)
-        self.links = links if links is not None else {}
+        self._blocks = list(blocks)
+        self._links = links if links is not None else {}
+        # If set, the Markdown text which hasn't been parsed yet.
+        self._source = None  # type: Optional[str]
+
+    @classmethod
+    def lazy(cls, text: str) -> 'MarkdownData':
+        """Create data which parses this Markdown text when first used."""
+        data = cls()
+        data._source = text
+        return data
+
+    def _parse(self) -> None:
+        """Parse the source text, if that hasn't been done yet."""
+        if self._source is not None:
+            parsed = _convert_cached(self._source)
+            # These are shared with the cache, but are never modified.
+            self._blocks = parsed.blocks
+            self._links = parsed.links
+            self._source = None
+
+    @property
+    def blocks(self) -> list:
+        """The blocks of text and images."""
+        self._parse()
+        return self._blocks
+
+    @property
+    def links(self) -> dict:
+        """The urls used, mapped to their callback IDs."""
+        self._parse()
+        return self._links
 
     def __bool__(self):
         """Empty data is false."""
+        if self._source is not None and not self._source.strip():
+            # Blank text, we don't need to parse to know.
+            return False
         return bool(self.blocks)
 
     def copy(self) -> 'MarkdownData':
         """Create and return a duplicate of this object."""
-        return MarkdownData(self.blocks, self.links.copy())
+        if self._source is not None:
+            return MarkdownData.lazy(self._source)
+        return MarkdownData(self._blocks, self._links.copy())
 
     __copy__ = copy
 
@@ -270,7 +313,20 @@ _MD = markdown.Markdown(extensions=[
 
 
 def convert(text: str) -> MarkdownData:
-    """Convert markdown syntax into data ready to be passed to richTextBox."""
+    """Convert markdown syntax into data ready to be passed to richTextBox.
+
+    The text is only parsed when the data is first used, and identical text
+    reuses the previous result.
+    """
+    return MarkdownData.lazy(text)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _convert_cached(text: str) -> MarkdownData:
+    """Run the actual Markdown conversion.
+
+    The result is shared, so it must not be modified.
+    """
     _MD.reset()
     _MD.convert(text)
     return _converter.result
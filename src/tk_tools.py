@@ -136,12 +136,15 @@ def on_error(exc_type, exc_value, exc_tb):
         pass
 
     try:
-        from BEE2_config import GEN_OPTS
+        from BEE2_config import GEN_OPTS, flush_all
+        # Write out any delayed changes before we quit.
+        flush_all()
         # Try to turn on the logging window for next time..
         GEN_OPTS.load()
         GEN_OPTS['Debug']['show_log_win'] = '1'
         GEN_OPTS['Debug']['window_log_level'] = 'DEBUG'
         GEN_OPTS.save()
+        flush_all()
     except Exception:
         # Ignore failures...
         pass
@@ -9,9 +9,10 @@ import sys
 import shutil
 import random
 import itertools
+import math
+import time
 import logging
 from enum import Enum
-from io import StringIO
 from collections import defaultdict, namedtuple, Counter
 
 from srctools import Property, Vec, AtomicWriter, Entity
@@ -21,6 +22,8 @@ import srctools.vmf as VLib
 import srctools.run
 import srctools.logger
 import antlines
+import budget
+import rand
 import voiceLine
 import vbsp_options
 import instanceLocs
@@ -38,7 +41,7 @@ import barriers
 
 from typing import (
     Dict, Tuple, List,
-    Set,
+    Set, Optional,
 )
 
 COND_MOD_NAME = 'VBSP'
@@ -195,9 +198,15 @@ PRESET_CLUMPS = []  # Additional clumps set by conditions, for certain areas.
 ##################
 
 
-def get_tex(name: str) -> str:
+def get_tex(name: str, rng: random.Random=None) -> str:
+    """Pick a random texture for the given name.
+
+    If rng is provided it is used instead of the global generator.
+    """
     if name in settings['textures']:
-        return random.choice(settings['textures'][name])
+        if rng is None:
+            return random.choice(settings['textures'][name])
+        return rng.choice(settings['textures'][name])
     else:
         raise Exception('No texture "' + name + '"!')
 
@@ -206,6 +215,8 @@ def alter_mat(
     face: VLib.Side,
     seed: str=None,
     texture_lock: bool=True,
+    orient: 'ORIENT'=None,
+    rng: random.Random=None,
 ) -> bool:
     """Randomise the texture used for a face, based on configured textures.
 
@@ -215,17 +226,22 @@ def alter_mat(
 
     If texture_lock is false, the offset of the texture will be reset to 0,0.
     That ensures embedface will have aligned textures.
+    If the orientation is already known, it can be passed to skip
+    recalculating it.
+    If seed is given a new generator is seeded from it, otherwise rng is
+    used (or the global generator if that is also None).
     """
     mat = face.mat.casefold()
     if seed:
-        random.seed(seed)
+        rng = rand.seed(seed)
 
     if mat in TEX_VALVE:  # should we convert it?
-        face.mat = get_tex(TEX_VALVE[mat])
+        face.mat = get_tex(TEX_VALVE[mat], rng)
         return True
     elif mat in consts.BlackPan or mat in consts.WhitePan:
-        orient = get_face_orient(face)
-        face.mat = get_tex(get_tile_type(mat, orient))
+        if orient is None:
+            orient = get_face_orient(face)
+        face.mat = get_tex(get_tile_type(mat, orient), rng)
 
         if not texture_lock:
             face.offset = 0
@@ -1892,8 +1908,94 @@ def fix_squarebeams(
     targ.scale = scale
 
 
-def change_brush() -> None:
-    """Alter all world/detail brush textures to use the configured ones."""
+class FaceInfo:
+    """Cached information about a world or detail brush face.
+
+    The texturing passes all need the same values for each face, so these
+    are calculated once in build_face_table() and shared.
+    """
+    __slots__ = ['face', 'solid', 'origin', 'orient', 'mat', 'ignored']
+
+    def __init__(self, face: VLib.Side, solid: VLib.Solid) -> None:
+        self.face = face
+        self.solid = solid
+        self.origin = face.get_origin()
+        self.orient = normal_orient(face.normal())
+        # The casefolded material. Passes need to update this if they change
+        # the material for following passes.
+        self.mat = face.mat.casefold()
+        self.ignored = face in IGNORED_FACES
+
+
+def build_face_table(old_faces: List[FaceInfo]=()) -> List[FaceInfo]:
+    """Collect all world and detail faces in the map, in iteration order.
+
+    If a previous table is passed, info for faces still present is reused,
+    so only new brushes need to be calculated.
+    """
+    old_info = {id(info.face): info for info in old_faces}
+    faces = []
+    for solid in VMF.iter_wbrushes(world=True, detail=True):
+        for face in solid:
+            try:
+                info = old_info[id(face)]
+            except KeyError:
+                info = FaceInfo(face, solid)
+            else:
+                # Faces may have been added to or removed from this since.
+                info.ignored = face in IGNORED_FACES
+            faces.append(info)
+    return faces
+
+
+def timed_stage(name: str, func, *args):
+    """Run a texturing pass, logging how long it took."""
+    start = time.perf_counter()
+    result = func(*args)
+    LOGGER.info('{}: {:.3f}s', name, time.perf_counter() - start)
+    return result
+
+
+def texture_faces() -> None:
+    """Run all the passes which retexture brushes and overlays.
+
+    World and detail faces are only scanned once, then each pass reuses
+    the same table.
+    """
+    start = time.perf_counter()
+    timed_stage('Pedestal platforms', remove_pedestal_plats)
+    faces = timed_stage('Face table', build_face_table)
+    LOGGER.info('{} world/detail faces', len(faces))
+
+    timed_stage('Goo', change_brush, faces)
+    # Bottomless pits and goo mist add brushes which need texturing too.
+    faces = timed_stage('Face table update', build_face_table, faces)
+    if can_clump():
+        timed_stage('Clumped walls', clump_walls, faces)
+    else:
+        timed_stage('Random walls', random_walls, faces)
+    timed_stage('Overlays', change_overlays)
+    timed_stage('Goo triggers', collapse_goo_trig)
+    timed_stage('Brush entities', change_func_brush)
+    LOGGER.info('Texturing: {:.3f}s total', time.perf_counter() - start)
+
+
+def remove_pedestal_plats() -> None:
+    """Remove the pedestal platforms, if the style doesn't want them."""
+    if not vbsp_options.get(bool, 'remove_pedestal_plat'):
+        return
+    for ent in VMF.by_class['func_detail']:
+        if ent in IGNORED_BRUSH_ENTS:
+            continue
+
+        for side in ent.sides():
+            if side.mat.casefold() == 'plastic/plasticwall004a':
+                VMF.remove_ent(ent)
+                break  # Skip to next entity
+
+
+def change_brush(faces: List[FaceInfo]) -> None:
+    """Alter goo brush textures, and add bottomless pits and goo mist."""
     LOGGER.info("Editing Brushes...")
 
     goo_scale = vbsp_options.get(float, 'goo_scale')
@@ -1904,17 +2006,6 @@ def change_brush() -> None:
     )
     mist_solids = set()
 
-    if vbsp_options.get(bool, 'remove_pedestal_plat'):
-        # Remove the pedestal platforms
-        for ent in VMF.by_class['func_detail']:
-            if ent in IGNORED_BRUSH_ENTS:
-                continue
-
-            for side in ent.sides():
-                if side.mat.casefold() == 'plastic/plasticwall004a':
-                    VMF.remove_ent(ent)
-                    break  # Skip to next entity
-
     make_bottomless = bottomlessPit.pits_allowed()
     LOGGER.info('Make Bottomless Pit: {}', make_bottomless)
 
@@ -1938,29 +2029,30 @@ def change_brush() -> None:
 
     LOGGER.info('Goo heights: {} <- {}', best_goo, goo_heights)
 
-    for solid in VMF.iter_wbrushes(world=True, detail=True):
-        for face in solid:
-            highest_brush = max(
-                highest_brush,
-                face.planes[0].z,
-                face.planes[1].z,
-                face.planes[2].z,
-            )
-            if face.mat in consts.Goo:
-                if make_goo_mist:
-                    mist_solids.add(
-                        solid.get_origin().as_tuple()
-                    )
-                # Apply goo scaling
-                face.scale = goo_scale
-                # Use fancy goo on the level with the
-                # highest number of blocks.
-                # All plane z are the same.
-                face.mat = get_tex(
-                    'special.goo' if
-                    face.planes[0].z == best_goo
-                    else 'special.goo_cheap'
+    for info in faces:
+        face = info.face
+        highest_brush = max(
+            highest_brush,
+            face.planes[0].z,
+            face.planes[1].z,
+            face.planes[2].z,
+        )
+        if face.mat in consts.Goo:
+            if make_goo_mist:
+                mist_solids.add(
+                    info.solid.get_origin().as_tuple()
                 )
+            # Apply goo scaling
+            face.scale = goo_scale
+            # Use fancy goo on the level with the
+            # highest number of blocks.
+            # All plane z are the same.
+            face.mat = get_tex(
+                'special.goo' if
+                face.planes[0].z == best_goo
+                else 'special.goo_cheap'
+            )
+            info.mat = face.mat.casefold()
 
     if make_bottomless:
         LOGGER.info('Creating Bottomless Pits...')
@@ -1972,23 +2064,22 @@ def change_brush() -> None:
         add_goo_mist(mist_solids)
         LOGGER.info('Done!')
 
-    if can_clump():
-        clump_walls()
-    else:
-        random_walls()
-
 
 def can_clump() -> bool:
     """Check the clump algorithm is enabled."""
     return vbsp_options.get(bool, "clump_wall_tex")
 
 
-def face_seed(face: VLib.Side) -> str:
+def face_seed(face: VLib.Side, origin: Vec=None) -> str:
     """Create a seed unique to this brush face.
 
     This is the same regardless of side direction.
+    If the origin of the face is already known, it can be passed in.
     """
-    origin = face.get_origin()
+    if origin is None:
+        origin = face.get_origin()
+    else:
+        origin = origin.copy()
     for axis in "xyz":
         if origin[axis] % 128 < 2:
             origin[axis] = (origin[axis] // 64) * 64
@@ -1997,33 +2088,38 @@ def face_seed(face: VLib.Side) -> str:
     return origin.join(' ')
 
 
-def random_walls() -> None:
+def random_walls(faces: List[FaceInfo]) -> None:
     """The original wall style, with completely randomised walls."""
     rotate_edge = vbsp_options.get(bool, 'rotate_edge')
     texture_lock = vbsp_options.get(bool, 'tile_texture_lock')
     edge_off = vbsp_options.get(bool, 'reset_edge_off')
     edge_scale = vbsp_options.get(float, 'edge_scale')
 
-    for solid in VMF.iter_wbrushes(world=True, detail=True):
-        for face in solid:
-            if face in IGNORED_FACES:
-                continue
+    for info in faces:
+        if info.ignored:
+            continue
+        face = info.face
 
-            if face.mat == consts.Special.SQUAREBEAMS:
-                fix_squarebeams(face, rotate_edge, edge_off, edge_scale)
+        if face.mat == consts.Special.SQUAREBEAMS:
+            fix_squarebeams(face, rotate_edge, edge_off, edge_scale)
 
-            # Conditions can define special clumps for items, we want to
-            # do those if needed.
-            origin = face.get_origin()
-            for clump in PRESET_CLUMPS:
-                if clump.min_pos <= origin <= clump.max_pos:
-                    face.mat = clump.tex[get_tile_type(
-                        face.mat.casefold(),
-                        get_face_orient(face),
-                    )]
-                    break
-            else:  # No clump..
-                alter_mat(face, face_seed(face), texture_lock)
+        # Conditions can define special clumps for items, we want to
+        # do those if needed.
+        origin = info.origin
+        for clump in PRESET_CLUMPS:
+            if clump.min_pos <= origin <= clump.max_pos:
+                face.mat = clump.tex[get_tile_type(
+                    info.mat,
+                    info.orient,
+                )]
+                break
+        else:  # No clump..
+            alter_mat(
+                face,
+                face_seed(face, origin),
+                texture_lock,
+                info.orient,
+            )
 
 
 Clump = namedtuple('Clump', [
@@ -2090,7 +2186,31 @@ def cond_force_clump(inst: Entity, res: Property):
     ))
 
 
-def clump_walls():
+def clump_cell(pos: Vec) -> Tuple[int, int, int]:
+    """Find the cell in the clump grid containing this position.
+
+    The grid is made of 64-unit cells, with doubled indexes - positions
+    on a cell boundary get an even index, and positions inside a cell an
+    odd one. That way a clump's bounds include exactly the same positions
+    as the Vec comparisons do.
+    """
+    return (
+        _clump_axis(pos.x),
+        _clump_axis(pos.y),
+        _clump_axis(pos.z),
+    )
+
+
+def _clump_axis(val: float) -> int:
+    """Compute the clump grid index for one axis."""
+    cell = round(val / 64)
+    # Vec comparisons allow a small tolerance.
+    if abs(val - cell * 64) <= 1e-6:
+        return 2 * cell
+    return 2 * math.floor(val / 64) + 1
+
+
+def clump_walls(faces: List[FaceInfo]) -> None:
     """A wall style where textures are used in small groups near each other.
 
     This replicates the Old Aperture maps, which are cobbled together
@@ -2112,11 +2232,10 @@ def clump_walls():
     # ignored faces or nodraw
     panel_mats = set(consts.WhitePan).union(consts.BlackPan)
     possible_locs = [
-        face.get_origin()
-        for face in
-        VMF.iter_wfaces(world=True, detail=True)
-        if face not in IGNORED_FACES
-        if face.mat.casefold() in panel_mats
+        info.origin
+        for info in faces
+        if not info.ignored
+        if info.mat in panel_mats
     ]
 
     clump_size = vbsp_options.get(int, "clump_size")
@@ -2170,27 +2289,50 @@ def clump_walls():
         ))
         random.setstate(cur_state)
 
+    # Rasterise the clumps into a grid, storing the first clump covering
+    # each cell. Only cells which actually have panels are filled in.
+    panel_cols = defaultdict(set)  # type: Dict[Tuple[int, int], Set[int]]
+    for loc in possible_locs:
+        x, y, z = clump_cell(loc)
+        panel_cols[x, y].add(z)
+
+    clump_grid = {}  # type: Dict[Tuple[int, int, int], int]
+    for clump_ind, clump in enumerate(clumps):
+        x_min, y_min, z_min = clump_cell(clump.min_pos)
+        x_max, y_max, z_max = clump_cell(clump.max_pos)
+        for x in range(x_min, x_max + 1):
+            for y in range(y_min, y_max + 1):
+                for z in panel_cols.get((x, y), ()):
+                    if z_min <= z <= z_max:
+                        clump_grid.setdefault((x, y, z), clump_ind)
+
+    # The generator seeded for the last face - unseeded faces continue
+    # using it.
+    rng = None  # type: Optional[random.Random]
+
     # Now modify each texture!
-    for face in VMF.iter_wfaces(world=True, detail=True):
-        if face in IGNORED_FACES:
+    for info in faces:
+        if info.ignored:
             continue
 
-        mat = face.mat.casefold()
+        face = info.face
+        mat = info.mat
+        orient = info.orient
+        origin = info.origin
 
         if mat == consts.Special.SQUAREBEAMS:
             # Handle squarebeam transformations
-            alter_mat(face, face_seed(face), texture_lock)
+            rng = rand.seed(face_seed(face, origin))
+            alter_mat(face, texture_lock=texture_lock, orient=orient, rng=rng)
             fix_squarebeams(face, rotate_edge, edge_off, edge_scale)
             continue
 
         if mat not in panel_mats:
             # Don't clump non-wall textures
-            alter_mat(face, face_seed(face), texture_lock)
+            rng = rand.seed(face_seed(face, origin))
+            alter_mat(face, texture_lock=texture_lock, orient=orient, rng=rng)
             continue
 
-        orient = get_face_orient(face)
-
-        origin = face.get_origin()
         # Conditions can define special clumps for items, do those first
         # so they override the normal surfaces.
         # We want to do that regardless of the clump_floor and clump_ceil
@@ -2208,35 +2350,39 @@ def clump_walls():
                 (orient is ORIENT.floor and not clump_floor) or
                 (orient is ORIENT.ceiling and not clump_ceil)):
             # Don't clump if configured not to for this orientation
-            alter_mat(face, face_seed(face), texture_lock)
+            rng = rand.seed(face_seed(face, origin))
+            alter_mat(face, texture_lock=texture_lock, orient=orient, rng=rng)
             continue
 
         # Clump the texture!
-        for clump in clumps:
-            if clump.min_pos <= origin <= clump.max_pos:
-                face.mat = clump.tex[get_tile_type(mat, orient)]
-                break
+        clump_ind = clump_grid.get(clump_cell(origin))
+        if clump_ind is not None:
+            face.mat = clumps[clump_ind].tex[get_tile_type(mat, orient)]
         else:
             # Not in a clump!
             # Allow using special textures for these, to fill in gaps.
             orig_mat = mat
             if mat in consts.WhitePan:
-                face.mat = get_tex("special.white_gap")
+                face.mat = get_tex("special.white_gap", rng)
                 if not face.mat:
                     face.mat = orig_mat
-                    alter_mat(face, texture_lock=texture_lock)
+                    alter_mat(face, texture_lock=texture_lock, orient=orient, rng=rng)
             elif mat in consts.BlackPan:
-                face.mat = get_tex("special.black_gap")
+                face.mat = get_tex("special.black_gap", rng)
                 if not face.mat:
                     face.mat = orig_mat
-                    alter_mat(face, texture_lock=texture_lock)
+                    alter_mat(face, texture_lock=texture_lock, orient=orient, rng=rng)
             else:
-                alter_mat(face, texture_lock=texture_lock)
+                alter_mat(face, texture_lock=texture_lock, orient=orient, rng=rng)
 
 
 def get_face_orient(face: VLib.Side) -> ORIENT:
     """Determine the orientation of an on-grid face."""
-    norm = face.normal()
+    return normal_orient(face.normal())
+
+
+def normal_orient(norm: Vec) -> ORIENT:
+    """Determine the orientation of a face from its normal."""
     # Even if not axis-aligned, make mostly-flat surfaces
     # floor/ceiling (+-40 degrees)
     # sin(40) = ~0.707
@@ -2888,14 +3034,79 @@ def instance_symlink():
     os.symlink(inst, link_loc, target_is_directory=True)
 
 
+class ChunkedWriter:
+    """Collects many small writes, passing them to a file in large chunks.
+
+    VMF.export() makes a write() call for every line, and each of those has
+    to go through the encoding layer of the file separately. Joining them up
+    first is much faster.
+    """
+    def __init__(self, file, chunk_size: int=256 * 1024) -> None:
+        self.file = file
+        self.chunk_size = chunk_size
+        self._chunks = []  # type: List[str]
+        self._size = 0
+
+    def write(self, text: str) -> int:
+        """Add text to the buffer, writing it out if it's large enough."""
+        self._chunks.append(text)
+        self._size += len(text)
+        if self._size >= self.chunk_size:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        """Write out all buffered text."""
+        if self._chunks:
+            self.file.write(''.join(self._chunks))
+            self._chunks.clear()
+            self._size = 0
+
+    def __enter__(self) -> 'ChunkedWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        # Don't write out partial data if the export failed.
+        if exc_type is None:
+            self.flush()
+
+
 def save(path: str) -> None:
     """Save the modified map back to the correct location.
     """
     LOGGER.info("Saving New Map...")
+    start = time.perf_counter()
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with AtomicWriter(path) as f:
-        VMF.export(dest_file=f, inc_version=True)
-    LOGGER.info("Complete!")
+    with AtomicWriter(path) as f, ChunkedWriter(f) as writer:
+        VMF.export(dest_file=writer, inc_version=True)
+    LOGGER.info("Complete! ({:.3f}s)", time.perf_counter() - start)
+
+
+def transfer_file(src: str, dest: str, move: bool=False) -> None:
+    """Copy a file, without copying the data if possible.
+
+    If move is true the source is renamed, otherwise a hardlink is made.
+    If that isn't possible (different drives, etc), a regular copy is done.
+    """
+    start = time.perf_counter()
+    try:
+        if move:
+            os.replace(src, dest)
+            method = 'Moved'
+        else:
+            try:
+                os.remove(dest)
+            except FileNotFoundError:
+                pass
+            os.link(src, dest)
+            method = 'Linked'
+    except OSError:
+        shutil.copy(src, dest)
+        method = 'Copied'
+    LOGGER.info(
+        '{} "{}" -> "{}" ({:.3f}s)',
+        method, src, dest, time.perf_counter() - start,
+    )
 
 
 def run_vbsp(vbsp_args, path, new_path=None) -> None:
@@ -2914,7 +3125,7 @@ def run_vbsp(vbsp_args, path, new_path=None) -> None:
     if is_peti:
         # Copy the original log file
         if os.path.isfile(path.replace(".vmf", ".log")):
-            shutil.copy(
+            transfer_file(
                 path.replace(".vmf", ".log"),
                 new_path.replace(".vmf", ".log"),
             )
@@ -2929,15 +3140,17 @@ def run_vbsp(vbsp_args, path, new_path=None) -> None:
     # Use a special name for VBSP's output..
     vbsp_logger = srctools.logger.get_logger('valve.VBSP', alias='<Valve>')
 
-    # And also save a copy for us to analyse.
-    buff = StringIO()
-    vbsp_logger.addHandler(logging.StreamHandler(buff))
+    # And also analyse it as it's produced.
+    log_parser = VBSPLogParser()
+    vbsp_logger.addHandler(log_parser)
 
+    start = time.perf_counter()
     code = srctools.run.run_compiler('vbsp', vbsp_args, vbsp_logger)
+    LOGGER.info('VBSP took {:.3f}s', time.perf_counter() - start)
     if code != 0:
         # VBSP didn't succeed.
         if is_peti:  # Ignore Hammer maps
-            process_vbsp_fail(buff.getvalue())
+            process_vbsp_fail(log_parser)
 
         # Propagate the fail code to Portal 2, and quit.
         sys.exit(code)
@@ -2946,48 +3159,77 @@ def run_vbsp(vbsp_args, path, new_path=None) -> None:
     LOGGER.info("VBSP Done!")
 
     if is_peti:  # Ignore Hammer maps
-        process_vbsp_log(buff.getvalue())
+        process_vbsp_log(log_parser)
 
-    # Copy over the real files so vvis/vrad can read them
+    # Move over the real files so vvis/vrad can read them
         for ext in (".bsp", ".log", ".prt"):
             if os.path.isfile(new_path.replace(".vmf", ext)):
-                shutil.copy(
+                transfer_file(
                     new_path.replace(".vmf", ext),
                     path.replace(".vmf", ext),
+                    move=True,
                 )
 
 
-def process_vbsp_log(output: str) -> None:
-    """Read through VBSP's log, extracting entity counts.
+class VBSPLogParser(logging.Handler):
+    """Reads through VBSP's output as it is produced.
 
-    This is then passed back to the main BEE2 application for display.
+    This extracts the entity counts, and remembers the last limit error so
+    the counts can be set if the compile fails.
     """
-
-    # The output is something like this:
-    # nummapplanes:     (?? / 65536)
-    # nummapbrushes:    (?? / 8192)
-    # nummapbrushsides: (?? / 65536)
-    # num_map_overlays: (?? / 512)
-    # nummodels:        (?? / 1024)
-    # num_entities:     (?? / 16384)
-
-    desired_vals = [
-        # VBSP values -> config names
+    # VBSP values -> config names
+    # The other options rarely hit the limits, so we don't track them.
+    DESIRED_VALS = [
         ('nummapbrushes:', 'brush'),
         ('num_map_overlays:', 'overlay'),
         ('num_entities:', 'entity'),
     ]
-    # The other options rarely hit the limits, so we don't track them.
 
-    counts = {
-        'brush': ('0', '8192'),
-        'overlay': ('0', '512'),
-        'entity': ('0', '2048'),
-    }
+    def __init__(self) -> None:
+        super().__init__()
+        self.counts = {
+            'brush': ('0', '8192'),
+            'overlay': ('0', '512'),
+            'entity': ('0', '2048'),
+        }
+        # The last 'MAX_MAP_*' limit error line, if any.
+        self.fail_line = None  # type: Optional[str]
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Handle a line of output."""
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        for line in msg.splitlines():
+            self.parse_line(line)
+
+    def parse_line(self, line: str) -> None:
+        """Check a single line of output."""
+        # The output is something like this:
+        # nummapplanes:     (?? / 65536)
+        # nummapbrushes:    (?? / 8192)
+        # nummapbrushsides: (?? / 65536)
+        # num_map_overlays: (?? / 512)
+        # nummodels:        (?? / 1024)
+        # num_entities:     (?? / 16384)
+        if 'MAX_MAP_' in line:
+            if (
+                'MAX_MAP_OVERLAYS' in line or
+                'MAX_MAP_BRUSHSIDES' in line or
+                'MAX_MAP_PLANES' in line or
+                'MAX_MAP_ENTITIES' in line
+            ):
+                self.fail_line = line
+                LOGGER.warning('VBSP exceeded a limit: {}', line.strip())
+            return
+        if 'LEAKED' in line:
+            LOGGER.warning('The map has a leak!')
+            return
 
-    for line in output.splitlines():
         line = line.lstrip(' \t[|')
-        for name, conf in desired_vals:
+        for name, conf in self.DESIRED_VALS:
             if not line.startswith(name):
                 continue
             # Grab the value from ( onwards
@@ -2995,23 +3237,29 @@ def process_vbsp_log(output: str) -> None:
             # Grab the two numbers, convert to ascii and strip
             # whitespace.
             count_num, count_max = fraction.split('/')
-            counts[conf] = (
+            self.counts[conf] = (
                 count_num.strip(' \t\n'),
                 # Strip the ending ) off the max. We have the value, so
                 # we might as well tell the BEE2 if it changes..
                 count_max.strip(') \t\n'),
             )
 
-    LOGGER.info('Retrieved counts: {}', counts)
+
+def process_vbsp_log(parser: VBSPLogParser) -> None:
+    """Write the entity counts VBSP produced to the config.
+
+    This is then passed back to the main BEE2 application for display.
+    """
+    LOGGER.info('Retrieved counts: {}', parser.counts)
     count_section = BEE2_config['Counts']
-    for count_name, (value, limit) in counts.items():
+    for count_name, (value, limit) in parser.counts.items():
         count_section[count_name] = value
         count_section['max_' + count_name] = limit
     BEE2_config.save()
 
 
-def process_vbsp_fail(output: str) -> None:
-    """Read through VBSP's logs when failing, to update counts."""
+def process_vbsp_fail(parser: VBSPLogParser) -> None:
+    """Update counts after VBSP fails, based on the limit error it hit."""
     # VBSP doesn't output the actual entity counts, so set the errorred
     # one to max and the others to zero.
     count_section = BEE2_config['Counts']
@@ -3020,29 +3268,26 @@ def process_vbsp_fail(output: str) -> None:
     count_section['max_entity'] = '2048'
     count_section['max_overlay'] = '512'
 
-    for line in reversed(output.splitlines()):
-        if 'MAX_MAP_OVERLAYS' in line:
-            count_section['entity'] = '0'
-            count_section['brush'] = '0'
-            # The line is like 'MAX_MAP_OVER = 512', pull out the number from
-            # the end and decode it.
-            over_count = line.rsplit('=')[1].strip()
-            count_section['overlay'] = over_count
-            count_section['max_overlay'] = over_count
-            break
-        if 'MAX_MAP_BRUSHSIDES' in line or 'MAX_MAP_PLANES' in line:
-            count_section['entity'] = '0'
-            count_section['overlay'] = '0'
-            count_section['brush'] = '8192'
-            break
-        if 'MAX_MAP_ENTITIES' in line:
-            count_section['entity'] = count_section['overlay'] = '0'
-            count_section['brush'] = '8192'
-            break
-    else:
+    line = parser.fail_line
+    if line is None:
         count_section['entity'] = '0'
         count_section['overlay'] = '0'
         count_section['brush'] = '0'
+    elif 'MAX_MAP_OVERLAYS' in line:
+        count_section['entity'] = '0'
+        count_section['brush'] = '0'
+        # The line is like 'MAX_MAP_OVER = 512', pull out the number from
+        # the end and decode it.
+        over_count = line.rsplit('=')[1].strip()
+        count_section['overlay'] = over_count
+        count_section['max_overlay'] = over_count
+    elif 'MAX_MAP_BRUSHSIDES' in line or 'MAX_MAP_PLANES' in line:
+        count_section['entity'] = '0'
+        count_section['overlay'] = '0'
+        count_section['brush'] = '8192'
+    else:  # MAX_MAP_ENTITIES
+        count_section['entity'] = count_section['overlay'] = '0'
+        count_section['brush'] = '8192'
     BEE2_config.save_check()
 
 
@@ -3151,6 +3396,7 @@ def main() -> None:
 
         LOGGER.info("Loading settings...")
         ant_floor, ant_wall = load_settings()
+        rand.COMPAT_MODE = vbsp_options.get(bool, 'compat_random')
 
         load_map(path)
         instance_traits.set_traits(VMF)
@@ -3184,13 +3430,13 @@ def main() -> None:
 
         change_ents()
         fixup_goo_sides()  # Must be done before change_brush()!
-        change_brush()
-        change_overlays()
-        collapse_goo_trig()
-        change_func_brush()
+        texture_faces()
         barriers.make_barriers(VMF, get_tex)
         fix_worldspawn()
 
+        # Reduce the map if it's going to exceed the engine limits.
+        budget.plan(VMF)
+
         
         # Ensure all VMF outputs use the correct seperator.
         for ent in VMF.entities:
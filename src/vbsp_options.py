@@ -324,6 +324,13 @@ DEFAULTS = [
 
         This makes EmbedFace textures contiguous, for irregular textures.
         """),
+    Opt('compat_random', False,
+        """Use the older, slower method of seeding random choices.
+
+        This reproduces the textures, antlines, fizzler models and random
+        results chosen by previous versions exactly, instead of using
+        independent generators for each location.
+        """),
 
     Opt('fizz_border_vertical', False,
         """For fizzler borders, indicate that the texture is vertical.